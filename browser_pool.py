@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from resource_policy import ResourceStats
+
+log = logging.getLogger('browser_pool')
+
+
+class BrowserPool:
+    """
+    Chromium kept running between tool calls / jobs, one browser context per slot
+    """
+
+    def __init__(self, size: int = 2, headless: bool = True):
+        self.size = size
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._contexts = asyncio.Queue()
+        self._start_lock = asyncio.Lock()
+        self.resources = ResourceStats()
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._browser is not None:
+                return
+
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            for _ in range(self.size):
+                self._contexts.put_nowait(await self._browser.new_context())
+            log.info(f'Browser pool ready ({self.size} contexts)')
+
+    @asynccontextmanager
+    async def page(self, policy=None):
+        """Borrow a fresh page from a warm browser context, requests routed through policy if given"""
+        await self.start()
+        context = await self._contexts.get()
+        page = await context.new_page()
+        if policy is not None:
+            await policy.install(page, self.resources)
+        try:
+            yield page
+        finally:
+            await page.close()
+            self._contexts.put_nowait(context)
+
+    async def close(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
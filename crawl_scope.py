@@ -0,0 +1,268 @@
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|gclid|fbclid|msclkid|yclid|mc_cid|mc_eid|_ga|_gl|ref|ref_src|source)$', re.I)
+
+# ;jsessionid=... and other servlet path parameters
+SESSION_PATH_PARAM = re.compile(r';(?:jsessionid|phpsessid|sid)=[^/?#]*', re.I)
+
+# Links that are never pages: assets, downloads, mail/phone/js pseudo-links
+ASSET_PATH = re.compile(r'\.(?:png|jpe?g|gif|webp|svg|ico|css|js|woff2?|ttf|pdf|zip|mp4|mp3)$', re.I)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _origin(base: str) -> str:
+    parts = urlsplit(base)
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+def canonicalize(url: str, base: Optional[str] = None, origin: Optional[str] = None) -> Optional[str]:
+    """
+    Canonical absolute form of a link, None for links that are not http(s) pages
+
+    Lowercase scheme and host, no default port, no fragment, no session path
+    parameter, no tracking parameters, remaining query parameters sorted.
+    """
+    url = url.strip()
+    if base is not None and not url.startswith(('http://', 'https://')):
+        if url.startswith('/') and not url.startswith('//'):
+            # Root-relative, the common case: no full urljoin needed
+            url = (origin or _origin(base)) + url
+        else:
+            url = urljoin(base, url)
+    return _canonical(url)
+
+
+@lru_cache(maxsize=65536)
+def _canonical(url: str) -> Optional[str]:
+    """canonicalize of an absolute URL, cached: nav and footer links repeat on every page"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    netloc = parts.hostname.lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        netloc = f'{netloc}:{parts.port}'
+    path = SESSION_PATH_PARAM.sub('', parts.path) or '/'
+    query = parts.query
+    if query:
+        params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if not TRACKING_PARAMS.match(k)]
+        query = urlencode(sorted(params))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+class CrawlScope:
+    """
+    Which links of a site get enqueued
+
+    include / exclude are regexes searched in the canonical URL. The excludes
+    are compiled into one alternation and checked first: a search returns the
+    leftmost match, so sharing one alternation with the includes would let any
+    include matching earlier in the URL win over an exclude. The includes form
+    a second alternation with a named group per pattern, so one more search
+    tells which include rule a link falls under. Each include rule may have a
+    cap (how many URLs of it are enqueued in total), max_depth bounds link
+    hops from the start URLs, and every canonical URL is enqueued once.
+    """
+
+    def __init__(self, hosts: Iterable[str], include: Iterable[str] = (r'.',), exclude: Iterable[str] = (),
+                 max_depth: Optional[int] = None, caps: Optional[Dict[str, int]] = None):
+        self.hosts = tuple(hosts)
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.max_depth = max_depth
+        caps = caps or {}
+        self._caps = {f'i{i}': caps[pattern] for i, pattern in enumerate(self.include) if pattern in caps}
+
+        self._excluder = re.compile('|'.join(f'(?:{pattern})' for pattern in self.exclude)) if self.exclude else None
+        self._matcher = re.compile('|'.join(f'(?P<i{i}>{pattern})' for i, pattern in enumerate(self.include)))
+        # Host check as part of the same pass: one anchored alternation of the site's hosts
+        self._host = re.compile(r'^https?://(?:[^/]*\.)?(?:' + '|'.join(re.escape(h) for h in self.hosts) + r')(?::\d+)?/')
+
+        self.seen = set()
+        self._counts = {}
+        self.stats = {'links': 0, 'enqueued': 0, 'invalid': 0, 'off_site': 0, 'asset': 0, 'excluded': 0,
+                      'not_included': 0, 'duplicate': 0, 'capped': 0, 'too_deep': 0}
+
+    def rule(self, url: str) -> Optional[str]:
+        """Include rule (pattern) url falls under, None if excluded or not included"""
+        if self._excluder is not None and self._excluder.search(url):
+            return None
+        match = self._matcher.search(url)
+        if match is None:
+            return None
+        return self.include[int(match.lastgroup[1:])]
+
+    def add_seen(self, urls: Iterable[str]) -> None:
+        """Mark start URLs as enqueued, so links back to them are dropped"""
+        self.seen.update(url for url in map(canonicalize, urls) if url)
+
+    def filter(self, links: Iterable[str], base: Optional[str] = None, depth: int = 0) -> List[str]:
+        """Canonical in-scope links not seen before, in page order; depth is the hop count of the new links"""
+        stats = self.stats
+        origin = _origin(base) if base is not None else None
+        kept = []
+        for link in links:
+            stats['links'] += 1
+            if self.max_depth is not None and depth > self.max_depth:
+                stats['too_deep'] += 1
+                continue
+            url = canonicalize(link, base, origin)
+            if url is None:
+                stats['invalid'] += 1
+                continue
+            if not self._host.match(url):
+                stats['off_site'] += 1
+                continue
+            if ASSET_PATH.search(url.split('?', 1)[0]):
+                stats['asset'] += 1
+                continue
+            if url in self.seen:
+                stats['duplicate'] += 1
+                continue
+
+            if self._excluder is not None and self._excluder.search(url):
+                stats['excluded'] += 1
+                continue
+            match = self._matcher.search(url)
+            if match is None:
+                stats['not_included'] += 1
+                continue
+            group = match.lastgroup
+            cap = self._caps.get(group)
+            if cap is not None:
+                count = self._counts.get(group, 0)
+                if count >= cap:
+                    stats['capped'] += 1
+                    continue
+                self._counts[group] = count + 1
+
+            self.seen.add(url)
+            stats['enqueued'] += 1
+            kept.append(url)
+        return kept
+
+    def report(self) -> dict:
+        print(f"\n🧭 Crawl scope: {self.stats['enqueued']:,} of {self.stats['links']:,} links enqueued")
+        dropped = ', '.join(f"{key} {value:,}" for key, value in self.stats.items()
+                            if key not in ('links', 'enqueued') and value)
+        print(f"  Dropped: {dropped or 'nothing'}")
+        return dict(self.stats)
+
+
+# Per-site scopes: job and company pages, no auth/blog/locale duplicates
+SITE_SCOPES = {
+    'tokyodev': dict(
+        hosts=('tokyodev.com',),
+        include=(r'/companies/[^/?]+/?$', r'/companies/[^/?]+/jobs/[^/?]+/?$', r'/jobs(?:/[^/?]+)?/?(?:\?page=\d+)?$'),
+        exclude=(r'/(?:users|sign_in|sign_up|login|logout|auth|admin)\b', r'/(?:blog|articles|events|guides)/',
+                 r'/(?:ja|en)/', r'[?&](?:sort|order|filter)='),
+        max_depth=3,
+        caps={r'/jobs(?:/[^/?]+)?/?(?:\?page=\d+)?$': 50},
+    ),
+    'japandev': dict(
+        hosts=('japandev.com', 'japan-dev.com'),
+        include=(r'/jobs/[^/?]+/?$', r'/companies/[^/?]+/?$', r'/jobs/?(?:\?page=\d+)?$'),
+        exclude=(r'/(?:login|signup|auth|admin|api)\b', r'/(?:blog|articles)/'),
+        max_depth=3,
+        caps={r'/jobs/?(?:\?page=\d+)?$': 50},
+    ),
+}
+
+
+def site_scope(site: str, **overrides) -> CrawlScope:
+    return CrawlScope(**{**SITE_SCOPES[site], **overrides})
+
+
+def _synthetic_links(count: int, base: str = 'https://www.tokyodev.com') -> List[str]:
+    """A link-heavy page: jobs, companies, duplicates with tracking params, off-site, assets, auth, blog"""
+    kinds = (
+        lambda n: f'/companies/company-{n % 400}/jobs/job-{n}',
+        lambda n: f'/companies/company-{n % 400}?utm_source=list&utm_medium=web',
+        lambda n: f'{base}/companies/company-{n % 400}/jobs/job-{n}#apply',
+        lambda n: f'/jobs/backend?page={n % 80}',
+        lambda n: f'https://twitter.com/share?url=job-{n}',
+        lambda n: f'/assets/logo-{n % 50}.png',
+        lambda n: '/users/sign_in',
+        lambda n: f'/blog/post-{n}',
+        lambda n: f'/companies/company-{n % 400};jsessionid=ABC{n}',
+        lambda n: 'mailto:jobs@example.com',
+    )
+    return [kinds[n % len(kinds)](n) for n in range(count)]
+
+
+def _filter_per_pattern(scope_args: dict, links: List[str], base: str) -> int:
+    """The uncompiled way: host check and every pattern searched one by one"""
+    includes = [re.compile(p) for p in scope_args['include']]
+    excludes = [re.compile(p) for p in scope_args['exclude']]
+    seen = set()
+    for link in links:
+        url = canonicalize(link, base)
+        if url is None or not any((urlsplit(url).hostname or '').endswith(h) for h in scope_args['hosts']):
+            continue
+        if ASSET_PATH.search(urlsplit(url).path) or url in seen:
+            continue
+        if any(p.search(url) for p in excludes) or not any(p.search(url) for p in includes):
+            continue
+        seen.add(url)
+    return len(seen)
+
+
+def check() -> None:
+    """Excludes win wherever they match in the URL, also over the default include and over earlier includes"""
+    scope = CrawlScope(hosts=('example.com',), exclude=(r'/blog/',))
+    assert scope.filter(['https://example.com/blog/post-1', 'https://example.com/jobs/1']) == \
+        ['https://example.com/jobs/1'], scope.stats
+    assert scope.stats['excluded'] == 1 and scope.rule('https://example.com/blog/post-2') is None
+
+    scope = site_scope('tokyodev')
+    base = 'https://www.tokyodev.com/jobs/backend'
+    assert scope.filter(['/companies/sign_in', '/companies/admin/', '/companies/acme/jobs/42'], base) == \
+        ['https://www.tokyodev.com/companies/acme/jobs/42'], scope.stats
+    assert scope.stats['excluded'] == 2
+    assert scope.rule('https://www.tokyodev.com/companies/logout') is None
+    assert scope.rule('https://www.tokyodev.com/companies/acme') == SITE_SCOPES['tokyodev']['include'][0]
+    print("✅ Crawl scope: excludes take precedence over includes")
+
+
+def benchmark(links_per_page: int = 5000, pages: int = 20) -> dict:
+    base = 'https://www.tokyodev.com/jobs/backend'
+    links = _synthetic_links(links_per_page)
+    print(f"\n⏱️ Crawl scope: {pages} pages × {links_per_page:,} links")
+    # Both sides share the canonicalize cache, warm it so neither pays for it
+    for link in links:
+        canonicalize(link, base)
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        _filter_per_pattern(SITE_SCOPES['tokyodev'], links, base)
+    per_pattern_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        scope = site_scope('tokyodev', caps={})
+        kept = scope.filter(links, base)
+    compiled_s = time.perf_counter() - start
+
+    total = pages * links_per_page
+    results = {'per_pattern_links_per_s': total / per_pattern_s, 'compiled_links_per_s': total / compiled_s,
+               'kept': len(kept)}
+    print(f"  Pattern by pattern: {results['per_pattern_links_per_s']:,.0f} links/s")
+    print(f"  Compiled matcher: {results['compiled_links_per_s']:,.0f} links/s "
+          f"(x{per_pattern_s / compiled_s:.2f}), {len(kept):,} of {links_per_page:,} links kept per page")
+    scope.report()
+    return results
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--check']:
+        check()
+    else:
+        benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
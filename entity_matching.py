@@ -0,0 +1,383 @@
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import time
+import unicodedata
+from typing import List, Optional
+
+import numpy as np
+from scipy import sparse
+
+# Legal-form tokens, English and Japanese, they carry no identity
+LEGAL_FORMS = re.compile(
+    r'\b(co|ltd|inc|corp|corporation|company|limited|kk|k k|llc|gk|plc|group)\b'
+    r'|株式会社|かぶしきかいしゃ|有限会社|合同会社|\(株\)|\(有\)|㈱|㈲'
+)
+NON_WORD = re.compile(r'[^\w]+')
+# Page-title decorations on job boards: "Acme Inc. | Careers", "Acme 採用情報 - HRMOS"
+TITLE_SEPARATORS = re.compile(r'\s+[|\-–—｜]\s+')
+TITLE_NOISE = re.compile(r'採用情報|採用サイト|求人一覧|careers?|jobs|recruit(ing|ment)?')
+
+KATAKANA_START, KATAKANA_END = 0x30A1, 0x30F6
+KANA_SHIFT = 0x60
+
+EMPLOYER_NAME_FIELDS = ('name', 'title', 'header', 'company')
+
+
+def fold_kana(text: str) -> str:
+    """Katakana -> hiragana, so カブシキ and かぶしき compare equal"""
+    return ''.join(
+        chr(ord(ch) - KANA_SHIFT) if KATAKANA_START <= ord(ch) <= KATAKANA_END else ch
+        for ch in text
+    )
+
+
+def normalize_name(text: str) -> str:
+    """NFKC width folding, casefold, kana folding, drop legal forms and punctuation"""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = fold_kana(text)
+    text = LEGAL_FORMS.sub(' ', text)
+    text = NON_WORD.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def employer_name(record: dict) -> str:
+    """Company name of a TokyoDev / hrmos / JPX record"""
+    for field in EMPLOYER_NAME_FIELDS:
+        value = record.get(field)
+        if value:
+            name = TITLE_SEPARATORS.split(value.strip())[0]
+            return TITLE_NOISE.sub(' ', name).strip() or name
+    return ''
+
+
+def block_keys(name: str) -> List[str]:
+    """
+    Blocking keys of a normalized name: 4-char prefix and suffix of every token
+
+    Both ends are used so a single typo in a token still leaves one key intact.
+    """
+    keys = set()
+    for token in name.split():
+        if len(token) < 2:
+            continue
+        keys.add('p:' + token[:4])
+        keys.add('s:' + token[-4:])
+    return list(keys)
+
+
+def ngram_matrix(names: List[str], vocabulary: dict, n: int = 3, grow: bool = True) -> sparse.csr_matrix:
+    """L2-normalized binary character n-gram rows over a shared vocabulary"""
+    indptr = [0]
+    indices = []
+    sizes = []
+    for name in names:
+        padded = f' {name} '
+        grams = {padded[i:i + n] for i in range(len(padded) - n + 1)}
+        for gram in grams:
+            gram_id = vocabulary.get(gram)
+            if gram_id is None:
+                if not grow:
+                    continue
+                gram_id = vocabulary[gram] = len(vocabulary)
+            indices.append(gram_id)
+        indptr.append(len(indices))
+        sizes.append(len(grams))
+
+    indices = np.asarray(indices, dtype=np.int32)
+    indptr = np.asarray(indptr, dtype=np.int64)
+    lengths = np.diff(indptr)
+    # Every row is binary, so its L2 norm is sqrt(number of grams), including
+    # grams missing from a frozen vocabulary
+    row_weight = 1.0 / np.sqrt(np.maximum(np.asarray(sizes, dtype=np.float64), 1))
+    data = np.repeat(row_weight, lengths).astype(np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(names), len(vocabulary)))
+
+
+def _encode_blocks(names: List[str], key_ids: dict, grow: bool):
+    """Flat (row, key_id) arrays for all blocking keys of names"""
+    rows, keys = [], []
+    for row, name in enumerate(names):
+        for key in block_keys(name):
+            key_id = key_ids.get(key)
+            if key_id is None:
+                if not grow:
+                    continue
+                key_id = key_ids[key] = len(key_ids)
+            rows.append(row)
+            keys.append(key_id)
+    return np.asarray(rows, dtype=np.int64), np.asarray(keys, dtype=np.int64)
+
+
+def candidate_pairs(left_names: List[str], right_names: List[str], max_block: int = 200):
+    """
+    Unique (left_row, right_row) pairs sharing at least one blocking key
+
+    Keys held by more than max_block right-side names ("tech", "japan") are
+    dropped, they would pull in most of the table for little signal.
+    """
+    key_ids = {}
+    right_rows, right_keys = _encode_blocks(right_names, key_ids, grow=True)
+    left_rows, left_keys = _encode_blocks(left_names, key_ids, grow=False)
+
+    order = np.argsort(right_keys, kind='stable')
+    right_rows, right_keys = right_rows[order], right_keys[order]
+
+    lo = np.searchsorted(right_keys, left_keys, side='left')
+    hi = np.searchsorted(right_keys, left_keys, side='right')
+    counts = hi - lo
+    counts[counts > max_block] = 0
+
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    # Expand every [lo, hi) range without a Python loop
+    starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+    positions = starts + np.arange(total)
+    pair_left = np.repeat(left_rows, counts)
+    pair_right = right_rows[positions]
+
+    # Dedupe pairs reached through several keys (sort + adjacent diff, much
+    # faster than np.unique on tens of millions of ids)
+    pair_ids = np.sort(pair_left * len(right_names) + pair_right)
+    distinct = np.empty(len(pair_ids), dtype=bool)
+    distinct[0] = True
+    np.not_equal(pair_ids[1:], pair_ids[:-1], out=distinct[1:])
+    pair_ids = pair_ids[distinct]
+    return pair_ids // len(right_names), pair_ids % len(right_names)
+
+
+def gram_signatures(matrix: sparse.csr_matrix, words: int = 8) -> np.ndarray:
+    """Gram ids of every row hashed into a words × 64 bit signature"""
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    grams = matrix.indices.astype(np.uint64)
+    signatures = np.zeros((matrix.shape[0], words), dtype=np.uint64)
+    bits = np.left_shift(np.uint64(1), grams & np.uint64(63))
+    np.bitwise_or.at(signatures, (rows, (grams >> np.uint64(6)) % np.uint64(words)), bits)
+    return signatures
+
+
+def _row_weights(matrix: sparse.csr_matrix) -> np.ndarray:
+    """Per-row 1/sqrt(|grams|), every stored value of a row holds it"""
+    weights = np.zeros(matrix.shape[0], dtype=np.float32)
+    nonempty = np.diff(matrix.indptr) > 0
+    weights[nonempty] = matrix.data[matrix.indptr[:-1][nonempty]]
+    return weights
+
+
+def prefilter_pairs(left: sparse.csr_matrix, right: sparse.csr_matrix, pair_left: np.ndarray,
+                    pair_right: np.ndarray, threshold: float, slack: float = 0.05,
+                    chunk: int = 2_000_000) -> np.ndarray:
+    """
+    Mask of pairs whose estimated cosine reaches threshold - slack
+
+    Shared grams are counted as popcount(signature_a & signature_b). Hash
+    collisions mostly overcount, so this only throws away pairs that can't
+    match, and the survivors are scored exactly.
+    """
+    left_signatures = gram_signatures(left)
+    right_signatures = gram_signatures(right)
+    left_weight = _row_weights(left)
+    right_weight = _row_weights(right)
+
+    keep = np.empty(len(pair_left), dtype=bool)
+    for start in range(0, len(pair_left), chunk):
+        end = start + chunk
+        i, j = pair_left[start:end], pair_right[start:end]
+        shared = np.bitwise_count(left_signatures[i] & right_signatures[j]).sum(axis=1, dtype=np.float32)
+        keep[start:end] = shared * left_weight[i] * right_weight[j] >= threshold - slack
+    return keep
+
+
+def pair_scores(left: sparse.csr_matrix, right: sparse.csr_matrix, pair_left: np.ndarray,
+                pair_right: np.ndarray, chunk: int = 500_000) -> np.ndarray:
+    """Cosine similarity for each (left_row, right_row) pair, in chunks"""
+    scores = np.empty(len(pair_left), dtype=np.float32)
+    for start in range(0, len(pair_left), chunk):
+        end = start + chunk
+        rows_left = left[pair_left[start:end]]
+        rows_right = right[pair_right[start:end]]
+        scores[start:end] = np.asarray(rows_left.multiply(rows_right).sum(axis=1)).ravel()
+    return scores
+
+
+def match_companies(employers: list, listed: list, threshold: float = 0.75,
+                    max_block: int = 200, stats: Optional[dict] = None) -> List[dict]:
+    """
+    Best JPX-listed match for every employer whose similarity reaches threshold
+
+    Returns the match table: one row per matched employer with its source
+    record index, names on both sides, JPX code and score. Stage timings go to
+    stats when a dict is passed.
+    """
+    if stats is None:
+        stats = {}
+    start = time.perf_counter()
+
+    employer_names = [normalize_name(employer_name(e)) for e in employers]
+    listed_names = [normalize_name(c.get('name', '')) for c in listed]
+    stats['normalize_s'] = time.perf_counter() - start
+
+    step = time.perf_counter()
+    pair_left, pair_right = candidate_pairs(employer_names, listed_names, max_block=max_block)
+    stats['blocking_s'] = time.perf_counter() - step
+    stats['candidate_pairs'] = len(pair_left)
+
+    step = time.perf_counter()
+    vocabulary = {}
+    listed_matrix = ngram_matrix(listed_names, vocabulary)
+    employer_matrix = ngram_matrix(employer_names, vocabulary, grow=False)
+    employer_matrix.resize((len(employer_names), len(vocabulary)))
+    stats['vectorize_s'] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    survivors = prefilter_pairs(employer_matrix, listed_matrix, pair_left, pair_right, threshold)
+    pair_left, pair_right = pair_left[survivors], pair_right[survivors]
+    stats['prefilter_s'] = time.perf_counter() - step
+    stats['scored_pairs'] = len(pair_left)
+
+    step = time.perf_counter()
+    scores = pair_scores(employer_matrix, listed_matrix, pair_left, pair_right)
+    stats['scoring_s'] = time.perf_counter() - step
+
+    # Best listed company per employer: sort by (employer, -score), keep first of each run
+    keep = scores >= threshold
+    pair_left, pair_right, scores = pair_left[keep], pair_right[keep], scores[keep]
+    order = np.lexsort((-scores, pair_left))
+    pair_left, pair_right, scores = pair_left[order], pair_right[order], scores[order]
+    first = np.ones(len(pair_left), dtype=bool)
+    first[1:] = pair_left[1:] != pair_left[:-1]
+
+    table = []
+    for i, j, score in zip(pair_left[first], pair_right[first], scores[first]):
+        table.append({
+            'employer_index': int(i),
+            'employer': employer_name(employers[i]),
+            'code': listed[j].get('code', ''),
+            'listed_name': listed[j].get('name', ''),
+            'score': round(float(score), 4),
+        })
+
+    stats['total_s'] = time.perf_counter() - start
+    return table
+
+
+def load_records(path: str) -> list:
+    """
+    Records from a crawl result file ({'companies': [...]}, JSON list) or a
+    crawlee dataset directory (one JSON file per pushed item or batch)
+    """
+    if os.path.isdir(path):
+        records = []
+        for file_path in sorted(glob.glob(os.path.join(path, '*.json'))):
+            if os.path.basename(file_path).startswith('__'):
+                continue  # __metadata__.json
+            records.extend(load_records(file_path))
+        return records
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data.get('companies', [data])
+    return data
+
+
+def _synthetic_pairs(count: int, seed: int = 3):
+    """
+    Listed companies and employers, half of the employers are noisy spellings
+    of a listed company (width, case, legal form, kana, one typo)
+    """
+    rng = random.Random(seed)
+    syllables = ['ka', 'to', 'ya', 'ma', 'shi', 'ta', 'na', 'ko', 'mi', 'su', 'ki', 'no', 'ha', 'ra',
+                 'fu', 'ji', 'se', 'ri', 'ne', 'wa', 'de', 'bo', 'zu', 'ga', 'ro', 'chi', 'hi', 'me']
+    words = ['ELECTRIC', 'FOODS', 'TRADING', 'SYSTEMS', 'PHARMA', 'STEEL', 'BANK', 'MOTORS', 'CHEMICAL',
+             'SOFTWARE', 'LOGISTICS', 'ESTATE', 'TECHNOLOGIES', 'MEDICAL', 'RETAIL']
+    suffixes = ['CO.,LTD.', 'Corporation', 'Inc.', 'HOLDINGS CO.,LTD.']
+    katakana = ['カブシキ', 'テック', 'システム']
+
+    listed = []
+    for i in range(count):
+        stem = ''.join(rng.choices(syllables, k=rng.randint(3, 5))).upper()
+        listed.append({'code': str(10000 + i), 'name': f'{stem} {rng.choice(words)} {rng.choice(suffixes)}'})
+
+    employers = []
+    truth = {}
+    for i in range(count):
+        if rng.random() < 0.5:
+            target = rng.randrange(count)
+            name = listed[target]['name'].rsplit(' ', 1)[0] if rng.random() < 0.5 else listed[target]['name']
+            roll = rng.random()
+            if roll < 0.25:
+                name = unicodedata.normalize('NFKC', name).title()
+            elif roll < 0.5:
+                # Full-width latin, as often seen in Japanese job posts
+                name = ''.join(chr(ord(ch) + 0xFEE0) if '!' <= ch <= '~' else ch for ch in name)
+            elif roll < 0.75:
+                pos = rng.randrange(len(name))
+                name = name[:pos] + rng.choice('abcdefghijklmnopqrstuvwxyz') + name[pos + 1:]
+            employers.append({'title': f'{name} | Careers'})
+            truth[i] = listed[target]['code']
+        else:
+            stem = ''.join(rng.choices(syllables, k=rng.randint(3, 5)))
+            employers.append({'header': f'{stem.title()} {rng.choice(katakana)} 採用情報 - HRMOS'})
+    return employers, listed, truth
+
+
+def benchmark(count: int) -> dict:
+    employers, listed, truth = _synthetic_pairs(count)
+    print(f"\n⏱️ Synthetic: {len(employers):,} employers × {len(listed):,} listed companies")
+
+    stats = {}
+    table = match_companies(employers, listed, stats=stats)
+
+    correct = sum(1 for row in table if truth.get(row['employer_index']) == row['code'])
+    precision = correct / len(table) if table else 0.0
+    recall = correct / len(truth) if truth else 0.0
+
+    print(f"  Normalize: {stats['normalize_s']:.2f} s")
+    print(f"  Blocking: {stats['blocking_s']:.2f} s ({stats['candidate_pairs']:,} candidate pairs, "
+          f"{stats['candidate_pairs'] / (len(employers) * len(listed)):.5%} of the cross product)")
+    print(f"  Vectorize: {stats['vectorize_s']:.2f} s")
+    print(f"  Signature prefilter: {stats['prefilter_s']:.2f} s "
+          f"({stats['candidate_pairs'] / stats['prefilter_s']:,.0f} pairs/s, {stats['scored_pairs']:,} survive)")
+    print(f"  Exact scoring: {stats['scoring_s']:.2f} s")
+    print(f"  Total: {stats['total_s']:.2f} s, {len(employers) / stats['total_s']:,.0f} employers/s")
+    print(f"  Matches: {len(table):,} ({len(table) / stats['total_s']:,.0f} matches/s)")
+    print(f"  Precision: {precision:.1%}, recall: {recall:.1%}")
+    return {**stats, 'matches': len(table), 'precision': precision, 'recall': recall}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Match job-board employers to JPX-listed companies')
+    parser.add_argument('employers', nargs='?', help='employer records: JSON file or crawlee dataset dir')
+    parser.add_argument('listed', nargs='?', default=os.path.join('jpx', 'jpx_all_companies.json'),
+                        help='JPX crawl result file')
+    parser.add_argument('-o', '--output', default='employer_matches.json')
+    parser.add_argument('--threshold', type=float, default=0.75)
+    parser.add_argument('--bench', type=int, metavar='N', help='run the synthetic N × N benchmark')
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        benchmark(args.bench)
+        return
+    if not args.employers:
+        parser.error('employers path is required unless --bench is given')
+
+    employers = load_records(args.employers)
+    listed = load_records(args.listed)
+    stats = {}
+    table = match_companies(employers, listed, threshold=args.threshold, stats=stats)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'matches': table, 'stats': stats}, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ {len(table)} of {len(employers)} employers matched to listed companies -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
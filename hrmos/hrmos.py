@@ -1,11 +1,21 @@
 import asyncio
+import logging
+import os
+import sys
 import time
 from datetime import timedelta
-from crawlee.crawlers import (
-    PlaywrightCrawler,
-    PlaywrightCrawlingContext,
-    PlaywrightPreNavCrawlingContext,
-)
+
+# jpx/ is a script directory with flat sibling imports, tracing and profiling live there
+JPX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'jpx')
+if JPX_DIR not in sys.path:
+    sys.path.append(JPX_DIR)
+
+from profiling import page_done, profiled
+from tracing import span
+
+log = logging.getLogger('hrmos')
+
+HRMOS_SEARCH_URL = 'https://www.google.com/search?q=site%3Ahrmos.co%2Fpages&oq=site%3Ahrmos.co%2Fpages&gs_lcrp=EgZjaHJvbWUyBggAEEUYOTIGCAEQRRg60gEHNzU1ajBqN6gCALACAA&sourceid=chrome&ie=UTF-8'
 
 
 async def scrap(context, data):
@@ -27,7 +37,7 @@ async def scrap(context, data):
                         link = await link_el.get_attribute('href')
 
                         if header and link:
-                            print(f"Found: {header[:50]}... -> {link}")
+                            log.debug("Found: %s... -> %s", header[:50], link)
                             data.append({
                                 "header": header.strip(),
                                 "link": link
@@ -42,53 +52,44 @@ async def scrap(context, data):
     return data
 
 
-async def main() -> None:
-    URL = 'https://www.google.com/search?q=site%3Ahrmos.co%2Fpages&oq=site%3Ahrmos.co%2Fpages&gs_lcrp=EgZjaHJvbWUyBggAEEUYOTIGCAEQRRg60gEHNzU1ajBqN6gCALACAA&sourceid=chrome&ie=UTF-8'
+async def scrap_pages(context, data, max_pages=100, push_data=None):
+    """
+    Walk SERP pages by clicking the next button, collecting results into data.
+    context only needs .page and .log, so a warm page from outside crawlee works too.
+    push_data, if given, gets every row once: new rows every 5 pages, the rest at the end.
+    """
+    page_count = 0
+    saved = 0
 
-    crawler = PlaywrightCrawler(
-        max_requests_per_crawl=1,
-        headless=False,
-        browser_type='chromium',
-        request_handler_timeout=timedelta(minutes=5),
-    )
-
-    @crawler.router.default_handler
-    async def request_handler(context: PlaywrightCrawlingContext) -> None:
-        context.log.info(f'Processing {context.request.url} ...')
-
-
-        context.page.set_default_timeout(30000)
-        context.page.set_default_navigation_timeout(60000)
-
-
-        data = []
-        page_count = 0
-        max_pages = 100
-
-        while page_count < max_pages:
-            try:
-                page_count += 1
-                context.log.info(f'Processing page {page_count}')
+    while page_count < max_pages:
+        try:
+            page_count += 1
+            context.log.info(f'Processing page {page_count}')
 
 
+            with span('hrmos.parse', page=page_count) as parse_span:
+                found_before = len(data)
                 await scrap(context, data)
+                parse_span.set(items=len(data) - found_before)
+            page_done()
 
 
-                next_button = await context.page.query_selector('.LLNLxf')
+            next_button = await context.page.query_selector('.LLNLxf')
 
-                if next_button is None:
-                    context.log.info("No next button found - reached end")
-                    break
+            if next_button is None:
+                context.log.info("No next button found - reached end")
+                break
 
 
-                is_disabled = await next_button.get_attribute('aria-disabled')
-                if is_disabled == 'true':
-                    context.log.info("Next button is disabled - reached end")
-                    break
+            is_disabled = await next_button.get_attribute('aria-disabled')
+            if is_disabled == 'true':
+                context.log.info("Next button is disabled - reached end")
+                break
 
-                context.log.info(f'Clicking next button for page {page_count + 1}')
+            context.log.info(f'Clicking next button for page {page_count + 1}')
 
 
+            with span('hrmos.request', page=page_count + 1) as request_span:
                 await next_button.click()
 
 
@@ -108,42 +109,88 @@ async def main() -> None:
                             await asyncio.sleep(2)
                         else:
                             raise wait_error
+                request_span.set(retries=retry_count)
 
 
-                await asyncio.sleep(2)
+            await asyncio.sleep(2)
 
 
-                if page_count % 5 == 0:
-                    context.log.info(f'Saving {len(data)} items (page {page_count})')
-                    await context.push_data(data.copy())
+            if push_data and page_count % 5 == 0:
+                # Only the rows since the last save, pushing data.copy() stored every row again each time
+                context.log.info(f'Saving {len(data) - saved} items (page {page_count})')
+                with span('hrmos.persist', page=page_count, items=len(data) - saved):
+                    await push_data(data[saved:])
+                saved = len(data)
 
-            except Exception as e:
-                context.log.error(f'⚠️ Error on page {page_count}: {e}')
+        except Exception as e:
+            context.log.error(f'⚠️ Error on page {page_count}: {e}')
 
 
-                try:
-
-                    current_url = context.page.url
-                    context.log.info(f'Current URL: {current_url}')
+            try:
 
+                current_url = context.page.url
+                context.log.info(f'Current URL: {current_url}')
 
-                    if 'google.com/search' in current_url:
-                        await asyncio.sleep(3)
-                        continue
-                    else:
-                        context.log.error('Lost Google search page, stopping')
-                        break
 
-                except Exception as recovery_error:
-                    context.log.error(f'Recovery failed: {recovery_error}')
+                if 'google.com/search' in current_url:
+                    await asyncio.sleep(3)
+                    continue
+                else:
+                    context.log.error('Lost Google search page, stopping')
                     break
 
+            except Exception as recovery_error:
+                context.log.error(f'Recovery failed: {recovery_error}')
+                break
 
-        if data:
-            context.log.info(f'Final save: {len(data)} total items from {page_count} pages')
-            await context.push_data(data)
+    if push_data and saved < len(data):
+        context.log.info(f'Final save: {len(data) - saved} items')
+        with span('hrmos.persist', page=page_count, items=len(data) - saved):
+            await push_data(data[saved:])
+
+    return page_count
+
+
+async def main() -> None:
+    # crawlee/Playwright load only on the crawl path, extraction helpers stay importable cheaply
+    from crawlee.crawlers import PlaywrightCrawler, PlaywrightCrawlingContext, PlaywrightPreNavCrawlingContext
+
+    # resource_policy sits in the repo root, next to the other Playwright crawlers
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root_dir not in sys.path:
+        sys.path.insert(0, root_dir)
+    from resource_policy import HRMOS_POLICY, ResourceStats
 
+    resources = ResourceStats()
+    URL = HRMOS_SEARCH_URL
+
+    crawler = PlaywrightCrawler(
+        max_requests_per_crawl=1,
+        headless=False,
+        browser_type='chromium',
+        request_handler_timeout=timedelta(minutes=5),
+    )
 
+    # Result rows are plain text, images, fonts and Google's logging pings are aborted
+    @crawler.pre_navigation_hook
+    async def block_resources(context: PlaywrightPreNavCrawlingContext) -> None:
+        await HRMOS_POLICY.install(context.page, resources)
+
+    @crawler.router.default_handler
+    async def request_handler(context: PlaywrightCrawlingContext) -> None:
+        context.log.info(f'Processing {context.request.url} ...')
+
+
+        context.page.set_default_timeout(30000)
+        context.page.set_default_navigation_timeout(60000)
+
+
+        data = []
+        with span('hrmos.search', url=context.request.url) as search_span:
+            page_count = await scrap_pages(context, data, push_data=context.push_data)
+            search_span.set(pages=page_count, items=len(data))
+
+        if data:
             print(f"\n=== SCRAPING COMPLETED ===")
             print(f"Total pages processed: {page_count}")
             print(f"Total items collected: {len(data)}")
@@ -152,6 +199,9 @@ async def main() -> None:
 
     await crawler.run([URL])
 
+    resources.report()
+
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    with profiled('hrmos'):
+        asyncio.run(main())
\ No newline at end of file
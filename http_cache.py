@@ -0,0 +1,180 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from datetime import timedelta
+from typing import Optional
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache with conditional GET support
+
+    Every cached URL is stored as two files: <key>.json with the validators
+    (ETag / Last-Modified) and a few response headers, and <key>.body with the
+    raw response body. A 304 answer is served from disk, and in offline mode
+    entries younger than ttl are served without touching the network at all.
+    """
+
+    def __init__(self, cache_dir: str = 'storage/http_cache', ttl: Optional[timedelta] = None,
+                 offline: bool = False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.offline = offline
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.stats = {
+            'requests': 0,
+            'fresh_hits': 0,  # served from disk without a request
+            'revalidated': 0,  # 304 answered, body served from disk
+            'misses': 0,
+            'stored': 0,
+            'bytes_saved': 0,
+            'bytes_downloaded': 0,
+        }
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Return cached metadata for url or None"""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_body(self, entry: dict) -> bytes:
+        _, body_path = self._paths(entry['url'])
+        with open(body_path, 'rb') as f:
+            return f.read()
+
+    def is_fresh(self, entry: Optional[dict]) -> bool:
+        """Entry may be served without revalidation (offline mode only)"""
+        if not entry or not self.offline:
+            return False
+        if self.ttl is None:
+            return True
+        return time.time() - entry['stored_at'] < self.ttl.total_seconds()
+
+    def conditional_headers(self, entry: Optional[dict]) -> dict:
+        """If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, status: int, headers: dict, body: bytes) -> None:
+        """Store a 200 response together with its validators"""
+        if status != 200:
+            return
+
+        headers = {k.lower(): v for k, v in dict(headers).items()}
+        entry = {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'stored_at': time.time(),
+            'size': len(body),
+            # Body is stored decoded, so only keep headers that still apply
+            'headers': {k: v for k, v in headers.items() if k in ('content-type', 'etag', 'last-modified')},
+        }
+
+        meta_path, body_path = self._paths(url)
+        with open(body_path, 'wb') as f:
+            f.write(body)
+        # Metadata goes last, so a half-written body never looks valid
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+        self.stats['stored'] += 1
+
+    def record_fresh_hit(self, entry: dict) -> None:
+        self.stats['requests'] += 1
+        self.stats['fresh_hits'] += 1
+        self.stats['bytes_saved'] += entry.get('size', 0)
+
+    def record_revalidated(self, entry: dict) -> None:
+        self.stats['requests'] += 1
+        self.stats['revalidated'] += 1
+        self.stats['bytes_saved'] += entry.get('size', 0)
+
+    def record_miss(self, size: int) -> None:
+        self.stats['requests'] += 1
+        self.stats['misses'] += 1
+        self.stats['bytes_downloaded'] += size
+
+    @property
+    def hit_rate(self) -> float:
+        if not self.stats['requests']:
+            return 0.0
+        return (self.stats['fresh_hits'] + self.stats['revalidated']) / self.stats['requests']
+
+    def report(self) -> dict:
+        """Print and return per-run cache statistics"""
+        print(f"\n🗄️ HTTP cache ({'offline' if self.offline else 'online'} mode)")
+        print(f"  Requests: {self.stats['requests']}")
+        print(f"  Fresh hits: {self.stats['fresh_hits']}")
+        print(f"  Revalidated (304): {self.stats['revalidated']}")
+        print(f"  Misses: {self.stats['misses']}")
+        print(f"  Hit rate: {self.hit_rate:.1%}")
+        print(f"  Bytes saved: {self.stats['bytes_saved']:,}")
+        print(f"  Bytes downloaded: {self.stats['bytes_downloaded']:,}")
+        return {**self.stats, 'hit_rate': self.hit_rate}
+
+    def playwright_route_handler(self):
+        """
+        Route handler for Playwright pages, caches top-level documents only
+
+        Install it from a pre-navigation hook:
+            await context.page.route('**/*', cache.playwright_route_handler())
+        """
+
+        async def handle(route) -> None:
+            request = route.request
+            if request.resource_type != 'document' or request.method != 'GET':
+                await route.fallback()
+                return
+
+            url = request.url
+            entry = self.lookup(url)
+
+            if self.is_fresh(entry):
+                self.record_fresh_hit(entry)
+                await route.fulfill(status=200, headers=entry['headers'], body=self.read_body(entry))
+                return
+
+            headers = {**request.headers, **self.conditional_headers(entry)}
+            response = await route.fetch(headers=headers)
+
+            if response.status == 304 and entry:
+                self.record_revalidated(entry)
+                await route.fulfill(status=200, headers=entry['headers'], body=self.read_body(entry))
+                return
+
+            body = await response.body()
+            self.record_miss(len(body))
+            self.store(url, response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+
+        return handle
+
+
+async def read_response_body(http_response) -> bytes:
+    """Read body of a crawlee HTTP response (read() is async in newer crawlee)"""
+    body = http_response.read()
+    if inspect.isawaitable(body):
+        body = await body
+    return body
@@ -1,13 +1,209 @@
 import asyncio
+import json
+import os
+import re
+import sys
+import time
+from datetime import timedelta
+from typing import AsyncIterator, Callable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 
-from crawlee.crawlers import (
-    PlaywrightCrawler,
-    PlaywrightCrawlingContext,
-    PlaywrightPreNavCrawlingContext,
-)
+from http_cache import HttpCache
+from resource_policy import JAPANDEV_POLICY, ResourcePolicy, ResourceStats
+from sitemap_frontier import discover_start_urls
+
+# jpx/ is a script directory with flat sibling imports, tracing and profiling live there
+JPX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jpx')
+if JPX_DIR not in sys.path:
+    sys.path.append(JPX_DIR)
+
+from profiling import page_done, profiled
+from tracing import span
+
+# Point at a local mock (japandev_mock.py) with JAPAN_DEV_BASE_URL=http://127.0.0.1:8766
+JAPAN_DEV_BASE_URL = os.environ.get('JAPAN_DEV_BASE_URL', 'https://www.japandev.com').rstrip('/')
+
+# Embedded page state: Next.js __NEXT_DATA__, Nuxt/other application/json blocks and JSON-LD
+EMBEDDED_JSON_RE = re.compile(
+    rb'<script[^>]*type=["\']application/(?:ld\+)?json["\'][^>]*>(.*?)</script>', re.S | re.I)
+
+# Keys a job posting / its company shows up under in the page state and API payloads
+COMPANY_KEYS = ('company', 'hiringOrganization', 'companyName', 'company_name', 'employer')
+TAG_KEYS = ('skills', 'tags', 'technologies', 'skillTags')
+PAGE_PARAMS = ('page', 'p', 'pageNumber')
+
+# One round trip for all jobs of a rendered listing, the DOM fallback
+RENDERED_JOBS_SCRIPT = """
+anchors => anchors.map(a => {
+    const card = a.closest('article, li, [class*="job"]') || a.parentElement;
+    const text = selector => { const el = card && card.querySelector(selector); return el ? el.innerText.trim() : null; };
+    return {title: a.innerText.trim(), link: a.href, company: text('[class*="company"]'),
+            location: text('[class*="location"]'),
+            tags: card ? [...card.querySelectorAll('[class*="tag"]')].map(t => t.innerText.trim()) : []};
+})
+"""
+
+
+def _is_job(value) -> bool:
+    if not isinstance(value, dict):
+        return False
+    if value.get('@type') == 'JobPosting':
+        return True
+    return bool(value.get('title')) and any(key in value for key in COMPANY_KEYS)
+
+
+def find_jobs(state) -> list:
+    """Job dicts anywhere in a decoded page state / API payload, first list of jobs wins per branch"""
+    jobs = []
+    stack = [state]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            if value and all(_is_job(item) for item in value):
+                jobs.extend(value)
+            else:
+                stack.extend(reversed(value))
+        elif isinstance(value, dict):
+            if _is_job(value):
+                jobs.append(value)
+            else:
+                stack.extend(reversed(list(value.values())))
+    return jobs
+
+
+def normalize_job(raw: dict, base_url: str = JAPAN_DEV_BASE_URL) -> dict:
+    """Page-state / API / JSON-LD job into the flat record pushed to the dataset"""
+    company = next((raw[key] for key in COMPANY_KEYS if raw.get(key)), None)
+    if isinstance(company, dict):
+        company = company.get('name')
+
+    location = raw.get('location') or raw.get('jobLocation')
+    if isinstance(location, list):
+        # JSON-LD lists one Place per office, the first one is the main location
+        location = location[0]
+    if isinstance(location, dict):
+        location = (location.get('address') or {}).get('addressLocality') or location.get('name')
+
+    tags = next((raw[key] for key in TAG_KEYS if raw.get(key)), [])
+    tags = [tag.get('name') if isinstance(tag, dict) else tag for tag in tags]
+
+    salary = None
+    if raw.get('salary_min') or raw.get('salary_max'):
+        salary = f"{raw.get('salary_min') or ''}-{raw.get('salary_max') or ''}"
+    elif raw.get('salary'):
+        salary = raw['salary']
+
+    link = raw.get('url') or raw.get('link')
+    if not link and raw.get('slug'):
+        link = f"/jobs/{raw['slug']}"
+
+    return {
+        'title': raw.get('title'),
+        'company': company,
+        'location': location,
+        'salary': salary,
+        'tags': tags,
+        'japanese_level': raw.get('japanese_level') or raw.get('japaneseLevel'),
+        'link': urljoin(base_url + '/', link) if link else None,
+    }
+
+
+def extract_embedded_jobs(html: bytes, base_url: str = JAPAN_DEV_BASE_URL) -> List[dict]:
+    """Jobs from the JSON a server-rendered shell ships for hydration, no DOM or JS involved"""
+    jobs = []
+    for match in EMBEDDED_JSON_RE.finditer(html):
+        try:
+            state = json.loads(match.group(1))
+        except ValueError:
+            continue
+        jobs.extend(normalize_job(job, base_url) for job in find_jobs(state))
+    return jobs
+
+
+def page_url(url: str, page: int) -> str:
+    """url with its page query parameter (page / p / pageNumber) set to page"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    name = next((key for key, _ in query if key in PAGE_PARAMS), 'page')
+    query = [(key, value) for key, value in query if key != name] + [(name, str(page))]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _current_page(url: str) -> int:
+    query = dict(parse_qsl(urlsplit(url).query))
+    return int(next((query[key] for key in PAGE_PARAMS if query.get(key, '').isdigit()), 1))
+
+
+class ApiCapture:
+    """
+    Response listener remembering the first JSON endpoint that answered with jobs
+
+        capture = ApiCapture(); page.on('response', capture.on_response)
+    """
+
+    def __init__(self):
+        self.url = None
+        self.payload = None
+
+    async def on_response(self, response) -> None:
+        if self.url is not None or 'json' not in (response.headers.get('content-type') or ''):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        if find_jobs(payload):
+            self.url, self.payload = response.url, payload
+
+
+async def paginate_api(get_json: Callable, url: str, max_pages: Optional[int] = None) -> AsyncIterator[list]:
+    """
+    Yields the jobs of every page of a JSON listing endpoint, starting after url's page
+
+    get_json(url) -> decoded payload. Stops at totalPages / total_pages when
+    the payload has one, else at the first page with no new jobs.
+    """
+    page = _current_page(url)
+    seen = set()
+    fetched = 0
+    while max_pages is None or fetched < max_pages:
+        page += 1
+        payload = await get_json(page_url(url, page))
+        fetched += 1
+        jobs = [job for job in find_jobs(payload) if job.get('id', job.get('slug')) not in seen]
+        if not jobs:
+            return
+        seen.update(job.get('id', job.get('slug')) for job in jobs)
+        yield jobs
+
+        total_pages = (payload.get('totalPages') or payload.get('total_pages')) if isinstance(payload, dict) else None
+        if total_pages and page >= total_pages:
+            return
+
+
+async def extract_rendered_jobs(page) -> List[dict]:
+    """Jobs from the rendered DOM, for listings without embedded state or a captured API"""
+    return await page.eval_on_selector_all('a[href*="/jobs/"]', RENDERED_JOBS_SCRIPT)
+
+
+async def main(offline: bool = False, max_pages: Optional[int] = None, sitemap: bool = False) -> None:
+    # crawlee/Playwright load only on the crawl path
+    from crawlee.crawlers import (
+        PlaywrightCrawler,
+        PlaywrightCrawlingContext,
+        PlaywrightPreNavCrawlingContext,
+    )
+
+    # Serve unchanged listing pages from disk, offline mode skips the network for 12h
+    cache = HttpCache(ttl=timedelta(hours=12), offline=offline)
+    # Scripts and data requests render the listings, images, fonts and trackers are dropped
+    resources = ResourceStats()
+    policy = JAPANDEV_POLICY
+    if not policy.covers(JAPAN_DEV_BASE_URL):
+        policy = ResourcePolicy('japandev', hosts=(urlsplit(JAPAN_DEV_BASE_URL).hostname,),
+                                allow_types=JAPANDEV_POLICY.allow_types)
+    captures = {}
 
-JAPAN_DEV_BASE_URL = 'https://www.japandev.com'
-async def main() -> None:
     crawler = PlaywrightCrawler(
         # Limit the crawl to max requests. Remove or increase it for crawling all links.
         max_requests_per_crawl=10,
@@ -17,34 +213,145 @@ async def main() -> None:
         browser_type='chromium',
     )
 
-    # Define the default request handler, which will be called for every request.
-    # The handler receives a context parameter, providing various properties and
-    # helper methods. Here are a few key ones we use for demonstration:
-    # - request: an instance of the Request class containing details such as the URL
-    #   being crawled and the HTTP method used.
-    # - page: Playwright's Page object, which allows interaction with the web page
-    #   (see https://playwright.dev/python/docs/api/class-page for more details).
     @crawler.router.default_handler
     async def request_handler(context: PlaywrightCrawlingContext) -> None:
-        data = []
-        await context.push_data(data)
-        print(data)
+        page = context.page
+        capture = captures.pop(page, None)
+        started_at = time.perf_counter()
+        status = context.response.status if context.response else 0
+
+        with span('japandev.page', url=context.request.url, status=status) as page_span:
+            with span('japandev.parse') as parse_span:
+                html = (await page.content()).encode('utf-8')
+                jobs = extract_embedded_jobs(html, JAPAN_DEV_BASE_URL)
+                source = 'embedded state'
+                if capture is not None and capture.url is None:
+                    try:
+                        await page.wait_for_load_state('networkidle', timeout=5000)
+                    except Exception:
+                        pass
+                if not jobs and capture is not None and capture.payload is not None:
+                    jobs, source = [normalize_job(job, JAPAN_DEV_BASE_URL) for job in find_jobs(capture.payload)], 'API'
+                if not jobs:
+                    jobs, source = await extract_rendered_jobs(page), 'DOM'
+                parse_span.set(source=source, bytes=len(html), items=len(jobs))
+            with span('japandev.persist', items=len(jobs)):
+                await context.push_data(jobs)
+            count, pages = len(jobs), 1
+            page_done()
 
-        # Find a link to the next page and enqueue it if it exists.
-        await context.enqueue_links(selector='.morelink')
+            if capture is not None and capture.url is not None:
+                # The rest of the listing straight from the endpoint the page used, same cookies, no rendering
+                async def get_json(url: str):
+                    with span('japandev.request', url=url) as request_span:
+                        response = await page.request.get(url)
+                        body = await response.body()
+                        request_span.set(status=response.status, bytes=len(body))
+                    return json.loads(body)
+
+                async for more in paginate_api(get_json, capture.url, max_pages):
+                    with span('japandev.persist', page=pages + 1, items=len(more)):
+                        await context.push_data([normalize_job(job, JAPAN_DEV_BASE_URL) for job in more])
+                    count += len(more)
+                    pages += 1
+                    page_done()
+            elif source == 'DOM':
+                # No data API seen, fall back to following the listing's own pagination
+                await context.enqueue_links(selector='.morelink')
+            page_span.set(pages=pages, items=count)
+
+        context.log.info(f'{count} jobs from {pages} page(s) ({source}, API {capture and capture.url}) '
+                         f'in {time.perf_counter() - started_at:.1f} s')
 
-    # Define a hook that will be called each time before navigating to a new URL.
-    # The hook receives a context parameter, providing access to the request and
-    # browser page among other things. In this example, we log the URL being
-    # navigated to.
     @crawler.pre_navigation_hook
     async def log_navigation_url(context: PlaywrightPreNavCrawlingContext) -> None:
         context.log.info(f'Navigating to {context.request.url} ...')
+        captures[context.page] = capture = ApiCapture()
+        context.page.on('response', capture.on_response)
+        await context.page.route('**/*', cache.playwright_route_handler())
+        await policy.install(context.page, resources)
+
+    start_urls = [JAPAN_DEV_BASE_URL + '/jobs']
+    if sitemap:
+        # Recently changed job/company pages only, their JSON-LD / page state is read like a listing's
+        start_urls = await asyncio.to_thread(discover_start_urls, JAPAN_DEV_BASE_URL, 'japandev', 10, start_urls)
 
     # Run the crawler with the initial list of URLs.
-    await crawler.run([JAPAN_DEV_BASE_URL])
+    await crawler.run(start_urls)
+
+    cache.report()
+    resources.report()
+
+
+def benchmark(pages: int = 50, base_url: Optional[str] = None) -> dict:
+    """
+    Listing pages/s of the three ways to get Japan Dev jobs
+
+    - rendered DOM: Playwright loads every page, JS renders it, jobs read from the DOM
+    - embedded state: plain GET of every page, jobs read from __NEXT_DATA__
+    - data API: plain GET of the JSON endpoint per page
+
+    Runs against japandev_mock.py unless base_url is given.
+    """
+    import requests
+
+    from japandev_mock import MockJapanDevServer
+
+    mock = None
+    if base_url is None:
+        mock = MockJapanDevServer(total_jobs=pages * 20, per_page=20)
+        base_url = mock.start()
+
+    print(f"\n⏱️ Japan Dev listing, {pages} pages from {base_url}")
+    results = {}
+    session = requests.Session()
+
+    def run(label: str, fetch_jobs) -> None:
+        start = time.perf_counter()
+        jobs = sum(len(fetch_jobs(page)) for page in range(1, pages + 1))
+        elapsed = time.perf_counter() - start
+        results[label] = {'pages_per_s': pages / elapsed, 'jobs': jobs}
+        print(f"  {label}: {pages / elapsed:.1f} pages/s ({jobs:,} jobs)")
+
+    try:
+        try:
+            from playwright.sync_api import sync_playwright
+        except ImportError:
+            print("  rendered DOM: skipped, playwright is not installed")
+        else:
+            with sync_playwright() as playwright:
+                browser = playwright.chromium.launch(headless=True)
+                browser_page = browser.new_page()
+                run('rendered DOM', lambda page: _rendered_jobs(browser_page, page_url(f'{base_url}/jobs', page)))
+                browser.close()
+
+        run('embedded state', lambda page: extract_embedded_jobs(
+            session.get(page_url(f'{base_url}/jobs', page)).content, base_url))
+        run('data API', lambda page: [normalize_job(job, base_url) for job in find_jobs(
+            session.get(page_url(f'{base_url}/api/jobs', page)).json())])
+    finally:
+        session.close()
+        if mock is not None:
+            mock.stop()
+
+    if 'rendered DOM' in results:
+        for label in ('embedded state', 'data API'):
+            results[label]['speedup'] = results[label]['pages_per_s'] / results['rendered DOM']['pages_per_s']
+            print(f"  {label}: x{results[label]['speedup']:.1f} vs rendered DOM")
+    return results
+
+
+def _rendered_jobs(browser_page, url: str) -> list:
+    """Load url in a sync Playwright page, wait for the client render and read the jobs off the DOM"""
+    browser_page.goto(url)
+    browser_page.wait_for_selector('a[href*="/jobs/"]')
+    return browser_page.eval_on_selector_all('a[href*="/jobs/"]', RENDERED_JOBS_SCRIPT)
 
 
 if __name__ == '__main__':
-    print("started Japan dev scratch")
-    asyncio.run(main())
\ No newline at end of file
+    if sys.argv[1:2] == ['--bench']:
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 50, os.environ.get('JAPAN_DEV_BASE_URL'))
+    else:
+        print("started Japan dev scratch")
+        with profiled('japandev'):
+            asyncio.run(main(offline='--offline' in sys.argv, sitemap='--sitemap' in sys.argv))
@@ -0,0 +1,155 @@
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+COMPANIES = ('Mercari', 'SmartNews', 'Money Forward', 'LINE Yahoo', 'Rakuten', 'freee', 'PayPay', 'Cybozu',
+             'Sansan', 'CyberAgent', 'Wantedly', 'Ubie', 'LayerX', 'HENNGE', 'Preferred Networks', 'Kaizen')
+TITLES = ('Backend Engineer', 'Frontend Engineer', 'Full-stack Engineer', 'Site Reliability Engineer',
+          'Data Engineer', 'Machine Learning Engineer', 'iOS Engineer', 'Android Engineer', 'Engineering Manager')
+SKILLS = ('Go', 'Ruby', 'Python', 'TypeScript', 'React', 'Kotlin', 'Swift', 'AWS', 'GCP', 'Kubernetes',
+          'Rails', 'Next.js', 'PostgreSQL', 'Terraform')
+LOCATIONS = ('Tokyo', 'Osaka', 'Fukuoka', 'Remote (Japan)', 'Fully remote')
+JAPANESE_LEVELS = ('None', 'Conversational', 'Business', 'Fluent')
+
+# Client-side render of the listing: fetch the page from the data API and build the DOM
+RENDER_SCRIPT = """
+fetch('/api/jobs?page=' + PAGE).then(r => r.json()).then(data => {
+  document.getElementById('__next').innerHTML = data.jobs.map(job =>
+    '<article class="job"><h3><a href="/jobs/' + job.slug + '">' + job.title + '</a></h3>' +
+    '<span class="company">' + job.company.name + '</span><span class="location">' + job.location + '</span>' +
+    '<ul>' + job.skills.map(s => '<li class="tag">' + s + '</li>').join('') + '</ul></article>').join('');
+});
+"""
+
+
+class MockJapanDevServer:
+    """
+    Local stand-in for a client-rendered Japan Dev listing
+
+    - GET /jobs?page=N      -> app shell: Next.js-style __NEXT_DATA__ state of
+                               page N and a script rendering it from the API
+    - GET /api/jobs?page=N  -> {"jobs": [...], "page": N, "totalPages": T}
+
+    Every answer takes base_latency, jobs are derived from seed and page.
+    """
+
+    def __init__(self, total_jobs: int = 2000, per_page: int = 20, base_latency: float = 0.02,
+                 port: int = 0, seed: int = 1):
+        self.total_jobs = total_jobs
+        self.per_page = per_page
+        self.base_latency = base_latency
+        self.port = port
+        self.seed = seed
+        self._server = None
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'api_requests': 0, 'bytes': 0}
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    @property
+    def total_pages(self) -> int:
+        return -(-self.total_jobs // self.per_page)
+
+    def jobs(self, page: int) -> list:
+        rng = random.Random(self.seed * 1_000_003 + page)
+        first = (page - 1) * self.per_page
+        jobs = []
+        for row in range(first, min(first + self.per_page, self.total_jobs)):
+            company = rng.choice(COMPANIES)
+            title = rng.choice(TITLES)
+            salary_min = rng.randrange(5, 15) * 1_000_000
+            jobs.append({
+                'id': row + 1,
+                'slug': f"{company.lower().replace(' ', '-')}-{title.lower().replace(' ', '-')}-{row + 1}",
+                'title': title,
+                'company': {'name': company, 'slug': company.lower().replace(' ', '-')},
+                'location': rng.choice(LOCATIONS),
+                'salary_min': salary_min,
+                'salary_max': salary_min + rng.randrange(1, 6) * 1_000_000,
+                'skills': rng.sample(SKILLS, rng.randint(2, 5)),
+                'japanese_level': rng.choice(JAPANESE_LEVELS),
+            })
+        return jobs
+
+    def api_page(self, page: int) -> bytes:
+        return json.dumps({'jobs': self.jobs(page), 'page': page, 'totalPages': self.total_pages}).encode('utf-8')
+
+    def listing_page(self, page: int) -> bytes:
+        state = {'props': {'pageProps': {'jobs': self.jobs(page), 'page': page, 'totalPages': self.total_pages}},
+                 'page': '/jobs', 'query': {'page': str(page)}}
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Japan Dev - Jobs</title></head><body>'
+            '<div id="__next"></div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(state)}</script>'
+            f'<script>var PAGE = {page};{RENDER_SCRIPT}</script>'
+            '</body></html>'
+        ).encode('utf-8')
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                page = int((parse_qs(url.query).get('page') or ['1'])[0])
+                time.sleep(server.base_latency)
+                if url.path.startswith('/api/jobs'):
+                    body, content_type = server.api_page(page), 'application/json'
+                elif url.path.startswith('/jobs') or url.path == '/':
+                    body, content_type = server.listing_page(page), 'text/html; charset=utf-8'
+                else:
+                    body, content_type = b'Not found', 'text/plain'
+                with server._lock:
+                    server.stats['requests'] += 1
+                    server.stats['api_requests'] += url.path.startswith('/api/')
+                    server.stats['bytes'] += len(body)
+
+                self.send_response(200 if content_type != 'text/plain' else 404)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> str:
+        """Serve in a background thread, returns the base URL"""
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8766
+    mock = MockJapanDevServer(port=port)
+    print(f"🧪 Mock Japan Dev on {mock.start()} (set JAPAN_DEV_BASE_URL to use it), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock.stop()
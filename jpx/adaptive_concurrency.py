@@ -0,0 +1,335 @@
+import asyncio
+import contextvars
+import math
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+# Validation errors JPX renders into an HTTP 200 page (see minimal.py)
+ERROR_PAGE_MARKERS = (b'should 1 or more checks', b'is not a right date')
+
+
+def is_error_page(content: bytes) -> bool:
+    return any(marker in content for marker in ERROR_PAGE_MARKERS)
+
+
+def classify_failure(response=None, error: Optional[BaseException] = None) -> Optional[str]:
+    """
+    Failure kind of one JPX request, None when it went through
+
+    'timeout', 'connection', 'http_429', 'http_5xx' or 'error_page'.
+    """
+    if error is not None:
+        import requests
+
+        if isinstance(error, requests.Timeout):
+            return 'timeout'
+        if isinstance(error, requests.ConnectionError):
+            return 'connection'
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        if status == 429:
+            return 'http_429'
+        if status is not None and status >= 500:
+            return 'http_5xx'
+        return type(error).__name__
+
+    if response.status_code == 429:
+        return 'http_429'
+    if response.status_code >= 500:
+        return 'http_5xx'
+    if is_error_page(response.content):
+        return 'error_page'
+    return None
+
+
+class RateLimiter:
+    """
+    Spaces acquisitions at least 1/rate seconds apart, shared by all jobs of a source
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = None
+
+    async def wait(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)]
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease limit on in-flight requests
+
+    Every healthy response raises the limit by increase/limit, about +increase
+    per round trip of `limit` requests. The limit is multiplied by `decrease`
+    on a 429 / 5xx / timeout / error page, when the error rate of the recent
+    window passes max_error_rate, or when the recent p95 latency grows past
+    latency_tolerance × the baseline (p10 of the long window), i.e. the server
+    queues. Cuts are at most one per cooldown so one burst counts once, and
+    each cut starts a fresh recent window so the next decision is made on
+    responses seen under the new limit.
+
+    The request timeout follows the long window: p99 × timeout_multiplier,
+    clamped to [min_timeout, max_timeout].
+    """
+
+    def __init__(self, initial: float = 2, min_limit: float = 1, max_limit: float = 32,
+                 increase: float = 1.0, decrease: float = 0.5, window: int = 50,
+                 latency_tolerance: float = 3.0, max_error_rate: float = 0.1,
+                 timeout_multiplier: float = 3.0, min_timeout: float = 2.0, max_timeout: float = 60.0,
+                 initial_timeout: float = 30.0, cooldown: float = 1.0, min_samples: int = 10):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.initial_timeout = initial_timeout
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+
+        self.in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._history = deque(maxlen=window * 10)
+        self._outcomes = deque(maxlen=window)  # True for failures
+        self._last_cut_at = 0.0
+        self._condition = None
+        self._executor = None
+
+        self.stats = {'requests': 0, 'failures': 0, 'cuts': 0, 'failure_kinds': {}}
+        self.timeline = []
+
+    @property
+    def p95(self) -> float:
+        return percentile(self._latencies, 0.95)
+
+    @property
+    def baseline(self) -> float:
+        return percentile(self._history, 0.10)
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def timeout(self) -> float:
+        """Request timeout derived from observed latency"""
+        if len(self._history) < self.min_samples:
+            return self.initial_timeout
+        timeout = percentile(self._history, 0.99) * self.timeout_multiplier
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    def _cut(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_cut_at < self.cooldown:
+            return
+        self._last_cut_at = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.stats['cuts'] += 1
+        self._snapshot(reason)
+        self._latencies.clear()
+        self._outcomes.clear()
+
+    def _snapshot(self, event: str) -> None:
+        self.timeline.append({
+            'at': time.monotonic(), 'event': event, 'limit': round(self.limit, 2),
+            'in_flight': self.in_flight, 'p95_s': round(self.p95, 3), 'timeout_s': round(self.timeout, 2),
+            'error_rate': round(self.error_rate, 3),
+        })
+
+    def record_success(self, latency: float) -> None:
+        self.stats['requests'] += 1
+        self._latencies.append(latency)
+        self._history.append(latency)
+        self._outcomes.append(False)
+
+        if len(self._latencies) >= self.min_samples and self.p95 > self.baseline * self.latency_tolerance:
+            self._cut('latency')
+        elif len(self._outcomes) >= self.min_samples and self.error_rate > self.max_error_rate:
+            self._cut('error_rate')
+        else:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+
+    def record_failure(self, kind: str, latency: Optional[float] = None) -> None:
+        self.stats['requests'] += 1
+        self.stats['failures'] += 1
+        kinds = self.stats['failure_kinds']
+        kinds[kind] = kinds.get(kind, 0) + 1
+        if latency is not None and kind != 'timeout':
+            self._history.append(latency)
+        self._outcomes.append(True)
+        self._cut(kind)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Threads for blocking fetches, enough for max_limit (the default pool has cpu_count + 4)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=int(math.ceil(self.max_limit)))
+        return self._executor
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait until in_flight < limit, hold one slot for the request"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(1, int(self.limit)))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                # The limit may have grown too, wake everyone that fits
+                self._condition.notify_all()
+
+    async def request(self, fetch: Callable[[float], object], attempts: int = 3, backoff: float = 0.5):
+        """
+        Run fetch(timeout) in a thread under the limit, returns its response
+
+        Failures are recorded and retried after backoff × 2^attempt seconds;
+        the last failure is raised.
+        """
+        for attempt in range(attempts):
+            async with self.slot():
+                timeout = self.timeout
+                started_at = time.monotonic()
+                response = error = None
+                try:
+                    # In the caller's context, so spans opened by fetch nest under the caller's span
+                    response = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, contextvars.copy_context().run, fetch, timeout)
+                except Exception as e:
+                    error = e
+                latency = time.monotonic() - started_at
+
+                kind = classify_failure(response, error)
+                if kind is None:
+                    self.record_success(latency)
+                    return response
+                self.record_failure(kind, latency)
+
+            if attempt + 1 == attempts:
+                if error is not None:
+                    raise error
+                raise RuntimeError(f'JPX request failed after {attempts} attempts: {kind}')
+            await asyncio.sleep(backoff * 2 ** attempt)
+
+
+async def _drive(base_url: str, controller: Optional[AIMDController], fixed: int, duration: float,
+                 pages: int) -> dict:
+    """Fetch results pages for `duration` seconds with AIMD or a fixed number of workers"""
+    import requests
+
+    from crawler import build_search_params, create_session
+
+    url = f"{base_url}/tseHpFront/JJK020010Action.do"
+    search_params = build_search_params(['prime'])
+    stop_at = time.monotonic() + duration
+    results = {'pages': 0, 'failures': 0, 'latencies': [], 'per_second': {}}
+    started_at = time.monotonic()
+
+    def fetch(session, page, timeout):
+        from crawler import fetch_results_page
+        return fetch_results_page(session, url, search_params, page, timeout=timeout)
+
+    async def worker(index: int):
+        session = create_session()
+        page = index % pages + 1
+        while time.monotonic() < stop_at:
+            requested_at = time.monotonic()
+            try:
+                if controller is not None:
+                    await controller.request(lambda timeout: fetch(session, page, timeout), attempts=1)
+                else:
+                    response = await asyncio.to_thread(fetch, session, page, 30.0)
+                    if classify_failure(response):
+                        raise RuntimeError('error page')
+                results['pages'] += 1
+                results['latencies'].append(time.monotonic() - requested_at)
+                second = int(time.monotonic() - started_at)
+                results['per_second'][second] = results['per_second'].get(second, 0) + 1
+            except (requests.RequestException, RuntimeError):
+                results['failures'] += 1
+                await asyncio.sleep(0.1)
+            page = page % pages + 1
+        session.close()
+
+    async def sample():
+        # One timeline row per second
+        while time.monotonic() < stop_at:
+            await asyncio.sleep(1.0)
+            controller._snapshot('tick')
+
+    workers = controller.max_limit if controller is not None else fixed
+    # The fixed run goes through to_thread, give it as many threads as workers too
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=int(workers)))
+    tasks = [worker(i) for i in range(int(workers))]
+    if controller is not None:
+        tasks.append(sample())
+    await asyncio.gather(*tasks)
+    return results
+
+
+def demo(duration: float = 20.0, fixed: int = 24) -> None:
+    """
+    AIMD vs a fixed worker count against the mock server
+
+    The mock runs healthy, then 5× slower from 30% to 60% of the run with 5%
+    error pages, then healthy again; it queues past 8 requests in flight and
+    rejects past 16.
+    """
+    from mock_server import MockJPXServer
+
+    phases = [(duration * 0.3, duration * 0.6, 5.0, 0.05)]
+    print(f"\n🧪 AIMD demo: {duration:.0f} s per run, slowdown ×5 from {phases[0][0]:.0f} s "
+          f"to {phases[0][1]:.0f} s, mock capacity 8")
+
+    for label in ('aimd', f'fixed-{fixed}'):
+        mock = MockJPXServer(base_latency=0.1, capacity=8, overload=16, phases=phases)
+        base_url = mock.start()
+        controller = AIMDController(initial=2, max_limit=fixed, min_timeout=0.5) if label == 'aimd' else None
+        started_at = time.monotonic()
+        try:
+            results = asyncio.run(_drive(base_url, controller, fixed, duration, pages=20))
+        finally:
+            mock.stop()
+
+        latencies = results['latencies']
+        print(f"\n📈 {label}: {results['pages']} pages ({results['pages'] / duration:.1f}/s), "
+              f"{results['failures']} failures, end-to-end p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, server max in flight "
+              f"{mock.stats['max_in_flight']}, rejected {mock.stats['rejected']}")
+
+        if controller is not None:
+            print(f"{'t s':>5} {'limit':>6} {'in flight':>9} {'p95 ms':>7} {'timeout s':>9} {'err %':>6}  event")
+            for row in controller.timeline:
+                print(f"{row['at'] - started_at:>5.1f} {row['limit']:>6.1f} {row['in_flight']:>9} "
+                      f"{row['p95_s'] * 1000:>7.0f} {row['timeout_s']:>9.2f} {row['error_rate'] * 100:>5.0f}%  "
+                      f"{row['event']}")
+            print(f"✂️ Cuts: {controller.stats['cuts']}, failures: {controller.stats['failure_kinds']}")
+
+
+if __name__ == "__main__":
+    demo(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0)
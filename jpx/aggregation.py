@@ -0,0 +1,217 @@
+import heapq
+import os
+import sys
+import time
+from array import array
+from typing import Dict, List, Tuple
+
+
+DEFAULT_DIMENSIONS = ('market_segment', 'industry', 'fiscal_year_end')
+UNKNOWN = 'Unknown'
+
+
+class StreamingAggregator:
+    """
+    Incremental company counts over several dimensions
+
+    Every dimension is dictionary-encoded (value -> small int id). Counts are
+    kept in compact integer arrays: one marginal array per dimension and one
+    array of cell counts, where a cell is a distinct combination of ids seen so
+    far. update() is O(page), rollups and top-k only walk the marginals or the
+    cells, never the company records.
+
+    hidden_dimensions are read from company['hidden_fields'], e.g. 'szkbuNm'.
+    """
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS, hidden_dimensions=()):
+        self.dimensions = tuple(dimensions) + tuple(hidden_dimensions)
+        self._hidden = [False] * len(dimensions) + [True] * len(hidden_dimensions)
+        self._positions = {name: i for i, name in enumerate(self.dimensions)}
+
+        self._values = [[] for _ in self.dimensions]
+        self._ids = [{} for _ in self.dimensions]
+        self._marginals = [array('Q') for _ in self.dimensions]
+        # value id -> slots of the cells holding it, filters start from the shortest one
+        self._cell_postings = [[] for _ in self.dimensions]
+
+        self._cell_slots = {}
+        self._cell_keys = []
+        self._cell_counts = array('Q')
+        self.total = 0
+
+    def _encode(self, position: int, value) -> int:
+        ids = self._ids[position]
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(self._values[position])
+            self._values[position].append(value)
+            self._marginals[position].append(0)
+            self._cell_postings[position].append(array('I'))
+        return value_id
+
+    def update(self, companies: list) -> None:
+        """Add one page of companies"""
+        for company in companies:
+            hidden_fields = company.get('hidden_fields') or {}
+            key = []
+            for position, name in enumerate(self.dimensions):
+                source = hidden_fields if self._hidden[position] else company
+                value_id = self._encode(position, source.get(name, UNKNOWN))
+                self._marginals[position][value_id] += 1
+                key.append(value_id)
+
+            key = tuple(key)
+            slot = self._cell_slots.get(key)
+            if slot is None:
+                slot = self._cell_slots[key] = len(self._cell_keys)
+                self._cell_keys.append(key)
+                self._cell_counts.append(0)
+                for position, value_id in enumerate(key):
+                    self._cell_postings[position][value_id].append(slot)
+            self._cell_counts[slot] += 1
+
+        self.total += len(companies)
+
+    def _position(self, dimension: str) -> int:
+        try:
+            return self._positions[dimension]
+        except KeyError:
+            raise ValueError(f'Unknown dimension {dimension!r}, known: {self.dimensions}') from None
+
+    def _cells(self, filters: dict):
+        """(key, count) of cells matching filters, None if a filter value was never seen"""
+        wanted = []
+        for dimension, value in filters.items():
+            position = self._position(dimension)
+            value_id = self._ids[position].get(value)
+            if value_id is None:
+                return None
+            wanted.append((position, value_id))
+
+        if not wanted:
+            return zip(self._cell_keys, self._cell_counts)
+
+        wanted.sort(key=lambda item: len(self._cell_postings[item[0]][item[1]]))
+        (position, value_id), rest = wanted[0], wanted[1:]
+        keys = self._cell_keys
+        counts = self._cell_counts
+        return (
+            (keys[slot], counts[slot]) for slot in self._cell_postings[position][value_id]
+            if all(keys[slot][p] == v for p, v in rest)
+        )
+
+    def count(self, **filters) -> int:
+        """Companies matching all filters, e.g. count(market_segment='Prime')"""
+        if not filters:
+            return self.total
+        if len(filters) == 1:
+            (dimension, value), = filters.items()
+            position = self._position(dimension)
+            value_id = self._ids[position].get(value)
+            return 0 if value_id is None else self._marginals[position][value_id]
+
+        cells = self._cells(filters)
+        return 0 if cells is None else sum(count for _, count in cells)
+
+    def rollup(self, *dimensions: str, **filters) -> Dict:
+        """
+        Counts grouped by dimensions, restricted by filters
+
+        One dimension gives {value: count}, several give {(value, ...): count}.
+        """
+        positions = [self._position(d) for d in dimensions]
+
+        if len(positions) == 1 and not filters:
+            position = positions[0]
+            return dict(zip(self._values[position], self._marginals[position]))
+
+        cells = self._cells(filters)
+        if cells is None:
+            return {}
+
+        grouped = {}
+        for key, count in cells:
+            group = tuple(key[p] for p in positions)
+            grouped[group] = grouped.get(group, 0) + count
+
+        result = {}
+        for group, count in grouped.items():
+            values = tuple(self._values[p][value_id] for p, value_id in zip(positions, group))
+            result[values[0] if len(values) == 1 else values] = count
+        return result
+
+    def top_k(self, dimension: str, k: int = 10, **filters) -> List[Tuple[str, int]]:
+        """k most frequent values of dimension as (value, count), largest first"""
+        if filters:
+            items = self.rollup(dimension, **filters).items()
+        else:
+            position = self._position(dimension)
+            items = zip(self._values[position], self._marginals[position])
+        return heapq.nlargest(k, items, key=lambda item: item[1])
+
+    def statistics(self) -> dict:
+        """Legacy statistics block of the result files"""
+        statistics = {}
+        for key, dimension in (('segments', 'market_segment'), ('industries', 'industry'),
+                               ('fiscal_year_ends', 'fiscal_year_end')):
+            if dimension not in self._positions:
+                continue
+            counts = self.rollup(dimension)
+            if key != 'segments':
+                counts = dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+            statistics[key] = counts
+        return statistics
+
+
+def _time_op(func, repeat: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def benchmark(companies: list, label: str, page_size: int = 500) -> dict:
+    print(f"\n⏱️ {label}: {len(companies):,} companies")
+
+    aggregator = StreamingAggregator()
+    start = time.perf_counter()
+    for i in range(0, len(companies), page_size):
+        aggregator.update(companies[i:i + page_size])
+    update_s = time.perf_counter() - start
+
+    sample = companies[len(companies) // 2]
+    segment = sample['market_segment']
+    industry = sample['industry']
+
+    def rescan_count():
+        return sum(1 for c in companies if c['market_segment'] == segment and c['industry'] == industry)
+
+    results = {
+        'update_s': update_s,
+        'cells': len(aggregator._cell_keys),
+        'count_us': _time_op(lambda: aggregator.count(market_segment=segment, industry=industry), 200),
+        'rescan_count_us': _time_op(rescan_count, 3),
+        'top_k_us': _time_op(lambda: aggregator.top_k('industry', 10), 2000),
+        'filtered_top_k_us': _time_op(lambda: aggregator.top_k('fiscal_year_end', 3, market_segment=segment), 200),
+        'rollup_us': _time_op(lambda: aggregator.rollup('market_segment', 'industry'), 200),
+    }
+
+    print(f"  Update: {update_s:.2f} s ({len(companies) / update_s:,.0f} companies/s), {results['cells']} cells")
+    print(f"  Count {segment} × {industry}: {results['count_us']:.1f} µs "
+          f"(rescan: {results['rescan_count_us']:,.0f} µs)")
+    print(f"  Top 10 industries: {results['top_k_us']:.1f} µs")
+    print(f"  Top fiscal year ends in {segment}: {results['filtered_top_k_us']:.1f} µs")
+    print(f"  Rollup segment × industry: {results['rollup_us']:.1f} µs")
+    return results
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    from company_index import SNAPSHOT_PATH, load_snapshot
+    from synthetic_pages import synthetic_companies
+
+    if os.path.exists(SNAPSHOT_PATH):
+        benchmark(load_snapshot(), 'Latest JPX snapshot')
+    benchmark(synthetic_companies(rows), 'Synthetic')
@@ -0,0 +1,257 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+from typing import List, Optional
+
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jpx_all_companies.json')
+
+
+class CompanyIndex:
+    """
+    Immutable in-memory index over crawled JPX companies
+
+    - by_code: hash map code -> company
+    - segment / industry: dictionary-encoded, each id (and each segment × industry
+      pair) has a sorted postings list of row ids
+    - names: sorted casefolded name array for prefix search
+    """
+
+    def __init__(self, companies: list):
+        self.companies = companies
+        self.by_code = {}
+
+        self.segments = []
+        self.industries = []
+        self._segment_ids = {}
+        self._industry_ids = {}
+        self._segment_postings = []
+        self._industry_postings = []
+        # (segment_id, industry_id) -> rows, so the common combined filter needs no intersection
+        self._pair_postings = {}
+
+        names = []
+        for row, company in enumerate(companies):
+            code = company.get('code')
+            if code:
+                self.by_code[code] = company
+
+            segment_id = self._encode(company.get('market_segment', ''), self.segments,
+                                      self._segment_ids, self._segment_postings)
+            self._segment_postings[segment_id].append(row)
+
+            industry_id = self._encode(company.get('industry', ''), self.industries,
+                                       self._industry_ids, self._industry_postings)
+            self._industry_postings[industry_id].append(row)
+
+            pair = self._pair_postings.get((segment_id, industry_id))
+            if pair is None:
+                pair = self._pair_postings[(segment_id, industry_id)] = array('I')
+            pair.append(row)
+
+            names.append(((company.get('name') or '').casefold(), row))
+
+        names.sort()
+        self._name_keys = [key for key, _ in names]
+        self._name_rows = array('I', (row for _, row in names))
+
+    @staticmethod
+    def _encode(value, dictionary, ids, postings) -> int:
+        key = value.casefold()
+        value_id = ids.get(key)
+        if value_id is None:
+            value_id = len(dictionary)
+            ids[key] = value_id
+            dictionary.append(value)
+            postings.append(array('I'))
+        return value_id
+
+    def __len__(self):
+        return len(self.companies)
+
+    def get(self, code: str) -> Optional[dict]:
+        """Company by 5-digit code (4-digit securities codes are accepted too)"""
+        if len(code) == 4:
+            code += '0'
+        return self.by_code.get(code)
+
+    def _rows(self, segment: Optional[str], industry: Optional[str]):
+        segment_id = industry_id = None
+        if segment is not None:
+            segment_id = self._segment_ids.get(segment.casefold())
+            if segment_id is None:
+                return array('I')
+        if industry is not None:
+            industry_id = self._industry_ids.get(industry.casefold())
+            if industry_id is None:
+                return array('I')
+
+        if segment_id is not None and industry_id is not None:
+            return self._pair_postings.get((segment_id, industry_id), array('I'))
+        if segment_id is not None:
+            return self._segment_postings[segment_id]
+        if industry_id is not None:
+            return self._industry_postings[industry_id]
+        return range(len(self.companies))
+
+    def filter(self, segment: Optional[str] = None, industry: Optional[str] = None,
+               limit: Optional[int] = None) -> List[dict]:
+        """Companies matching segment and/or industry (case-insensitive)"""
+        rows = self._rows(segment, industry)
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.companies[row] for row in rows]
+
+    def count(self, segment: Optional[str] = None, industry: Optional[str] = None) -> int:
+        return len(self._rows(segment, industry))
+
+    def prefix(self, prefix: str, limit: int = 20) -> List[dict]:
+        """Companies whose name starts with prefix (case-insensitive), sorted by name"""
+        key = prefix.casefold()
+        start = bisect.bisect_left(self._name_keys, key)
+
+        results = []
+        for i in range(start, len(self._name_keys)):
+            if len(results) >= limit or not self._name_keys[i].startswith(key):
+                break
+            results.append(self.companies[self._name_rows[i]])
+        return results
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH) -> list:
+    """Companies from a crawl result file (full or simplified format) as CompanyRecords"""
+    from company_record import CompanyRecord
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return [CompanyRecord.from_dict(company) for company in json.load(f).get('companies', [])]
+
+
+class CompanyIndexStore:
+    """
+    Lazily built index over the latest snapshot file
+
+    The index is rebuilt off to the side when the snapshot changes on disk and
+    then swapped in with a single reference assignment, so readers always see
+    either the old or the new index, never a half-built one.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._index = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._build_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def get(self) -> CompanyIndex:
+        """Index over the snapshot, built on first use and rebuilt when the file changes"""
+        index = self._index
+        now = time.monotonic()
+        if index is None or now - self._checked_at > self.check_interval:
+            self._checked_at = now
+            if index is None or self._snapshot_mtime() != self._mtime:
+                self.reload()
+        return self._index
+
+    def _snapshot_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> None:
+        """Rebuild from the snapshot file and swap atomically"""
+        with self._build_lock:
+            mtime = self._snapshot_mtime()
+            if self._index is not None and mtime == self._mtime:
+                return  # another thread already rebuilt it
+            index = CompanyIndex(load_snapshot(self.path))
+            self._mtime = mtime
+            self._index = index
+
+    def swap(self, companies: list) -> None:
+        """Swap in companies from a crawl that just finished in this process"""
+        index = CompanyIndex(companies)
+        with self._build_lock:
+            self._mtime = self._snapshot_mtime()
+            self._index = index
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def default_store() -> CompanyIndexStore:
+    """Process-wide store over SNAPSHOT_PATH, the MCP server's jpx_company lookups read it"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = CompanyIndexStore()
+        return _default_store
+
+
+def publish(path: str, companies: list) -> None:
+    """
+    A crawl in this process just wrote companies to path: swap them into the
+    default store if it is loaded and serves that file, instead of having it
+    parse the file again. Other processes pick the file up by its mtime.
+    """
+    store = _default_store
+    if store is not None and store.loaded and os.path.abspath(path) == os.path.abspath(store.path):
+        store.swap(companies)
+
+
+def _time_op(func, repeat: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def benchmark(companies: list, label: str, repeat: int = 2000) -> dict:
+    print(f"\n⏱️ {label}: {len(companies):,} companies")
+
+    start = time.perf_counter()
+    index = CompanyIndex(companies)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    sample = companies[len(companies) // 2]
+    code = sample['code']
+    segment = sample['market_segment']
+    industry = sample['industry']
+    name_prefix = sample['name'][:3]
+
+    results = {
+        'build_ms': build_ms,
+        'by_code_us': _time_op(lambda: index.get(code), repeat),
+        'scan_by_code_us': _time_op(lambda: next(c for c in companies if c['code'] == code), 5),
+        'count_segment_industry_us': _time_op(lambda: index.count(segment, industry), repeat // 10 or 1),
+        'filter_top20_us': _time_op(lambda: index.filter(segment, industry, limit=20), repeat // 10 or 1),
+        'prefix_us': _time_op(lambda: index.prefix(name_prefix), repeat),
+    }
+
+    print(f"  Build: {results['build_ms']:.1f} ms")
+    print(f"  By code: {results['by_code_us']:.2f} µs (linear scan: {results['scan_by_code_us']:.0f} µs)")
+    print(f"  Count {segment} × {industry}: {results['count_segment_industry_us']:.1f} µs")
+    print(f"  Filter top 20: {results['filter_top20_us']:.1f} µs")
+    print(f"  Prefix '{name_prefix}': {results['prefix_us']:.2f} µs")
+    return results
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    from synthetic_pages import synthetic_companies
+
+    if os.path.exists(SNAPSHOT_PATH):
+        benchmark(load_snapshot(), 'Latest JPX snapshot')
+    benchmark(synthetic_companies(rows), 'Synthetic')
@@ -0,0 +1,356 @@
+import gc
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping, MutableMapping
+from typing import Optional, Tuple
+
+# Columns with a few dozen distinct values across all listed companies
+CATEGORICAL = ('market_segment', 'industry', 'fiscal_year_end', 'alerts')
+
+# Fixed keys in the order parse_companies_from_soup used to build its dicts
+FIELDS = ('index', 'code', 'name') + CATEGORICAL + ('links', 'hidden_fields', 'page')
+
+
+class HiddenSchema:
+    """Field names of one hidden_fields layout, shared by every record that has it"""
+
+    __slots__ = ('fields', 'positions')
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = tuple(sys.intern(field) for field in fields)
+        self.positions = {field: i for i, field in enumerate(self.fields)}
+
+    def __reduce__(self):
+        # Unpickled schemas (e.g. from parse_pool workers) land on the registry one
+        return schema_for, (self.fields,)
+
+
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+
+def _intern(value):
+    """Interned categorical value; None (a deleted or unset key) and non-strings stay as they are"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def schema_for(fields: Tuple[str, ...]) -> HiddenSchema:
+    """The one HiddenSchema for this tuple of field names"""
+    schema = _schemas.get(fields)
+    if schema is None:
+        with _schemas_lock:
+            schema = _schemas.setdefault(fields, HiddenSchema(fields))
+    return schema
+
+
+class HiddenFields(Mapping):
+    """Read-only {field: value} view over a value tuple laid out by a HiddenSchema"""
+
+    __slots__ = ('schema', 'values')
+
+    def __init__(self, schema: HiddenSchema, values: tuple):
+        self.schema = schema
+        self.values = values
+
+    def __getitem__(self, field):
+        return self.values[self.schema.positions[field]]
+
+    def __iter__(self):
+        return iter(self.schema.fields)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return HiddenFields, (self.schema, self.values)
+
+
+class CompanyRecord(MutableMapping):
+    """
+    One JPX company as a slotted record instead of a dict of dicts
+
+    Reads and writes like the dict parse_companies_from_soup used to return
+    (company['code'], company.get('links', {}), company['page'] = 2, ...), so
+    existing consumers keep working. Categorical values are interned,
+    hidden_fields share one schema per layout and reuse the code / name /
+    column strings they repeat, links are one slot for the stock detail URL.
+    Keys outside FIELDS (source, job, detail, ...) go to a dict created on
+    first use.
+    """
+
+    __slots__ = ('index', 'code', 'name', 'market_segment', 'industry', 'fiscal_year_end', 'alerts',
+                 'stock_prices_url', 'other_links', 'hidden', 'page', 'extra')
+
+    def __init__(self, code: str, name: str = '', market_segment: str = '', industry: str = '',
+                 fiscal_year_end: str = '', alerts: Optional[str] = '', links: Optional[dict] = None,
+                 hidden_fields: Optional[Mapping] = None, page: Optional[int] = None,
+                 index: Optional[int] = None):
+        self.index = index
+        self.code = code
+        self.name = name
+        self.market_segment = _intern(market_segment)
+        self.industry = _intern(industry)
+        self.fiscal_year_end = _intern(fiscal_year_end)
+        self.alerts = _intern(alerts)
+        self.page = page
+        self.extra = None
+        self._set_links(links)
+        self._set_hidden(hidden_fields)
+
+    def _set_links(self, links: Optional[dict]) -> None:
+        if links is None:
+            self.stock_prices_url = self.other_links = None
+            return
+        links = dict(links)
+        self.stock_prices_url = links.pop('stock_prices_url', None)
+        self.other_links = tuple(links.items()) or None
+        if self.stock_prices_url is None and self.other_links is None:
+            # An explicit empty dict stays an (empty) links key
+            self.other_links = ()
+
+    def _share(self, value):
+        """The record's own string when a hidden value repeats a column, else the interned value"""
+        if not isinstance(value, str):
+            return value
+        for column in (self.code, self.name, self.market_segment, self.industry, self.fiscal_year_end):
+            if value == column:
+                return column
+        return sys.intern(value)
+
+    def _set_hidden(self, hidden_fields: Optional[Mapping]) -> None:
+        if hidden_fields is None or isinstance(hidden_fields, HiddenFields):
+            self.hidden = hidden_fields
+            return
+        schema = schema_for(tuple(hidden_fields))
+        self.hidden = HiddenFields(schema, tuple(self._share(value) for value in hidden_fields.values()))
+
+    @property
+    def links(self) -> Optional[dict]:
+        if self.stock_prices_url is None and self.other_links is None:
+            return None
+        links = dict(self.other_links or ())
+        if self.stock_prices_url is not None:
+            links['stock_prices_url'] = self.stock_prices_url
+        return links
+
+    def __getitem__(self, key):
+        if key == 'links':
+            value = self.links
+        elif key == 'hidden_fields':
+            value = self.hidden
+        elif key in FIELDS:
+            value = getattr(self, key)
+        elif self.extra is not None:
+            return self.extra[key]
+        else:
+            raise KeyError(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == 'links':
+            self._set_links(value)
+        elif key == 'hidden_fields':
+            self._set_hidden(value)
+        elif key in CATEGORICAL:
+            setattr(self, key, _intern(value))
+        elif key in FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in FIELDS:
+            if key not in self:
+                raise KeyError(key)
+            self[key] = None
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in FIELDS:
+            if key in self:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'CompanyRecord({self.to_dict()!r})'
+
+    def __reduce__(self):
+        # Slot values only: records cross the parse_pool process boundary for every page
+        return _rebuild, (self.index, self.code, self.name, self.market_segment, self.industry,
+                          self.fiscal_year_end, self.alerts, self.stock_prices_url, self.other_links,
+                          self.hidden, self.page, self.extra)
+
+    def to_dict(self) -> dict:
+        """Plain nested dicts, the JSON shape of the crawl result files"""
+        data = {}
+        for key in self:
+            value = self[key]
+            data[key] = dict(value) if isinstance(value, HiddenFields) else value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'CompanyRecord':
+        """Record from a crawl result dict (full or simplified format)"""
+        if isinstance(data, CompanyRecord):
+            return data
+        data = dict(data)
+        links = data.pop('links', None)
+        if 'stock_prices_url' in data:
+            # Simplified format keeps the detail link at the top level
+            url = data.pop('stock_prices_url')
+            if url:
+                links = {**(links or {}), 'stock_prices_url': url}
+        record = cls(code=data.pop('code', ''), name=data.pop('name', ''),
+                     market_segment=data.pop('market_segment', '') or '', industry=data.pop('industry', '') or '',
+                     fiscal_year_end=data.pop('fiscal_year_end', '') or '', alerts=data.pop('alerts', None),
+                     links=links, hidden_fields=data.pop('hidden_fields', None), page=data.pop('page', None),
+                     index=data.pop('index', None))
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+
+def _rebuild(index, code, name, market_segment, industry, fiscal_year_end, alerts, stock_prices_url,
+             other_links, hidden, page, extra) -> CompanyRecord:
+    record = CompanyRecord.__new__(CompanyRecord)
+    record.index = index
+    record.code = code
+    record.name = name
+    record.market_segment = _intern(market_segment)
+    record.industry = _intern(industry)
+    record.fiscal_year_end = _intern(fiscal_year_end)
+    record.alerts = _intern(alerts)
+    record.stock_prices_url = stock_prices_url
+    record.other_links = other_links
+    record.hidden = hidden
+    record.page = page
+    record.extra = extra
+    return record
+
+
+def to_json(value):
+    """json.dump(..., default=to_json), lets every JSON sink write records as before"""
+    if isinstance(value, CompanyRecord):
+        return value.to_dict()
+    if isinstance(value, HiddenFields):
+        return dict(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (Linux /proc, peak RSS elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _fresh(value: str) -> str:
+    """A new string object with the same text, as every soup get_text() returns"""
+    return (value + ' ')[:-1]
+
+
+def _parsed_dicts(companies: list):
+    """The dicts parse_companies_from_soup built for these companies"""
+    for company in companies:
+        code = _fresh(company['code'])
+        url = f"https://quote.jpx.co.jp/jpxhp/main/index.aspx?F=e_stock_detail&disptype=information&qcode={code[:4]}"
+        yield {
+            'code': code,
+            'name': _fresh(company['name']),
+            'market_segment': _fresh(company['market_segment']),
+            'industry': _fresh(company['industry']),
+            'fiscal_year_end': _fresh(company['fiscal_year_end']),
+            'alerts': _fresh(company.get('alerts') or ''),
+            'links': {'stock_prices_url': url},
+            'hidden_fields': {
+                'eqMgrCd': _fresh(company['code']),
+                'eqMgrNm': _fresh(company['name']),
+                'szkbuNm': _fresh(company['market_segment']),
+                'gyshDspNm': _fresh(company['industry']),
+                'dspYuKssnKi': _fresh(company['fiscal_year_end']),
+            },
+            'page': company.get('page') or 1,
+        }
+
+
+def _measure(layout: str, count: int) -> Tuple[int, int, float]:
+    """(companies, RSS growth in bytes, build seconds) for one layout, run in a fresh process
+
+    count 0 measures the latest snapshot.
+    """
+    import json
+
+    from company_index import SNAPSHOT_PATH
+    from synthetic_pages import synthetic_companies
+
+    if count:
+        source = synthetic_companies(count)
+    else:
+        with open(SNAPSHOT_PATH, 'r', encoding='utf-8') as f:
+            source = json.load(f)['companies']
+    # Only the source's distinct texts stay alive, every layout copies them anyway
+    gc.collect()
+    before = _rss_bytes()
+
+    start = time.perf_counter()
+    if layout == 'dict':
+        companies = list(_parsed_dicts(source))
+    else:
+        companies = [CompanyRecord.from_dict(data) for data in _parsed_dicts(source)]
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    grown = _rss_bytes() - before
+    return len(companies), grown, elapsed
+
+
+def benchmark(count: int) -> dict:
+    """RSS held by the latest snapshot and by `count` synthetic companies, dicts vs CompanyRecord"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from company_index import SNAPSHOT_PATH
+
+    runs = [('Latest JPX snapshot', 0)] if os.path.exists(SNAPSHOT_PATH) else []
+    runs.append(('Synthetic', count))
+
+    results = {}
+    for label, rows in runs:
+        measured = {}
+        for layout in ('dict', 'record'):
+            # One process per layout, freed arenas of a previous run would hide growth
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                measured[layout] = executor.submit(_measure, layout, rows).result()
+
+        companies, dict_bytes, dict_s = measured['dict']
+        _, record_bytes, record_s = measured['record']
+        print(f"\n⏱️ {label}: {companies:,} companies")
+        print(f"  dicts: {dict_bytes / 1e6:.1f} MB RSS ({dict_bytes / companies:.0f} B/company), "
+              f"built in {dict_s:.2f} s")
+        print(f"  CompanyRecord: {record_bytes / 1e6:.1f} MB RSS ({record_bytes / companies:.0f} B/company), "
+              f"built in {record_s:.2f} s (x{dict_bytes / max(record_bytes, 1):.1f} smaller)")
+        results[label] = {'companies': companies, 'dict_bytes': dict_bytes, 'record_bytes': record_bytes}
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
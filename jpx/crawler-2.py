@@ -1,25 +1,76 @@
 import asyncio
+import inspect
 import json
 import re
+import uuid
 from datetime import datetime
 from crawlee.crawlers import BeautifulSoupCrawler, BeautifulSoupCrawlingContext
-from crawlee import Request
+from crawlee import ConcurrencySettings, Request
+
+from aggregation import StreamingAggregator
+from company_index import publish
+from company_record import to_json
+from crawler import parse_companies_from_soup, write_json_atomic
+from page_state import extract_form_fields
+from profiling import page_done, profiled
+from session_pool import default_pool
+
+
+class PageResultCollector:
+    """
+    Concurrency-safe collector for per-page results.
+
+    Handlers for different pages run concurrently in crawlee's autoscaled
+    pool, so everything that used to live on the scraper instance goes here
+    behind a lock.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._pages = {}
+        self.statistics = StreamingAggregator()
+        self.total_items = None
+        self.total_pages = None
+
+    async def add_page(self, page: int, companies: list) -> None:
+        """Store companies of one page and update statistics"""
+        async with self._lock:
+            self._pages[page] = companies
+            self.statistics.update(companies)
+
+    async def set_totals(self, total_items, total_pages) -> bool:
+        """Record pagination totals, returns True only for the first caller"""
+        async with self._lock:
+            if self.total_pages is not None:
+                return False
+            self.total_items = total_items
+            self.total_pages = total_pages
+            return True
+
+    @property
+    def pages_processed(self) -> int:
+        return len(self._pages)
+
+    @property
+    def companies(self) -> list:
+        """All companies ordered by page number"""
+        return [company for page in sorted(self._pages) for company in self._pages[page]]
 
 
 class JPXScraperSimple:
     """
     Simple JPX scraper using BeautifulSoupCrawler
+
+    Handlers are stateless: page number and search parameters travel in each
+    request's user_data, results are aggregated in a PageResultCollector.
     """
 
-    def __init__(self, max_pages=None, delay=1):
+    def __init__(self, max_pages=None, delay=1, max_concurrency=5):
         self.max_pages = max_pages
         self.delay = delay
-        self.all_companies = []
-        self.all_statistics = {'segments': {}, 'industries': {}}
-        self.current_page = 1
-        self.total_items = None
-        self.total_pages = None
-        self.session_id = "00B11CD09F0EE52A255F89C8F3D3F8A21"
+        self.results = PageResultCollector()
+        # Leased from the shared session pool for the duration of a scrape
+        self.session_id = None
 
         # Default search parameters
         self.search_params = {
@@ -33,13 +84,28 @@ class JPXScraperSimple:
             'szkbuChkbx': '011'
         }
 
+        # Pages are independent once totals are known, let the pool scale; with pages
+        # in flight at once, delay is a request rate for the whole pool, not a sleep per handler
+        concurrency = {'max_concurrency': max_concurrency}
+        if delay and delay > 0:
+            concurrency['max_tasks_per_minute'] = 60 / delay
+
         # Initialize BeautifulSoup crawler - much simpler!
         self.crawler = BeautifulSoupCrawler(
             max_requests_per_crawl=1000,
             max_request_retries=3,
+            concurrency_settings=ConcurrencySettings(**concurrency),
             # Removed use_extended_unique_key as it's not supported
         )
 
+    @property
+    def all_companies(self) -> list:
+        return self.results.companies
+
+    @property
+    def all_statistics(self) -> dict:
+        return self.results.statistics
+
     async def setup_handlers(self):
         """Setup request handlers"""
 
@@ -50,11 +116,12 @@ class JPXScraperSimple:
             context.log.info(f"First request URL: {context.request.url}")
             context.log.info(f"First request status: successful")
 
+            search_params = context.request.user_data.get('search_params', self.search_params)
+
             # Now make SECOND POST request to the SAME URL with SAME parameters
             # This is exactly like the working requests code
             same_url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
 
-            import uuid
             unique_id = str(uuid.uuid4())
 
             # SECOND request - SAME URL, SAME parameters, but this one will return actual results
@@ -67,9 +134,10 @@ class JPXScraperSimple:
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                     'X-Second-Request': unique_id  # Mark as second request
                 },
-                payload=self._encode_form_data(self.search_params).encode('utf-8'),  # SAME payload
+                payload=self._encode_form_data(search_params).encode('utf-8'),  # SAME payload
                 label="SECOND_REQUEST",  # Different label to distinguish
-                unique_key=f"second_post_request_{unique_id}"
+                unique_key=f"second_post_request_{unique_id}",
+                user_data={'page': 1, 'search_params': search_params}
             )
 
             context.log.info(f"📤 Enqueueing SECOND POST request to SAME URL")
@@ -79,9 +147,11 @@ class JPXScraperSimple:
         @self.crawler.router.handler('SECOND_REQUEST')
         async def handle_second_request(context: BeautifulSoupCrawlingContext) -> None:
             """Handle SECOND POST request - this one has the actual results"""
+            page = context.request.user_data.get('page', 1)
+
             context.log.info("🎉 SECOND POST REQUEST: Getting actual results!")
             context.log.info(f"Second request URL: {context.request.url}")
-            context.log.info(f"📄 Processing page {self.current_page}")
+            context.log.info(f"📄 Processing page {page}")
 
             # NOW we have the actual results page - BeautifulSoup already parsed!
             soup = context.soup
@@ -90,7 +160,7 @@ class JPXScraperSimple:
             # Parse companies using our existing function
             page_companies = self._parse_companies_from_soup(soup)
 
-            context.log.info(f"📊 Found {len(page_companies)} companies on page {self.current_page}")
+            context.log.info(f"📊 Found {len(page_companies)} companies on page {page}")
 
             # If no companies found, let's debug
             if len(page_companies) == 0:
@@ -109,41 +179,40 @@ class JPXScraperSimple:
 
             # Add metadata to companies
             for company in page_companies:
-                company['page'] = self.current_page
+                company['page'] = page
                 company['scraped_at'] = datetime.now().isoformat()
 
             # Push to Crawlee dataset
             if page_companies:
-                await context.push_data(page_companies)
+                await context.push_data([company.to_dict() for company in page_companies])
                 context.log.info(f"💾 Pushed {len(page_companies)} companies to dataset")
 
-            # Add to our list
-            self.all_companies.extend(page_companies)
-            self.update_statistics(page_companies, self.all_statistics)  # Fix: use self.update_statistics
+            await self.results.add_page(page, page_companies)
+
+            page_done()
 
             # Save HTML
-            await self._save_page_html(str(soup), self.current_page)
+            await self._save_page_html(str(soup), page)
 
             # Check pagination
             pagination_info = self.extract_pagination_info(soup)  # Fix: use self.extract_pagination_info
 
             if pagination_info:
-                self.total_items = pagination_info.get('total_items')
-                self.total_pages = pagination_info.get('total_pages')
+                total_items = pagination_info.get('total_items')
+                total_pages = pagination_info.get('total_pages')
                 has_next = pagination_info.get('has_next_page', False)
 
                 context.log.info(
-                    f"📖 Pagination: page {pagination_info.get('current_page')}/{self.total_pages}, items: {self.total_items}, has_next: {has_next}")
+                    f"📖 Pagination: page {pagination_info.get('current_page')}/{total_pages}, items: {total_items}, has_next: {has_next}")
 
-                # Check if we should continue
-                if self._should_continue_pagination(has_next, len(page_companies)):
-                    await self._enqueue_next_page(context, soup)
-                else:
+                # Only the first results page fans out, the rest are already queued
+                first_totals = await self.results.set_totals(total_items, total_pages)
+                if first_totals and self._should_continue_pagination(page, has_next, len(page_companies)):
+                    await self._enqueue_remaining_pages(context)
+                elif first_totals:
                     context.log.info("🏁 Finished scraping")
-                    await self._save_final_results()
             else:
                 context.log.info("📖 No pagination found - single page")
-                await self._save_final_results()
 
         @self.crawler.router.handler('RESULTS_PAGE')  # Keep this for backward compatibility
         async def handle_results_page(context: BeautifulSoupCrawlingContext) -> None:
@@ -152,104 +221,27 @@ class JPXScraperSimple:
 
         @self.crawler.router.handler('PAGINATION_PAGE')
         async def handle_pagination_page(context: BeautifulSoupCrawlingContext) -> None:
-            """Handle pagination pages - exactly like working code"""
-            context.log.info(f"🔄 PAGINATION: Processing page {self.current_page}")
-
-            # For pagination, we need to process the current response first
-            # to get the form data, then make another request
-            soup = context.soup
-
-            # Look for JJK020030Form (results form with pagination)
-            form_030 = soup.find('form', attrs={'name': 'JJK020030Form'})
-
-            if form_030:
-                context.log.info(f"Found JJK020030Form for page {self.current_page}")
-
-                # Collect all hidden fields from the form
-                pagination_form_data = {}
-                hidden_inputs = form_030.find_all('input', {'type': 'hidden'})
-
-                for hidden in hidden_inputs:
-                    name = hidden.get('name')
-                    value = hidden.get('value', '')
-                    if name:
-                        pagination_form_data[name] = value
-
-                # Add pagination parameters
-                pagination_form_data.update({
-                    'Transition': 'Transition',
-                    'pageNo': str(self.current_page),
-                    'currentPage': str(self.current_page)
-                })
-
-                # Use results URL for pagination
-                url_results = "https://www2.jpx.co.jp/tseHpFront/JJK020030Action.do"
-
-                import uuid
-                unique_id = str(uuid.uuid4())
-
-                request = Request.from_url(
-                    url=url_results,
-                    method="POST",
-                    headers={
-                        'Content-Type': 'application/x-www-form-urlencoded',
-                        'Referer': url_results,
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    },
-                    payload=self._encode_form_data(pagination_form_data).encode('utf-8'),
-                    label="SECOND_REQUEST",  # Reuse second request handler
-                    unique_key=f"pagination_results_{self.current_page}_{unique_id}"
-                )
-
-                await context.add_requests([request])
-            else:
-                # Fallback: use original form (like working code)
-                context.log.info(f"JJK020030Form not found, using original form")
-
-                url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
-
-                import uuid
-                unique_id = str(uuid.uuid4())
-
-                request = Request.from_url(
-                    url=url,
-                    method="POST",
-                    headers={
-                        'Content-Type': 'application/x-www-form-urlencoded',
-                        'Referer': url,
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    },
-                    payload=self._encode_form_data(self.search_params).encode('utf-8'),
-                    label="SECOND_REQUEST",
-                    unique_key=f"fallback_results_{self.current_page}_{unique_id}"
-                )
-
-                await context.add_requests([request])
+            """Handle pagination pages - the enqueued JJK020030 POST already returned page N, parse it"""
+            context.log.info(f"🔄 PAGINATION: Processing page {context.request.user_data.get('page')}")
+            await handle_second_request(context)
 
     def update_statistics(self, companies, all_statistics):
         """
-        Update overall statistics (exactly like working code)
+        Update overall statistics (a StreamingAggregator)
         """
-        for company in companies:
-            segment = company.get('market_segment', 'Unknown')
-            industry = company.get('industry', 'Unknown')
-
-            all_statistics['segments'][segment] = all_statistics['segments'].get(segment, 0) + 1
-            all_statistics['industries'][industry] = all_statistics['industries'].get(industry, 0) + 1
+        all_statistics.update(companies)
 
     def show_final_statistics(self, all_statistics):
         """
         Show final statistics (exactly like working code)
         """
-        if all_statistics['segments']:
+        if all_statistics.total:
             print(f"\n📈 Statistics by segments:")
-            for segment, count in sorted(all_statistics['segments'].items()):
+            for segment, count in sorted(all_statistics.rollup('market_segment').items()):
                 print(f"  {segment}: {count}")
 
-        if all_statistics['industries']:
             print(f"\n🏭 Top 10 industries:")
-            top_industries = sorted(all_statistics['industries'].items(), key=lambda x: x[1], reverse=True)[:10]
-            for industry, count in top_industries:
+            for industry, count in all_statistics.top_k('industry', 10):
                 print(f"  {industry}: {count}")
 
     def save_results(self, all_companies, all_statistics, pages_processed, total_items):
@@ -263,16 +255,14 @@ class JPXScraperSimple:
             'pages_processed': pages_processed,
             'total_companies': len(all_companies),
             'expected_total_items': total_items,
-            'statistics': {
-                'segments': all_statistics['segments'],
-                'industries': dict(sorted(all_statistics['industries'].items(), key=lambda x: x[1], reverse=True))
-            },
+            'statistics': all_statistics.statistics(),
             'companies': all_companies
         }
 
-        with open('jpx_all_companies.json', 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        write_json_atomic('jpx_all_companies.json', result)
         print(f"\n💾 Full data: jpx_all_companies.json")
+        # Readers of this snapshot in this process (company_index.default_store) get the new crawl right away
+        publish('jpx_all_companies.json', all_companies)
 
         # Simplified data
         simple_result = {
@@ -294,8 +284,7 @@ class JPXScraperSimple:
             ]
         }
 
-        with open('jpx_all_companies_simple.json', 'w', encoding='utf-8') as f:
-            json.dump(simple_result, f, ensure_ascii=False, indent=2)
+        write_json_atomic('jpx_all_companies_simple.json', simple_result)
         print(f"💾 Simplified data: jpx_all_companies_simple.json")
 
         return result
@@ -352,13 +341,13 @@ class JPXScraperSimple:
 
         return pagination_info
 
-    def _should_continue_pagination(self, has_next: bool, companies_count: int) -> bool:
-        """Check if we should continue to next page"""
+    def _should_continue_pagination(self, page: int, has_next: bool, companies_count: int) -> bool:
+        """Check if there are more pages to enqueue after the given one"""
         if not has_next:
             print("🏁 Reached last page")
             return False
 
-        if self.max_pages and self.current_page >= self.max_pages:
+        if self.max_pages and page >= self.max_pages:
             print(f"🛑 Reached limit: {self.max_pages} pages")
             return False
 
@@ -366,223 +355,94 @@ class JPXScraperSimple:
             print("🛑 No companies on page")
             return False
 
-        if self.total_pages and self.current_page >= self.total_pages:
+        if self.results.total_pages and page >= self.results.total_pages:
             print("🏁 Reached last page by total count")
             return False
 
         return True
 
-    async def _enqueue_next_page(self, context: BeautifulSoupCrawlingContext, soup) -> None:
-        """Enqueue next page request"""
-        self.current_page += 1
-        print(f"⏱️ Moving to page {self.current_page}")
-
-        if self.delay > 0:
-            await asyncio.sleep(self.delay)
+    async def _form_fields(self, context: BeautifulSoupCrawlingContext):
+        """JJK020030Form hidden fields scanned from the raw body (page_state), None without the form"""
+        body = context.http_response.read()
+        if inspect.isawaitable(body):  # read() is async in newer crawlee
+            body = await body
+        return extract_form_fields(body)
 
-        # Look for pagination form
-        form_030 = soup.find('form', attrs={'name': 'JJK020030Form'})
+    async def _enqueue_remaining_pages(self, context: BeautifulSoupCrawlingContext) -> None:
+        """Enqueue every remaining page at once, the autoscaled pool takes it from there"""
+        search_params = context.request.user_data.get('search_params', self.search_params)
 
-        if form_030:
-            print(f"Found JJK020030Form for page {self.current_page}")
+        last_page = self.results.total_pages or 1
+        if self.max_pages:
+            last_page = min(last_page, self.max_pages)
 
-            # Collect hidden fields
-            pagination_form_data = {}
-            hidden_inputs = form_030.find_all('input', {'type': 'hidden'})
+        print(f"⏱️ Enqueueing pages 2-{last_page}")
 
-            for hidden in hidden_inputs:
-                name = hidden.get('name')
-                value = hidden.get('value', '')
-                if name:
-                    pagination_form_data[name] = value
+        # Look for pagination form, its fields are shared by every page request
+        form_fields = await self._form_fields(context)
 
-            # Add pagination parameters
-            pagination_form_data.update({
-                'Transition': 'Transition',
-                'pageNo': str(self.current_page),
-                'currentPage': str(self.current_page)
-            })
-
-            url_results = "https://www2.jpx.co.jp/tseHpFront/JJK020030Action.do"
+        requests = []
+        for page in range(2, last_page + 1):
+            if form_fields is not None:
+                request = self._build_pagination_request(
+                    form_fields, page, search_params, label="PAGINATION_PAGE",
+                    unique_key=f"pagination_{page}_{datetime.now().timestamp()}"
+                )
+            else:
+                # Fallback to original form
+                url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
 
-            request = Request.from_url(
-                url=url_results,
-                method="POST",
-                headers={
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                    'Referer': url_results,
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                },
-                payload=self._encode_form_data(pagination_form_data).encode('utf-8'),
-                label="PAGINATION_PAGE",
-                unique_key=f"pagination_{self.current_page}_{datetime.now().timestamp()}"
-            )
+                request = Request.from_url(
+                    url=url,
+                    method="POST",
+                    headers={
+                        'Content-Type': 'application/x-www-form-urlencoded',
+                        'Referer': url,
+                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                    },
+                    payload=self._encode_form_data(search_params).encode('utf-8'),
+                    label="RESULTS_PAGE",
+                    unique_key=f"fallback_{page}_{datetime.now().timestamp()}",
+                    user_data={'page': page, 'search_params': search_params}
+                )
+            requests.append(request)
 
-            await context.add_requests([request])
-        else:
+        if form_fields is None:
             print(f"JJK020030Form not found, using fallback")
-            # Fallback to original form
-            url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
-
-            request = Request.from_url(
-                url=url,
-                method="POST",
-                headers={
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                    'Referer': url,
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                },
-                payload=self._encode_form_data(self.search_params).encode('utf-8'),
-                label="RESULTS_PAGE",
-                unique_key=f"fallback_{self.current_page}_{datetime.now().timestamp()}"
-            )
 
-            await context.add_requests([request])
+        await context.add_requests(requests)
+
+    def _build_pagination_request(self, form_fields: dict, page: int, search_params: dict,
+                                  label: str, unique_key: str) -> Request:
+        """Build JJK020030 POST for a page from the results form hidden fields"""
+        pagination_form_data = dict(form_fields)
+
+        # Add pagination parameters
+        pagination_form_data.update({
+            'Transition': 'Transition',
+            'pageNo': str(page),
+            'currentPage': str(page)
+        })
+
+        url_results = "https://www2.jpx.co.jp/tseHpFront/JJK020030Action.do"
+
+        return Request.from_url(
+            url=url_results,
+            method="POST",
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Referer': url_results,
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            },
+            payload=self._encode_form_data(pagination_form_data).encode('utf-8'),
+            label=label,
+            unique_key=unique_key,
+            user_data={'page': page, 'search_params': search_params}
+        )
 
     def _parse_companies_from_soup(self, soup) -> list:
-        """Parse companies from BeautifulSoup (same logic as working code)"""
-        enhanced_data = []
-
-        # Look for hidden fields with company data
-        hidden_inputs = soup.find_all('input', {'type': 'hidden'})
-        company_records = {}
-
-        for hidden in hidden_inputs:
-            name = hidden.get('name', '')
-            value = hidden.get('value', '')
-
-            # Parse fields ccJjCrpSelKekkLst_st[N].field
-            if 'ccJjCrpSelKekkLst_st[' in name and '].' in name:
-                try:
-                    start = name.find('[') + 1
-                    end = name.find(']')
-                    index = int(name[start:end])
-
-                    field_start = name.find('.') + 1
-                    field_name = name[field_start:]
-
-                    if index not in company_records:
-                        company_records[index] = {}
-
-                    company_records[index][field_name] = value
-                except (ValueError, IndexError):
-                    continue
-
-        # Parse visible data from tables
-        tables = soup.find_all('table')
-        company_data = []
-
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows[1:]:  # Skip header
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 4:
-                    code_cell = cells[0]
-                    code_text = code_cell.get_text(strip=True)
-
-                    if code_text.isdigit() and len(code_text) == 5:  # Company code
-                        company_info = {
-                            'code': code_text,
-                            'name': cells[1].get_text(strip=True) if len(cells) > 1 else '',
-                            'market_segment': cells[2].get_text(strip=True) if len(cells) > 2 else '',
-                            'industry': cells[3].get_text(strip=True) if len(cells) > 3 else '',
-                            'fiscal_year_end': cells[4].get_text(strip=True) if len(cells) > 4 else '',
-                            'alerts': cells[5].get_text(strip=True) if len(cells) > 5 else '',
-                        }
-
-                        # Look for links
-                        links = {}
-                        for i, cell in enumerate(cells):
-                            link = cell.find('a')
-                            if link and link.get('href'):
-                                if 'stock_detail' in link.get('href'):
-                                    links['stock_prices_url'] = link.get('href')
-                                elif 'javascript:' not in link.get('href'):
-                                    links[f'link_{i}'] = link.get('href')
-
-                        if links:
-                            company_info['links'] = links
-
-                        company_data.append(company_info)
-
-        # Combine visible and hidden data
-        for company in company_data:
-            code = company['code']
-            enhanced_company = company.copy()
-
-            # Add hidden fields if found
-            for record in company_records.values():
-                if record.get('eqMgrCd') == code:
-                    enhanced_company['hidden_fields'] = record
-                    break
-
-            enhanced_data.append(enhanced_company)
-
-        # If no visible data, use hidden fields only
-        if not enhanced_data and company_records:
-            for index, record in sorted(company_records.items()):
-                if 'eqMgrCd' in record:
-                    company_info = {
-                        'index': index,
-                        'code': record.get('eqMgrCd', ''),
-                        'name': record.get('eqMgrNm', ''),
-                        'market_segment': record.get('szkbuNm', ''),
-                        'industry': record.get('gyshDspNm', ''),
-                        'fiscal_year_end': record.get('dspYuKssnKi', ''),
-                        'hidden_fields': record
-                    }
-                    enhanced_data.append(company_info)
-
-        return enhanced_data
-
-    def _extract_pagination_info(self, soup) -> dict:
-        """Extract pagination info from BeautifulSoup"""
-        pagination_info = {
-            'current_page': 1,
-            'total_pages': 1,
-            'total_items': 0,
-            'items_per_page': 10,
-            'has_next_page': False,
-            'has_prev_page': False
-        }
-
-        paging_menu = soup.find('div', class_='pagingmenu')
-
-        if paging_menu:
-            # Extract "Display of 1-10 items/1622"
-            left_div = paging_menu.find('div', class_='left')
-            if left_div:
-                text = left_div.get_text()
-                items_match = re.search(r'(\d+)-(\d+)\s+items?/(\d+)', text)
-                if items_match:
-                    start_item = int(items_match.group(1))
-                    end_item = int(items_match.group(2))
-                    total_items = int(items_match.group(3))
-
-                    pagination_info['total_items'] = total_items
-                    pagination_info['items_per_page'] = end_item - start_item + 1
-                    pagination_info['current_page'] = (start_item - 1) // pagination_info['items_per_page'] + 1
-                    pagination_info['total_pages'] = (total_items + pagination_info['items_per_page'] - 1) // \
-                                                     pagination_info['items_per_page']
-
-            # Current page
-            current_element = paging_menu.find('b', class_='current')
-            if current_element:
-                try:
-                    pagination_info['current_page'] = int(current_element.get_text().strip())
-                except ValueError:
-                    pass
-
-            # Next button
-            next_div = paging_menu.find('div', class_='next_e')
-            if next_div and next_div.find('a'):
-                pagination_info['has_next_page'] = True
-
-            # Previous page
-            if pagination_info['current_page'] > 1:
-                pagination_info['has_prev_page'] = True
-
-        return pagination_info
+        """Parse companies from BeautifulSoup (same logic as working code), as CompanyRecords"""
+        return parse_companies_from_soup(soup)
 
     def _update_statistics(self, companies: list) -> None:
         """Update statistics (wrapper for compatibility)"""
@@ -604,109 +464,110 @@ class JPXScraperSimple:
             f.write(html)
         print(f"💾 Saved: {filename}")
 
-async def _save_final_results(self) -> None:
-    """Save final results"""
-    print(f"\n🎉 COMPLETED!")
-    print(f"📊 Pages processed: {self.current_page}")
-    print(f"🏢 Total companies: {len(self.all_companies)}")
-
-    # Show statistics
-    self.show_final_statistics(self.all_statistics)
-
-    # Save results using the working code function
-    result = self.save_results(self.all_companies, self.all_statistics, self.current_page, self.total_items)
-
-    # Also save in Crawlee format
-    crawlee_result = {
-        'success': True,
-        'method': 'beautifulsoup_crawler',
-        'pages_processed': self.current_page,
-        'total_companies': len(self.all_companies),
-        'expected_total_items': self.total_items,
-        'scraped_at': datetime.now().isoformat(),
-        'statistics': {
-            'segments': self.all_statistics['segments'],
-            'industries': dict(sorted(self.all_statistics['industries'].items(), key=lambda x: x[1], reverse=True))
-        },
-        'companies': self.all_companies
-    }
-
-    with open('jpx_beautifulsoup_results.json', 'w', encoding='utf-8') as f:
-        json.dump(crawlee_result, f, ensure_ascii=False, indent=2)
-    print(f"💾 Crawlee format: jpx_beautifulsoup_results.json")
-
-def _show_final_statistics(self) -> None:
-    """Show final statistics"""
-    if self.all_statistics['segments']:
-        print(f"\n📈 Statistics by segments:")
-        for segment, count in sorted(self.all_statistics['segments'].items()):
-            print(f"  {segment}: {count}")
-
-    if self.all_statistics['industries']:
-        print(f"\n🏭 Top 10 industries:")
-        top_industries = sorted(self.all_statistics['industries'].items(), key=lambda x: x[1], reverse=True)[:10]
-        for industry, count in top_industries:
-            print(f"  {industry}: {count}")
-
-
-async def scrape_single_page(self) -> dict:
-    """Scrape single page"""
-    print("📄 MODE: Single page (BeautifulSoup)")
-    self.max_pages = 1
-
-    await self.setup_handlers()
-
-    initial_url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
-
-    import uuid
-    unique_id = str(uuid.uuid4())
-
-    initial_request = Request.from_url(
-        url=initial_url,
-        method='POST',
-        headers={
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'X-Initial-Request': unique_id
-        },
-        payload=self._encode_form_data(self.search_params).encode('utf-8'),
-        label='SEARCH_PAGE',
-        unique_key=f"search_page_first_request_{unique_id}"
-    )
-
-    print(f"🚀 Starting crawler with unique_key: search_page_first_request_{unique_id}")
-    await self.crawler.run([initial_request])
-
-    return {'success': True, 'companies_count': len(self.all_companies)}
-
-
-async def scrape_all_pages(self) -> dict:
-    """Scrape all pages"""
-    print("📚 MODE: All pages (BeautifulSoup)")
-
-    await self.setup_handlers()
-
-    initial_url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
-
-    import uuid
-    unique_id = str(uuid.uuid4())
-
-    initial_request = Request.from_url(
-        url=initial_url,
-        method='POST',
-        headers={
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'X-Initial-Request': unique_id
-        },
-        payload=self._encode_form_data(self.search_params).encode('utf-8'),
-        label='SEARCH_PAGE',
-        unique_key=f"search_page_all_pages_{unique_id}"
-    )
-
-    await self.crawler.run([initial_request])
-
-    return {'success': True, 'total_companies': len(self.all_companies)}
+    async def _save_final_results(self) -> None:
+        """Save final results"""
+        all_companies = self.results.companies
+        pages_processed = self.results.pages_processed
+
+        print(f"\n🎉 COMPLETED!")
+        print(f"📊 Pages processed: {pages_processed}")
+        print(f"🏢 Total companies: {len(all_companies)}")
+
+        # Show statistics
+        self.show_final_statistics(self.results.statistics)
+
+        # Save results using the working code function
+        result = self.save_results(all_companies, self.results.statistics, pages_processed, self.results.total_items)
+
+        # Also save in Crawlee format
+        crawlee_result = {
+            'success': True,
+            'method': 'beautifulsoup_crawler',
+            'pages_processed': pages_processed,
+            'total_companies': len(all_companies),
+            'expected_total_items': self.results.total_items,
+            'scraped_at': datetime.now().isoformat(),
+            'statistics': self.results.statistics.statistics(),
+            'companies': all_companies
+        }
+
+        with open('jpx_beautifulsoup_results.json', 'w', encoding='utf-8') as f:
+            json.dump(crawlee_result, f, ensure_ascii=False, indent=2, default=to_json)
+        print(f"💾 Crawlee format: jpx_beautifulsoup_results.json")
+
+    async def _lease_session(self):
+        """Take a JSESSIONID from the shared pool for this scrape"""
+        pooled = await asyncio.to_thread(default_pool().acquire)
+        self.session_id = pooled.jsessionid
+        return pooled
+
+    async def scrape_single_page(self) -> dict:
+        """Scrape single page"""
+        print("📄 MODE: Single page (BeautifulSoup)")
+        self.max_pages = 1
+
+        await self.setup_handlers()
+        pooled = await self._lease_session()
+
+        initial_url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
+
+        unique_id = str(uuid.uuid4())
+
+        initial_request = Request.from_url(
+            url=initial_url,
+            method='POST',
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'X-Initial-Request': unique_id
+            },
+            payload=self._encode_form_data(self.search_params).encode('utf-8'),
+            label='SEARCH_PAGE',
+            unique_key=f"search_page_first_request_{unique_id}",
+            user_data={'search_params': self.search_params}
+        )
+
+        print(f"🚀 Starting crawler with unique_key: search_page_first_request_{unique_id}")
+        try:
+            await self.crawler.run([initial_request])
+        finally:
+            default_pool().release(pooled)
+        await self._save_final_results()
+
+        return {'success': True, 'companies_count': len(self.all_companies)}
+
+    async def scrape_all_pages(self) -> dict:
+        """Scrape all pages"""
+        print("📚 MODE: All pages (BeautifulSoup)")
+
+        await self.setup_handlers()
+        pooled = await self._lease_session()
+
+        initial_url = f"https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid={self.session_id}"
+
+        unique_id = str(uuid.uuid4())
+
+        initial_request = Request.from_url(
+            url=initial_url,
+            method='POST',
+            headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'X-Initial-Request': unique_id
+            },
+            payload=self._encode_form_data(self.search_params).encode('utf-8'),
+            label='SEARCH_PAGE',
+            unique_key=f"search_page_all_pages_{unique_id}",
+            user_data={'search_params': self.search_params}
+        )
+
+        try:
+            await self.crawler.run([initial_request])
+        finally:
+            default_pool().release(pooled)
+        await self._save_final_results()
+
+        return {'success': True, 'total_companies': len(self.all_companies)}
 
 
 async def main():
@@ -719,7 +580,8 @@ async def main():
 
     if mode == "1":
         scraper = JPXScraperSimple(max_pages=1)
-        result = await scraper.scrape_single_page()
+        with profiled('jpx-crawlee-single-page'):
+            result = await scraper.scrape_single_page()
 
         if result.get('success'):
             print(f"\n🎉 SUCCESS! Found companies: {result.get('companies_count', 0)}")
@@ -735,7 +597,8 @@ async def main():
 
         if confirm == 'y':
             scraper = JPXScraperSimple(max_pages=None, delay=delay)
-            result = await scraper.scrape_all_pages()
+            with profiled('jpx-crawlee-all-pages'):
+                result = await scraper.scrape_all_pages()
 
             if result.get('success'):
                 print(f"\n🎉 SUCCESS! Companies: {result.get('total_companies', 0)}")
@@ -750,7 +613,8 @@ async def main():
         delay = float(delay) if delay.replace('.', '').isdigit() else 1.0
 
         scraper = JPXScraperSimple(max_pages=max_pages, delay=delay)
-        result = await scraper.scrape_all_pages()
+        with profiled('jpx-crawlee-pages'):
+            result = await scraper.scrape_all_pages()
 
         if result.get('success'):
             print(f"\n🎉 SUCCESS! Companies: {result.get('total_companies', 0)}")
@@ -1,13 +1,49 @@
 import requests
 from bs4 import BeautifulSoup
+import asyncio
 import json
+import logging
+import os
 import time
 import re
-
-
-def jpx_two_step_request():
+from urllib.parse import urljoin
+
+from aggregation import StreamingAggregator
+from company_index import publish
+from company_record import CompanyRecord, to_json
+from page_state import extract_form_fields
+from profiling import page_done, profiled
+from tracing import span
+
+log = logging.getLogger('crawler')
+
+# Point at a local mock (mock_server.py) with JPX_BASE_URL=http://127.0.0.1:8765
+JPX_BASE_URL = os.environ.get('JPX_BASE_URL', 'https://www2.jpx.co.jp').rstrip('/')
+JPX_SEARCH_URL = f"{JPX_BASE_URL}/tseHpFront/JJK020010Action.do"
+JPX_RESULTS_URL = f"{JPX_BASE_URL}/tseHpFront/JJK020030Action.do"
+
+# Form-data parameters exactly as in Insomnia
+DEFAULT_SEARCH_PARAMS = {
+    'dspSsuPd': '500',
+    'szkbuChkbxMapOut': '011>Prime<012>Standard<013>Growth<008>TOKYO',
+    'ListShow': 'ListShow',
+    'sniMtGmnId': '',
+    'dspSsuPdMapOut': '10>10<50>50<100>100<200>200<',
+    'mgrMiTxtBx': '',
+    'eqMgrCd': '',
+    'szkbuChkbx': '011'
+}
+
+MARKET_SEGMENTS = {
+    'prime': '011',
+    'standard': '012',
+    'growth': '013'
+}
+
+
+def create_session():
     """
-    Original working function (single page)
+    Create requests session with browser-like headers
     """
     session = requests.Session()
     session.headers.update({
@@ -17,42 +53,146 @@ def jpx_two_step_request():
         'Accept-Encoding': 'gzip, deflate',
         'Connection': 'keep-alive'
     })
+    return session
 
-    # Form-data parameters exactly as in Insomnia
-    form_data = {
-        'dspSsuPd': '500',
-        'szkbuChkbxMapOut': '011>Prime<012>Standard<013>Growth<008>TOKYO',
-        'ListShow': 'ListShow',
-        'sniMtGmnId': '',
-        'dspSsuPdMapOut': '10>10<50>50<100>100<200>200<',
-        'mgrMiTxtBx': '',
-        'eqMgrCd': '',
-        'szkbuChkbx': '011'
-    }
+
+def _post(session, url, data, timeout, page, step):
+    """
+    POST traced as a jpx.request span: action (JJK020010 / JJK020030), step, page, status, bytes
+    """
+    action = url.rsplit('/', 1)[1].split('Action', 1)[0]
+    with span('jpx.request', action=action, step=step, page=page) as request_span:
+        response = session.post(url, data=data, timeout=timeout)
+        request_span.set(status=response.status_code, bytes=len(response.content))
+    return response
+
+
+def fetch_results_page(session, url, form_data, current_page, timeout=None):
+    """
+    Two-step request for one results page, returns the second response
+
+    timeout (seconds) applies to each of the two requests.
+    """
+    # FIRST REQUEST
+    response1 = _post(session, url, form_data, timeout, current_page, 1)
+    response1.raise_for_status()
+
+    # For pages after the first one, use different logic
+    if current_page > 1:
+        # Hidden fields of JJK020030Form (results form with pagination), no soup needed
+        pagination_form_data = extract_form_fields(response1.content)
+
+        if pagination_form_data is not None:
+            log.debug("Found JJK020030Form, using for page %d", current_page)
+
+            # Add pagination parameters
+            pagination_form_data.update({
+                'Transition': 'Transition',
+                'pageNo': str(current_page),
+                'currentPage': str(current_page)
+            })
+
+            # Results URL on the same host as the search
+            results_url = urljoin(url, JPX_RESULTS_URL.rsplit('/', 1)[1])
+            response2 = _post(session, results_url, pagination_form_data, timeout, current_page, 2)
+        else:
+            # Fallback: use original form
+            log.debug("JJK020030Form not found, using original form")
+            response2 = _post(session, url, form_data, timeout, current_page, 2)
+    else:
+        # First page: standard second request
+        response2 = _post(session, url, form_data, timeout, current_page, 2)
+
+    response2.raise_for_status()
+    return response2
+
+
+def build_search_params(segments=None, name='', code=''):
+    """
+    Quick-search form data for market segments (prime/standard/growth), name and code
+    """
+    if segments is None:
+        segments = ['prime']
+
+    params = DEFAULT_SEARCH_PARAMS.copy()
+    params['mgrMiTxtBx'] = name
+    params['eqMgrCd'] = code
+    params['szkbuChkbx'] = [MARKET_SEGMENTS[s] for s in segments if s in MARKET_SEGMENTS] or ['011']
+    return params
+
+
+def open_session():
+    """
+    New session with its own JSESSIONID minted by opening the search page
+    """
+    session = create_session()
+    with span('jpx.handshake') as handshake_span:
+        response = session.get(JPX_SEARCH_URL)
+        handshake_span.set(status=response.status_code, bytes=len(response.content))
+    response.raise_for_status()
+
+    jsessionid = session.cookies.get('JSESSIONID')
+    if not jsessionid and ';jsessionid=' in response.url:
+        jsessionid = response.url.split(';jsessionid=')[1].split('?')[0]
+    return session, jsessionid
+
+
+def fetch_companies_page(session, jsessionid, search_params, current_page):
+    """
+    Fetch and parse one results page, returns (companies, pagination_info)
+    """
+    url = f"{JPX_SEARCH_URL};jsessionid={jsessionid}"
+    with span('jpx.page', page=current_page):
+        response = fetch_results_page(session, url, search_params, current_page)
+        with span('jpx.parse', page=current_page, bytes=len(response.content)) as parse_span:
+            soup = BeautifulSoup(response.content, 'html.parser')
+            companies = parse_companies_from_soup(soup)
+            for company in companies:
+                company['page'] = current_page
+            pagination_info = extract_pagination_info(soup)
+            parse_span.set(companies=len(companies))
+    return companies, pagination_info
+
+
+def jpx_two_step_request(session=None, jsessionid=None, search_params=None):
+    """
+    Original working function (single page)
+
+    Without a session/jsessionid one is leased from the shared session pool.
+    """
+    if session is None or jsessionid is None:
+        from session_pool import default_pool
+
+        with default_pool().lease() as pooled:
+            return jpx_two_step_request(pooled.session, pooled.jsessionid, search_params)
+
+    form_data = DEFAULT_SEARCH_PARAMS.copy() if search_params is None else search_params
 
     try:
         # FIRST REQUEST - open search page
-        print("REQUEST 1: Opening search page...")
-        url = "https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid=00B11CD09F0EE52A255F89C8F3D3F8A21"
+        log.debug("REQUEST 1: Opening search page...")
+        url = f"{JPX_SEARCH_URL};jsessionid={jsessionid}"
 
-        response1 = session.post(url, data=form_data)
+        response1 = _post(session, url, form_data, None, 1, 1)
         response1.raise_for_status()
 
-        print(f"Request 1 - Status: {response1.status_code}")
+        log.debug("Request 1 - Status: %d", response1.status_code)
 
         # SECOND REQUEST - get results
-        print("\nREQUEST 2: Getting results...")
-        response2 = session.post(url, data=form_data)
+        log.debug("REQUEST 2: Getting results...")
+        response2 = _post(session, url, form_data, None, 1, 2)
         response2.raise_for_status()
 
-        print(f"Request 2 - Status: {response2.status_code}")
-        print(f"Request 2 - Response size: {len(response2.content)} bytes")
+        log.debug("Request 2 - Status: %d, Size: %d bytes", response2.status_code, len(response2.content))
 
         # Parse results
-        soup = BeautifulSoup(response2.content, 'html.parser')
-        enhanced_data = parse_companies_from_soup(soup)
+        with span('jpx.parse', page=1, bytes=len(response2.content)) as parse_span:
+            soup = BeautifulSoup(response2.content, 'html.parser')
+            enhanced_data = parse_companies_from_soup(soup)
+            parse_span.set(companies=len(enhanced_data))
 
-        print(f"\n✅ Found companies: {len(enhanced_data)}")
+        log.info("✅ Found companies: %d", len(enhanced_data))
+        page_done()
 
         # Save result
         result = {
@@ -65,173 +205,120 @@ def jpx_two_step_request():
         return result
 
     except Exception as e:
-        print(f"Error: {e}")
+        log.error("❌ Error: %s", e)
         return {'success': False, 'error': str(e)}
 
 
-def jpx_with_pagination(max_pages=None, delay=1, search_params=None):
+def jpx_with_pagination(max_pages=None, delay=1, search_params=None, session=None,
+                        jsessionid=None, parse_workers=None):
     """
     Version with pagination based on working code
+
+    Without a session/jsessionid one is leased from the shared session pool
+    (session_pool.py), so short runs reuse the JSESSIONID of the last one
+
+    parse_workers moves parsing into a process pool, so the next page is fetched
+    while the previous one is parsed (page HTML isn't saved in that mode)
     """
+    if session is None or jsessionid is None:
+        from session_pool import default_pool
+
+        with default_pool().lease() as pooled:
+            return jpx_with_pagination(max_pages, delay, search_params, pooled.session, pooled.jsessionid,
+                                       parse_workers)
+
     if search_params is None:
-        search_params = {
-            'dspSsuPd': '500',
-            'szkbuChkbxMapOut': '011>Prime<012>Standard<013>Growth<008>TOKYO',
-            'ListShow': 'ListShow',
-            'sniMtGmnId': '',
-            'dspSsuPdMapOut': '10>10<50>50<100>100<200>200<',
-            'mgrMiTxtBx': '',
-            'eqMgrCd': '',
-            'szkbuChkbx': '011'
-        }
+        search_params = DEFAULT_SEARCH_PARAMS.copy()
 
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive'
-    })
+    if parse_workers:
+        return _jpx_pagination_with_pool(max_pages, delay, search_params, session, jsessionid, parse_workers)
 
     all_companies = []
-    all_statistics = {'segments': {}, 'industries': {}}
+    all_statistics = StreamingAggregator()
     current_page = 1
     total_items = None
     total_pages = None
 
     try:
         while True:
-            print(f"\n{'=' * 60}")
-            print(f"📄 PAGE {current_page}")
-            if total_pages:
-                print(f"📊 Progress: {current_page}/{total_pages}")
-            if total_items:
-                print(f"🎯 Total companies: {total_items}")
-            print(f"{'=' * 60}")
+            log.debug("📄 PAGE %d/%s, %s companies in total", current_page, total_pages or '?', total_items or '?')
 
             # Prepare parameters for current page
             form_data = search_params.copy()
+            url = f"{JPX_SEARCH_URL};jsessionid={jsessionid}"
 
-            # FIRST REQUEST
-            print(f"REQUEST 1: Initializing page {current_page}...")
-            url = "https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do;jsessionid=00B11CD09F0EE52A255F89C8F3D3F8A21"
-
-            response1 = session.post(url, data=form_data)
-            response1.raise_for_status()
-
-            # SECOND REQUEST
-            print(f"REQUEST 2: Getting data for page {current_page}...")
+            # One trace per page: both requests, the HTML dump, parse and aggregation
+            with span('jpx.page', page=current_page):
+                response2 = fetch_results_page(session, url, form_data, current_page)
+                log.debug("Request 2 - Status: %d, Size: %d bytes", response2.status_code, len(response2.content))
 
-            # For pages after the first one, use different logic
-            if current_page > 1:
-                # Parse first response to get results form
-                soup_temp = BeautifulSoup(response1.content, 'html.parser')
+                # Save HTML of each page
+                with span('jpx.persist', page=current_page, bytes=len(response2.content)):
+                    with open(f'jpx_page_{current_page}.html', 'w', encoding='utf-8') as f:
+                        f.write(response2.text)
 
-                # Look for JJK020030Form (results form with pagination)
-                form_030 = soup_temp.find('form', attrs={'name': 'JJK020030Form'})
-
-                if form_030:
-                    print(f"Found JJK020030Form, using for page {current_page}")
-
-                    # Collect all hidden fields from the form
-                    pagination_form_data = {}
-                    hidden_inputs = form_030.find_all('input', {'type': 'hidden'})
-
-                    for hidden in hidden_inputs:
-                        name = hidden.get('name')
-                        value = hidden.get('value', '')
-                        if name:
-                            pagination_form_data[name] = value
-
-                    # Add pagination parameters
-                    pagination_form_data.update({
-                        'Transition': 'Transition',
-                        'pageNo': str(current_page),
-                        'currentPage': str(current_page)
-                    })
-
-                    # Use results URL
-                    url_results = "https://www2.jpx.co.jp/tseHpFront/JJK020030Action.do"
-                    response2 = session.post(url_results, data=pagination_form_data)
-                else:
-                    # Fallback: use original form
-                    print(f"JJK020030Form not found, using original form")
-                    response2 = session.post(url, data=form_data)
-            else:
-                # First page: standard second request
-                response2 = session.post(url, data=form_data)
-
-            response2.raise_for_status()
-            print(f"Request 2 - Status: {response2.status_code}, Size: {len(response2.content)} bytes")
-
-            # Save HTML of each page
-            with open(f'jpx_page_{current_page}.html', 'w', encoding='utf-8') as f:
-                f.write(response2.text)
-
-            # Parse companies from current page
-            soup = BeautifulSoup(response2.content, 'html.parser')
-            page_companies = parse_companies_from_soup(soup)
+                # Parse companies from current page
+                with span('jpx.parse', page=current_page, bytes=len(response2.content)) as parse_span:
+                    soup = BeautifulSoup(response2.content, 'html.parser')
+                    page_companies = parse_companies_from_soup(soup)
 
-            print(f"📊 Found companies on page {current_page}: {len(page_companies)}")
+                    # Add page number to each company
+                    for company in page_companies:
+                        company['page'] = current_page
 
-            # Add page number to each company
-            for company in page_companies:
-                company['page'] = current_page
+                    # Get pagination information
+                    pagination_info = extract_pagination_info(soup)
+                    parse_span.set(companies=len(page_companies))
 
-            # Add to overall list
-            all_companies.extend(page_companies)
+                log.info("📄 Page %d/%s: %d companies", current_page, total_pages or '?', len(page_companies))
 
-            # Update statistics
-            update_statistics(page_companies, all_statistics)
+                with span('jpx.aggregate', page=current_page, companies=len(page_companies)):
+                    # Add to overall list
+                    all_companies.extend(page_companies)
 
-            # Get pagination information
-            pagination_info = extract_pagination_info(soup)
+                    # Update statistics
+                    all_statistics.update(page_companies)
+            page_done()
 
             if pagination_info:
                 total_items = pagination_info.get('total_items')
                 total_pages = pagination_info.get('total_pages')
                 has_next = pagination_info.get('has_next_page', False)
 
-                print(f"\n📖 Pagination:")
-                print(f"  Current page: {pagination_info.get('current_page')}")
-                print(f"  Total pages: {total_pages}")
-                print(f"  Total items: {total_items}")
-                print(f"  Has next: {has_next}")
+                log.debug("📖 Pagination: page %s of %s, %s items, has next: %s",
+                          pagination_info.get('current_page'), total_pages, total_items, has_next)
 
                 # Check continuation conditions
                 if not has_next or (total_pages and current_page >= total_pages):
-                    print("🏁 Reached last page")
+                    log.info("🏁 Reached last page")
                     break
 
                 if max_pages and current_page >= max_pages:
-                    print(f"🛑 Reached limit: {max_pages} pages")
+                    log.info("🛑 Reached limit: %d pages", max_pages)
                     break
 
                 if len(page_companies) == 0:
-                    print("🛑 No companies on page")
+                    log.info("🛑 No companies on page")
                     break
 
                 # Move to next page
                 current_page += 1
 
                 if delay > 0:
-                    print(f"⏱️ Delay {delay} sec...")
+                    log.debug("⏱️ Delay %s sec...", delay)
                     time.sleep(delay)
 
             else:
-                print("📖 Pagination not found")
+                log.info("📖 Pagination not found")
                 if len(page_companies) == 0:
-                    print("🛑 No companies and no pagination")
+                    log.info("🛑 No companies and no pagination")
                     break
                 else:
-                    print("📄 Possibly single page")
+                    log.info("📄 Possibly single page")
                     break
 
         # Final results
-        print(f"\n🎉 COMPLETED!")
-        print(f"📊 Pages processed: {current_page}")
-        print(f"🏢 Total companies: {len(all_companies)}")
+        log.info("🎉 COMPLETED! %d pages, %d companies", current_page, len(all_companies))
 
         # Show statistics
         show_final_statistics(all_statistics)
@@ -242,9 +329,7 @@ def jpx_with_pagination(max_pages=None, delay=1, search_params=None):
         return result
 
     except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Error: %s", e)
 
         return {
             'success': False,
@@ -255,9 +340,47 @@ def jpx_with_pagination(max_pages=None, delay=1, search_params=None):
         }
 
 
+def _jpx_pagination_with_pool(max_pages, delay, search_params, session, jsessionid, parse_workers):
+    """
+    jpx_with_pagination with fetch and parse overlapped (see parse_pool.crawl_pages)
+    """
+    from parse_pool import ParsePool, crawl_pages
+
+    all_statistics = StreamingAggregator()
+
+    def handle_page(page_companies):
+        with span('jpx.aggregate', companies=len(page_companies)):
+            all_statistics.update(page_companies)
+        page_done()
+        log.info("📊 Parsed companies: %d (total %d)", len(page_companies), all_statistics.total)
+
+    try:
+        with ParsePool(parse_workers) as pool:
+            log.info("⚙️ Parsing in %d worker process(es)", pool.workers)
+            pages, pagination_info = asyncio.run(crawl_pages(
+                session, jsessionid, search_params, pool,
+                max_pages=max_pages, delay=delay, on_page=handle_page
+            ))
+    except Exception as e:
+        log.exception("❌ Error: %s", e)
+
+        return {'success': False, 'error': str(e), 'partial_data': True,
+                'companies_collected': all_statistics.total, 'companies': []}
+
+    all_companies = [company for page_companies in pages for company in page_companies]
+
+    log.info("🎉 COMPLETED! %d pages, %d companies", len(pages), len(all_companies))
+
+    show_final_statistics(all_statistics)
+    return save_results(all_companies, all_statistics, len(pages), pagination_info.get('total_items'))
+
+
 def parse_companies_from_soup(soup):
     """
     Parse companies from soup (exactly like in working code)
+
+    Returns CompanyRecord objects (company_record.py), which read and write
+    like the dicts this used to build
     """
     enhanced_data = []
 
@@ -299,14 +422,14 @@ def parse_companies_from_soup(soup):
                 code_text = code_cell.get_text(strip=True)
 
                 if code_text.isdigit() and len(code_text) == 5:  # Company code
-                    company_info = {
-                        'code': code_text,
-                        'name': cells[1].get_text(strip=True) if len(cells) > 1 else '',
-                        'market_segment': cells[2].get_text(strip=True) if len(cells) > 2 else '',
-                        'industry': cells[3].get_text(strip=True) if len(cells) > 3 else '',
-                        'fiscal_year_end': cells[4].get_text(strip=True) if len(cells) > 4 else '',
-                        'alerts': cells[5].get_text(strip=True) if len(cells) > 5 else '',
-                    }
+                    company_info = CompanyRecord(
+                        code=code_text,
+                        name=cells[1].get_text(strip=True) if len(cells) > 1 else '',
+                        market_segment=cells[2].get_text(strip=True) if len(cells) > 2 else '',
+                        industry=cells[3].get_text(strip=True) if len(cells) > 3 else '',
+                        fiscal_year_end=cells[4].get_text(strip=True) if len(cells) > 4 else '',
+                        alerts=cells[5].get_text(strip=True) if len(cells) > 5 else '',
+                    )
 
                     # Look for links
                     links = {}
@@ -324,31 +447,32 @@ def parse_companies_from_soup(soup):
                     company_data.append(company_info)
 
     # Combine data from hidden fields with visible data
-    for company in company_data:
-        code = company['code']
-        enhanced_company = company.copy()
+    records_by_code = {}
+    for record in company_records.values():
+        records_by_code.setdefault(record.get('eqMgrCd'), record)
 
+    for company in company_data:
         # Add data from hidden fields if found
-        for record in company_records.values():
-            if record.get('eqMgrCd') == code:
-                enhanced_company['hidden_fields'] = record
-                break
+        record = records_by_code.get(company['code'])
+        if record is not None:
+            company['hidden_fields'] = record
 
-        enhanced_data.append(enhanced_company)
+        enhanced_data.append(company)
 
     # If main parsing didn't yield results, use only hidden fields
     if not enhanced_data and company_records:
         for index, record in sorted(company_records.items()):
             if 'eqMgrCd' in record:  # Has company code
-                company_info = {
-                    'index': index,
-                    'code': record.get('eqMgrCd', ''),
-                    'name': record.get('eqMgrNm', ''),
-                    'market_segment': record.get('szkbuNm', ''),
-                    'industry': record.get('gyshDspNm', ''),
-                    'fiscal_year_end': record.get('dspYuKssnKi', ''),
-                    'hidden_fields': record
-                }
+                company_info = CompanyRecord(
+                    index=index,
+                    code=record.get('eqMgrCd', ''),
+                    name=record.get('eqMgrNm', ''),
+                    market_segment=record.get('szkbuNm', ''),
+                    industry=record.get('gyshDspNm', ''),
+                    fiscal_year_end=record.get('dspYuKssnKi', ''),
+                    alerts=None,
+                    hidden_fields=record
+                )
                 enhanced_data.append(company_info)
 
     return enhanced_data
@@ -407,32 +531,30 @@ def extract_pagination_info(soup):
     return pagination_info
 
 
-def update_statistics(companies, all_statistics):
+def show_final_statistics(all_statistics):
     """
-    Update overall statistics
+    Show final statistics from a StreamingAggregator
     """
-    for company in companies:
-        segment = company.get('market_segment', 'Unknown')
-        industry = company.get('industry', 'Unknown')
+    if all_statistics.total:
+        log.info("📈 Statistics by segments:")
+        for segment, count in sorted(all_statistics.rollup('market_segment').items()):
+            log.info("  %s: %d", segment, count)
 
-        all_statistics['segments'][segment] = all_statistics['segments'].get(segment, 0) + 1
-        all_statistics['industries'][industry] = all_statistics['industries'].get(industry, 0) + 1
+        log.info("🏭 Top 10 industries:")
+        for industry, count in all_statistics.top_k('industry', 10):
+            log.info("  %s: %d", industry, count)
 
 
-def show_final_statistics(all_statistics):
+def write_json_atomic(path, data):
     """
-    Show final statistics
+    Write JSON via a temp file and rename, readers never see a partial snapshot
     """
-    if all_statistics['segments']:
-        print(f"\n📈 Statistics by segments:")
-        for segment, count in sorted(all_statistics['segments'].items()):
-            print(f"  {segment}: {count}")
-
-    if all_statistics['industries']:
-        print(f"\n🏭 Top 10 industries:")
-        top_industries = sorted(all_statistics['industries'].items(), key=lambda x: x[1], reverse=True)[:10]
-        for industry, count in top_industries:
-            print(f"  {industry}: {count}")
+    tmp_path = f'{path}.tmp'
+    with span('jpx.persist', path=path) as persist_span:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=to_json)
+        os.replace(tmp_path, path)
+        persist_span.set(bytes=os.path.getsize(path))
 
 
 def save_results(all_companies, all_statistics, pages_processed, total_items):
@@ -446,16 +568,14 @@ def save_results(all_companies, all_statistics, pages_processed, total_items):
         'pages_processed': pages_processed,
         'total_companies': len(all_companies),
         'expected_total_items': total_items,
-        'statistics': {
-            'segments': all_statistics['segments'],
-            'industries': dict(sorted(all_statistics['industries'].items(), key=lambda x: x[1], reverse=True))
-        },
+        'statistics': all_statistics.statistics(),
         'companies': all_companies
     }
 
-    with open('jpx_all_companies.json', 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
-    print(f"\n💾 Full data: jpx_all_companies.json")
+    write_json_atomic('jpx_all_companies.json', result)
+    log.info("💾 Full data: jpx_all_companies.json")
+    # Readers of this snapshot in this process (company_index.default_store) get the new crawl right away
+    publish('jpx_all_companies.json', all_companies)
 
     # Simplified data
     simple_result = {
@@ -476,14 +596,16 @@ def save_results(all_companies, all_statistics, pages_processed, total_items):
         ]
     }
 
-    with open('jpx_all_companies_simple.json', 'w', encoding='utf-8') as f:
-        json.dump(simple_result, f, ensure_ascii=False, indent=2)
-    print(f"💾 Simplified data: jpx_all_companies_simple.json")
+    write_json_atomic('jpx_all_companies_simple.json', simple_result)
+    log.info("💾 Simplified data: jpx_all_companies_simple.json")
 
     return result
 
 
 if __name__ == "__main__":
+    from queue_logging import flush_logging, setup_logging
+
+    setup_logging()
     print("🚀 JPX SCRAPER (Based on working code)")
     print("=" * 60)
 
@@ -492,7 +614,9 @@ if __name__ == "__main__":
 
     if mode == "1":
         print("\n📄 MODE: Single page")
-        result = jpx_two_step_request()
+        with profiled('jpx-single-page'):
+            result = jpx_two_step_request()
+        flush_logging()
 
         if result.get('success'):
             print(f"\n🎉 SUCCESS! Found companies: {result.get('companies_count', 0)}")
@@ -508,7 +632,9 @@ if __name__ == "__main__":
         confirm = input("Continue? (y/n): ").strip().lower()
 
         if confirm == 'y':
-            result = jpx_with_pagination(max_pages=None, delay=delay)
+            with profiled('jpx-all-pages'):
+                result = jpx_with_pagination(max_pages=None, delay=delay)
+            flush_logging()
 
             if result.get('success'):
                 print(f"\n🎉 SUCCESS! Companies: {result.get('total_companies', 0)}")
@@ -524,7 +650,9 @@ if __name__ == "__main__":
         delay = input("Delay in seconds (default 1): ").strip()
         delay = float(delay) if delay.replace('.', '').isdigit() else 1.0
 
-        result = jpx_with_pagination(max_pages=max_pages, delay=delay)
+        with profiled('jpx-pages'):
+            result = jpx_with_pagination(max_pages=max_pages, delay=delay)
+        flush_logging()
 
         if result.get('success'):
             print(f"\n🎉 SUCCESS! Companies: {result.get('total_companies', 0)}")
@@ -0,0 +1,243 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional
+
+# Requests Chrome never needs to make for a search: images, stylesheets, fonts
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+                '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+
+# Hides navigator.webdriver on every document, not just the one open when it runs
+HIDE_WEBDRIVER = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+# True once a results page (JJK020030Form) or a validation error is parsed
+RESULTS_READY_SCRIPT = """
+    if (document.readyState === 'loading') { return false; }
+    if (document.forms['JJK020030Form']) { return 'results'; }
+    var error = document.getElementById('cgTabError');
+    return error && error.textContent.trim() ? 'error' : false;
+"""
+
+
+def chrome_options(headless: bool = True, tuned: bool = True):
+    """
+    Chrome options of JPXScraper.scrape_with_selenium
+
+    tuned: eager page load (DOMContentLoaded, subresources are not waited
+    for) and no images at the content-settings level.
+    """
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    if tuned:
+        options.page_load_strategy = 'eager'
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    return options
+
+
+def results_ready(driver):
+    """WebDriverWait condition: 'results' / 'error' once the search answered, else False"""
+    return driver.execute_script(RESULTS_READY_SCRIPT)
+
+
+class DriverPool:
+    """
+    Warm Chrome drivers reused across Selenium searches
+
+    Launching Chrome costs more than the search itself, so drivers stay open
+    between calls; each lease gets one driver to itself. Tuned drivers load
+    pages eagerly and block BLOCKED_URLS through CDP, so a navigation is done
+    once the HTML is parsed. A driver is replaced after max_uses searches or
+    when it fails, a long-lived Chrome grows.
+    """
+
+    def __init__(self, size: int = 2, headless: bool = True, tuned: bool = True, max_uses: int = 100):
+        self.size = size
+        self.headless = headless
+        self.tuned = tuned
+        self.max_uses = max_uses
+
+        self._condition = threading.Condition()
+        self._idle: List = []
+        self._uses = {}
+        self._leased = 0
+
+        self.stats = {'launched': 0, 'launch_s': 0.0, 'reused': 0, 'recycled': 0}
+
+    def _launch(self):
+        from selenium import webdriver
+
+        started_at = time.perf_counter()
+        driver = webdriver.Chrome(options=chrome_options(self.headless, self.tuned))
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': HIDE_WEBDRIVER})
+        if self.tuned:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+        with self._condition:
+            self.stats['launched'] += 1
+            self.stats['launch_s'] += time.perf_counter() - started_at
+            self._uses[driver] = 0
+        return driver
+
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """Launch drivers in parallel until count (default size) are idle, returns idle drivers"""
+        with self._condition:
+            missing = max(min(count or self.size, self.size) - len(self._idle) - self._leased, 0)
+            self._leased += missing
+        drivers = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(missing, 1)) as executor:
+                futures = [executor.submit(self._launch) for _ in range(missing)]
+            for future in futures:
+                try:
+                    drivers.append(future.result())
+                except Exception as e:
+                    print(f"⚠️ Chrome not launched: {e}")
+        finally:
+            with self._condition:
+                self._leased -= missing
+        with self._condition:
+            self._idle.extend(drivers)
+            self._condition.notify_all()
+            return len(self._idle)
+
+    def acquire(self, timeout: Optional[float] = None):
+        """A warm driver, launched if none is idle, blocks while all `size` are leased"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._idle or self._leased < self.size, timeout):
+                raise TimeoutError(f'No Chrome driver free within {timeout} s')
+            self._leased += 1
+            driver = self._idle.pop() if self._idle else None
+
+        if driver is not None:
+            self.stats['reused'] += 1
+            return driver
+        try:
+            return self._launch()
+        except BaseException:
+            with self._condition:
+                self._leased -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, driver, healthy: bool = True) -> None:
+        """Return a leased driver, failed or worn out ones are quit"""
+        with self._condition:
+            self._leased -= 1
+            self._uses[driver] = self._uses.get(driver, 0) + 1
+            keep = healthy and self._uses[driver] < self.max_uses
+            if keep:
+                self._idle.append(driver)
+            else:
+                self._uses.pop(driver, None)
+                self.stats['recycled'] += 1
+            self._condition.notify()
+        if not keep:
+            self._quit(driver)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """with pool.lease() as driver: ..., an exception inside recycles the driver"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, healthy=False)
+            raise
+        self.release(driver)
+
+    @staticmethod
+    def _quit(driver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._condition:
+            drivers, self._idle = self._idle, []
+            self._uses.clear()
+        for driver in drivers:
+            self._quit(driver)
+
+
+_default_pools = {}
+_default_pools_lock = threading.Lock()
+
+
+def default_driver_pool(headless: bool = True) -> DriverPool:
+    """Process-wide pool per headless mode, quit at exit"""
+    with _default_pools_lock:
+        pool = _default_pools.get(headless)
+        if pool is None:
+            pool = _default_pools[headless] = DriverPool(headless=headless)
+            atexit.register(pool.close)
+        return pool
+
+
+def benchmark(searches: int = 5, base_url: Optional[str] = None) -> dict:
+    """
+    Per-search latency of scrape_with_selenium before and after the pool
+
+    - cold, default: new Chrome per search, normal page load, everything loaded
+    - cold, tuned: new Chrome per search, eager load, images/CSS/fonts blocked
+    - warm pool, tuned: the same drivers for every search
+
+    Runs against the mock server unless base_url (e.g. the real site) is given.
+    """
+    import contextlib
+    import io
+
+    from mock_server import MockJPXServer
+    from quicksearch import JPXScraper
+
+    mock = None
+    if base_url is None:
+        mock = MockJPXServer(total_items=2000, per_page=200, base_latency=0.05)
+        base_url = mock.start()
+
+    runs = [('cold, default', dict(tuned=False, max_uses=1)), ('cold, tuned', dict(tuned=True, max_uses=1)),
+            ('warm pool, tuned', dict(tuned=True))]
+    print(f"\n⏱️ Selenium search latency, {searches} searches per run against {base_url}")
+    results = {}
+    try:
+        for label, options in runs:
+            pool = DriverPool(size=1, **options)
+            if label.startswith('warm'):
+                pool.prewarm()
+            scraper = JPXScraper(base_url=base_url, driver_pool=pool)
+            asset_bytes = mock.stats['asset_bytes'] if mock else 0
+            latencies = []
+            records = 0
+            for _ in range(searches):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = scraper.scrape_with_selenium({'dspSsuPd': '200', 'szkbuChkbx': ['011']})
+                latencies.append(time.perf_counter() - start)
+                records += result.get('total_records', 0)
+            pool.close()
+
+            latencies.sort()
+            results[label] = {'median_s': latencies[len(latencies) // 2], 'max_s': latencies[-1]}
+            assets = f", {(mock.stats['asset_bytes'] - asset_bytes) / searches / 1000:.0f} KB assets/search" if mock else ''
+            print(f"  {label}: median {results[label]['median_s'] * 1000:.0f} ms, "
+                  f"max {results[label]['max_s'] * 1000:.0f} ms, {records // searches} rows/search{assets}")
+    finally:
+        if mock is not None:
+            mock.stop()
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5, os.environ.get('JPX_BASE_URL'))
@@ -0,0 +1,266 @@
+import asyncio
+import html
+import json
+import math
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+from urllib.parse import urljoin
+
+from adaptive_concurrency import AIMDController, RateLimiter
+from page_state import TAG, sniff_encoding
+
+DETAIL_CACHE_PATH = 'jpx_detail_cache.json'
+
+# Quotes move daily, a daily refresh only has to touch entries older than this
+DETAIL_TTL = 20 * 60 * 60
+
+# Detail page labels (casefolded, without "(unit)" suffixes) -> keys in company['detail']
+DETAIL_FIELDS = {
+    'current price': 'price',
+    'previous close': 'previous_close',
+    'open': 'open',
+    'high': 'high',
+    'low': 'low',
+    'trading volume': 'volume',
+    'trading value': 'trading_value',
+    'market capitalization': 'market_cap',
+    'number of listed shares': 'listed_shares',
+    'shares outstanding': 'listed_shares',
+    'trading unit': 'trading_unit',
+    'isin code': 'isin',
+    'listing date': 'listing_date',
+}
+
+LABEL_VALUE = re.compile(rb'<t[hd]\b[^>]*>(.*?)</t[hd]>\s*<td\b[^>]*>(.*?)</td>', re.I | re.S)
+DEFINITION = re.compile(rb'<dt\b[^>]*>(.*?)</dt>\s*<dd\b[^>]*>(.*?)</dd>', re.I | re.S)
+UNIT_SUFFIX = re.compile(r'\s*[(（].*?[)）]\s*$')
+
+
+def _text(fragment: bytes, encoding: str) -> str:
+    return ' '.join(html.unescape(TAG.sub(b' ', fragment).decode(encoding, 'replace')).split())
+
+
+def parse_stock_detail(content: bytes) -> dict:
+    """Key fields of a stock detail page from its label/value cells (th/td, td/td or dt/dd)"""
+    encoding = sniff_encoding(content)
+    fields = {}
+    for pattern in (LABEL_VALUE, DEFINITION):
+        for label, value in pattern.findall(content):
+            key = DETAIL_FIELDS.get(UNIT_SUFFIX.sub('', _text(label, encoding)).casefold())
+            if key and key not in fields:
+                fields[key] = _text(value, encoding)
+    return fields
+
+
+class DetailCache:
+    """
+    Parsed detail fields per company code with the time they were fetched
+
+    Entries past ttl are stale but still served until a refresh replaces them.
+    """
+
+    def __init__(self, path: Optional[str] = DETAIL_CACHE_PATH, ttl: float = DETAIL_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, code: str) -> Optional[dict]:
+        return self._entries.get(code)
+
+    def age(self, code: str) -> float:
+        """Seconds since the last fetch, inf when never fetched"""
+        entry = self._entries.get(code)
+        return time.time() - entry['fetched_at'] if entry else math.inf
+
+    def is_fresh(self, code: str) -> bool:
+        return self.age(code) < self.ttl
+
+    def put(self, code: str, fields: dict) -> None:
+        self._entries[code] = {'fetched_at': time.time(), 'fields': fields}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        from crawler import write_json_atomic
+
+        write_json_atomic(self.path, {'saved_at': time.time(), 'entries': self._entries})
+
+
+def merge_detail(company: dict, entry: dict) -> None:
+    company['detail'] = entry['fields']
+    company['detail_fetched_at'] = datetime.fromtimestamp(entry['fetched_at']).isoformat()
+
+
+class DetailEnricher:
+    """
+    Follows links['stock_prices_url'] of crawled companies and merges the
+    parsed detail fields back into each record
+
+    Every record first gets whatever the cache has, even if stale. Then the
+    records that are missing or past ttl are refreshed, oldest first, with
+    up to `concurrency` requests in flight (AIMD, see adaptive_concurrency)
+    and at most `rate` requests per second. max_fetches caps a run, so a
+    daily refresh spends its budget on the stalest records.
+    """
+
+    def __init__(self, cache: Optional[DetailCache] = None, concurrency: int = 4, rate: float = 2.0,
+                 max_fetches: Optional[int] = None, base_url: Optional[str] = None,
+                 before_fetch: Optional[Callable[[], Awaitable[None]]] = None):
+        self.cache = cache if cache is not None else DetailCache()
+        self.controller = AIMDController(initial=min(2, concurrency), max_limit=concurrency)
+        self.limiter = RateLimiter(rate)
+        self.max_fetches = max_fetches
+        self.base_url = base_url
+        self.before_fetch = before_fetch
+        self._sessions = []
+        self.stats = {'cached': 0, 'fetched': 0, 'failed': 0, 'skipped': 0, 'no_link': 0}
+
+    def detail_url(self, company: dict) -> Optional[str]:
+        link = (company.get('links') or {}).get('stock_prices_url')
+        if not link:
+            return None
+        if self.base_url is None:
+            from crawler import JPX_SEARCH_URL
+            self.base_url = JPX_SEARCH_URL
+        return urljoin(self.base_url, link)
+
+    def plan(self, companies: List[dict]) -> List[dict]:
+        """Records that need a fetch, stalest (never fetched) first, capped at max_fetches"""
+        stale = []
+        for company in companies:
+            code = company.get('code')
+            if not code:
+                continue
+            if not self.detail_url(company):
+                self.stats['no_link'] += 1
+            elif not self.cache.is_fresh(code):
+                stale.append(company)
+
+        stale.sort(key=lambda company: self.cache.age(company['code']), reverse=True)
+        if self.max_fetches is not None:
+            self.stats['skipped'] += max(len(stale) - self.max_fetches, 0)
+            stale = stale[:self.max_fetches]
+        return stale
+
+    async def _refresh(self, company: dict) -> None:
+        from crawler import create_session
+
+        if self.before_fetch is not None:
+            await self.before_fetch()
+        await self.limiter.wait()
+
+        url = self.detail_url(company)
+
+        def fetch(timeout):
+            # One requests session per in-flight fetch, reused afterwards
+            session = self._sessions.pop() if self._sessions else create_session()
+            try:
+                return session.get(url, timeout=timeout)
+            finally:
+                self._sessions.append(session)
+
+        try:
+            response = await self.controller.request(fetch)
+            response.raise_for_status()
+            fields = parse_stock_detail(response.content)
+        except Exception as e:
+            self.stats['failed'] += 1
+            company['detail_error'] = str(e)
+            return
+
+        self.cache.put(company['code'], fields)
+        merge_detail(company, self.cache.get(company['code']))
+        company.pop('detail_error', None)
+        self.stats['fetched'] += 1
+
+    async def enrich(self, companies: List[dict]) -> List[dict]:
+        """Merge cached details now, refresh stale ones concurrently, returns companies"""
+        for company in companies:
+            entry = self.cache.get(company.get('code'))
+            if entry is not None:
+                merge_detail(company, entry)
+                self.stats['cached'] += 1
+
+        stale = self.plan(companies)
+        await asyncio.gather(*(self._refresh(company) for company in stale))
+        return companies
+
+    def close(self) -> None:
+        self.cache.save()
+        for session in self._sessions:
+            session.close()
+        self._sessions.clear()
+
+
+def enrich_snapshot(path: str, concurrency: int = 4, rate: float = 2.0,
+                    max_fetches: Optional[int] = None) -> dict:
+    """Enrich a crawl result file in place"""
+    from crawler import write_json_atomic
+
+    with open(path, 'r', encoding='utf-8') as f:
+        result = json.load(f)
+
+    enricher = DetailEnricher(concurrency=concurrency, rate=rate, max_fetches=max_fetches)
+    start = time.perf_counter()
+    try:
+        asyncio.run(enricher.enrich(result.get('companies', [])))
+    finally:
+        enricher.close()
+    write_json_atomic(path, result)
+
+    stats = enricher.stats
+    print(f"🔎 Details: {stats['fetched']} fetched, {stats['cached']} from cache, {stats['failed']} failed, "
+          f"{stats['skipped']} left for the next run in {time.perf_counter() - start:.1f} s")
+    return stats
+
+
+def benchmark(count: int = 200, concurrency: int = 8) -> dict:
+    """Serial vs concurrent enrichment against the mock, then a cached and a partly stale rerun"""
+    from mock_server import MockJPXServer
+    from synthetic_pages import synthetic_companies
+
+    print(f"\n⏱️ Detail enrichment: {count} companies, mock latency 50 ms")
+    results = {}
+    with MockJPXServer(base_latency=0.05, capacity=16, overload=64) as mock:
+        base_url = f'{mock.base_url}/tseHpFront/JJK020010Action.do'
+        cache = DetailCache(path=None)
+
+        runs = [('serial', 1, DetailCache(path=None)), ('concurrent', concurrency, cache),
+                ('cached', concurrency, cache), ('quarter_stale', concurrency, cache)]
+        for label, workers, run_cache in runs:
+            if label == 'quarter_stale':
+                for code in list(run_cache._entries)[::4]:
+                    run_cache._entries[code]['fetched_at'] -= run_cache.ttl + 1
+
+            enricher = DetailEnricher(run_cache, concurrency=workers, rate=1000, base_url=base_url)
+            records = synthetic_companies(count)
+            start = time.perf_counter()
+            asyncio.run(enricher.enrich(records))
+            elapsed = time.perf_counter() - start
+            enricher.close()
+
+            enriched = sum(1 for company in records if company.get('detail'))
+            results[label] = {'seconds': elapsed, **enricher.stats}
+            print(f"  {label}: {elapsed:.2f} s, {enricher.stats['fetched']} fetched, "
+                  f"{enricher.stats['cached']} cached, {enriched}/{count} enriched")
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+        enrich_snapshot(sys.argv[1])
+    else:
+        benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
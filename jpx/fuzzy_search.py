@@ -0,0 +1,179 @@
+import heapq
+import os
+import random
+import re
+import string
+import sys
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from typing import List, Tuple
+
+
+# Hidden fields holding company name variants: eqMgrNm and anything like eqMgrNmKn/eqMgrNmEn
+NAME_FIELD_PREFIXES = ('eqMgrNm',)
+
+# Legal-form tokens shared by thousands of names, they only add noise to trigram scores
+LEGAL_SUFFIXES = re.compile(
+    r'\b(co|ltd|inc|corp|corporation|company|limited|kk|k k|holdings)\b|株式会社|\(株\)|（株）|有限会社'
+)
+NON_WORD = re.compile(r'[^\w]+')
+
+
+def normalize_name(text: str) -> str:
+    """NFKC (full/half width), casefold, drop punctuation and legal-form tokens"""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = NON_WORD.sub(' ', text)
+    text = LEGAL_SUFFIXES.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of an already normalized string, padded like pg_trgm"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Character trigram inverted index over company names
+
+    Each company can have several name variants (visible name plus hidden-field
+    names), every variant is indexed separately and a company scores as its best
+    variant. Companies can be added page by page while a crawl is running.
+    """
+
+    def __init__(self, postings_budget: int = 20_000, candidates_per_result: int = 20):
+        # Candidate generation walks the rarest query grams first and stops once
+        # postings_budget entries were counted, common grams would touch most of
+        # the index for little signal. Survivors are rescored exactly.
+        self.postings_budget = postings_budget
+        self.candidates_per_result = candidates_per_result
+        self.companies = []
+        self._postings = {}
+        self._variants = []
+        self._variant_company = array('I')
+        self._seen_codes = set()
+
+    def __len__(self):
+        return len(self.companies)
+
+    @staticmethod
+    def name_variants(company: dict) -> List[str]:
+        names = [company.get('name', '')]
+        for field, value in (company.get('hidden_fields') or {}).items():
+            if field.startswith(NAME_FIELD_PREFIXES):
+                names.append(value)
+
+        variants = []
+        for name in names:
+            normalized = normalize_name(name)
+            if normalized and normalized not in variants:
+                variants.append(normalized)
+        return variants
+
+    def add(self, company: dict) -> None:
+        code = company.get('code')
+        if code:
+            # Same company can show up again on a re-crawled page
+            if code in self._seen_codes:
+                return
+            self._seen_codes.add(code)
+
+        company_id = len(self.companies)
+        self.companies.append(company)
+
+        for variant in self.name_variants(company):
+            variant_id = len(self._variants)
+            self._variants.append(variant)
+            self._variant_company.append(company_id)
+            for gram in trigrams(variant):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array('I')
+                postings.append(variant_id)
+
+    def add_companies(self, companies: list) -> None:
+        """Index one parsed page, usable as on_page callback of the crawlers"""
+        for company in companies:
+            self.add(company)
+
+    def search(self, query: str, k: int = 10, min_score: float = 0.3) -> List[Tuple[float, dict]]:
+        """Top-k (score, company) by Dice similarity of trigram sets"""
+        query_grams = trigrams(normalize_name(query))
+        if not query_grams or not self.companies:
+            return []
+
+        posting_lists = sorted((self._postings[g] for g in query_grams if g in self._postings), key=len)
+
+        # Candidate generation: rarest grams first, within the postings budget
+        overlap = Counter()
+        counted = 0
+        for postings in posting_lists:
+            if counted and counted + len(postings) > self.postings_budget:
+                break
+            overlap.update(postings)
+            counted += len(postings)
+
+        # Exact Dice on the best partial matches only
+        query_size = len(query_grams)
+        best = {}
+        for variant_id, _ in overlap.most_common(k * self.candidates_per_result):
+            variant_grams = trigrams(self._variants[variant_id])
+            score = 2.0 * len(query_grams & variant_grams) / (query_size + len(variant_grams))
+            if score < min_score:
+                continue
+            company_id = self._variant_company[variant_id]
+            if score > best.get(company_id, 0.0):
+                best[company_id] = score
+
+        top = heapq.nlargest(k, best.items(), key=lambda item: item[1])
+        return [(round(score, 4), self.companies[company_id]) for company_id, score in top]
+
+
+def _misspell(name: str, rng: random.Random) -> str:
+    """Drop legal suffix, lowercase and swap one letter, like a user query would"""
+    stem = ' '.join(name.split()[:2]).lower()
+    i = rng.randrange(len(stem))
+    return stem[:i] + rng.choice(string.ascii_lowercase) + stem[i + 1:]
+
+
+def benchmark(companies: list, label: str, queries: int = 2000) -> dict:
+    print(f"\n⏱️ {label}: {len(companies):,} companies")
+    rng = random.Random(1)
+
+    index = TrigramIndex()
+    start = time.perf_counter()
+    page_size = 500
+    for i in range(0, len(companies), page_size):
+        index.add_companies(companies[i:i + page_size])
+    build_s = time.perf_counter() - start
+
+    targets = [rng.choice(companies) for _ in range(queries)]
+    query_texts = [_misspell(c['name'], rng) for c in targets]
+
+    hits = 0
+    start = time.perf_counter()
+    for target, text in zip(targets, query_texts):
+        results = index.search(text, k=10)
+        if any(company.get('code') == target.get('code') for _, company in results):
+            hits += 1
+    elapsed = time.perf_counter() - start
+
+    qps = queries / elapsed
+    print(f"  Incremental build: {build_s:.2f} s ({len(companies) / build_s:,.0f} companies/s)")
+    print(f"  Queries/sec: {qps:,.0f} ({elapsed / queries * 1000:.2f} ms/query)")
+    print(f"  Recall@10 with one typo: {hits / queries:.1%}")
+    return {'build_s': build_s, 'qps': qps, 'recall_at_10': hits / queries}
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    from company_index import SNAPSHOT_PATH, load_snapshot
+    from synthetic_pages import synthetic_companies
+
+    if os.path.exists(SNAPSHOT_PATH):
+        benchmark(load_snapshot(), 'Latest JPX snapshot')
+    benchmark(synthetic_companies(rows), 'Synthetic', queries=500)
@@ -3,6 +3,7 @@ from typing import List, Optional, AsyncGenerator
 from crawl4ai import AsyncWebCrawler
 from urllib.parse import urlencode
 from jpx_scraper import SessionAwareJPXScraper
+from profiling import page_done, profiled
 import re
 
 
@@ -110,6 +111,7 @@ async def crawl_jpx_complete_detailed(
                 with open(f'crawl4ai_detailed_success_{page + 1}.html', 'w', encoding='utf-8') as f:
                     f.write(html_content)
                 print(f"💾 Result saved to crawl4ai_detailed_success_{page + 1}.html")
+                page_done()
 
                 yield html_content
 
@@ -224,8 +226,9 @@ async def demo_filters():
 
 
 if __name__ == "__main__":
-    # Main test
-    asyncio.run(test_complete_methods())
+    # Main test, --profile[=N] for a speedscope profile and memory snapshots every N pages
+    with profiled('crawl4ai-detailed'):
+        asyncio.run(test_complete_methods())
 
     # Filter demonstration (uncomment if needed)
     # asyncio.run(demo_filters())
\ No newline at end of file
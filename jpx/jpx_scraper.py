@@ -1,10 +1,17 @@
 import requests
 import asyncio
+import logging
 from typing import List, Optional, AsyncGenerator, Dict
-from crawl4ai import AsyncWebCrawler
 from urllib.parse import urlencode, urlparse, parse_qs
 import re
 
+from profiling import page_done, profiled
+from queue_logging import flush_logging, setup_logging
+from session_pool import default_pool
+from tracing import span
+
+log = logging.getLogger('jpx_scraper')
+
 
 class SessionAwareJPXScraper:
     def __init__(self):
@@ -12,6 +19,7 @@ class SessionAwareJPXScraper:
         self.form_url = "https://www2.jpx.co.jp/tseHpFront/JJK020010Action.do"
         self.session = requests.Session()
         self.jsessionid = None
+        self.pooled = None
 
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
@@ -29,48 +37,26 @@ class SessionAwareJPXScraper:
         }
 
     def initialize_session(self) -> bool:
-        """Initialize session and get JSESSIONID"""
+        """Lease a JSESSIONID from the shared session pool, no handshake when a saved one is live"""
         try:
-            print("🔑 Initialize Session")
-
-            # Get the search form
-            response = self.session.get(self.form_url)
-            response.raise_for_status()
-
-            print(f"✅ Status: {response.status_code}")
-            print(f"✅ Size: {len(response.text)} characters")
-
-            # Extract JSESSIONID from cookies
-            jsessionid_cookie = None
-            for cookie in self.session.cookies:
-                if cookie.name == 'JSESSIONID':
-                    jsessionid_cookie = cookie.value
-                    break
-
-            if jsessionid_cookie:
-                self.jsessionid = jsessionid_cookie
-                print(f"✅ JSESSIONID obtained: {self.jsessionid[:20]}...")
-            else:
-                print("⚠️ JSESSIONID not found in cookies")
-
-            # Also check URL redirect with jsessionid
-            if ';jsessionid=' in response.url:
-                url_jsessionid = response.url.split(';jsessionid=')[1].split('?')[0]
-                if url_jsessionid:
-                    self.jsessionid = url_jsessionid
-                    print(f"✅ JSESSIONID from URL: {self.jsessionid[:20]}...")
-
-            # Save HTML for analysis
-            with open('session_form.html', 'w', encoding='utf-8') as f:
-                f.write(response.text)
-            print("📄 Form saved to session_form.html")
+            log.info("🔑 Initialize Session")
 
+            with span('jpx.lease', client='requests'):
+                self.pooled = default_pool().adopt(self.session)
+            self.jsessionid = self.pooled.jsessionid
+            log.info("✅ JSESSIONID leased: %s...", self.jsessionid[:20])
             return True
 
         except Exception as e:
-            print(f"❌ Session initialization error: {e}")
+            log.error("❌ Session initialization error: %s", e)
             return False
 
+    def release_session(self, healthy: bool = True) -> None:
+        """Return the leased JSESSIONID to the pool, unhealthy ones are recycled"""
+        if self.pooled is not None:
+            default_pool().release(self.pooled, healthy)
+            self.pooled = None
+
     def build_session_form_data(self,
                                 company_count: int = 50,
                                 market_segments: List[str] = None) -> List[tuple]:
@@ -138,51 +124,59 @@ class SessionAwareJPXScraper:
         }
 
         post_data_string = urlencode(form_data)
-        print(f"\n🚀 [SESSION SEARCH] POST data ({len(post_data_string)} characters)")
-        print(f"🚀 Target URL: {target_url}")
-        print(f"🚀 JSESSIONID: {self.jsessionid[:20] if self.jsessionid else 'NONE'}...")
-        print(f"🚀 Referer: {headers['Referer']}")
+        log.debug("🚀 [SESSION SEARCH] POST data (%d characters)", len(post_data_string))
+        log.debug("🚀 Target URL: %s", target_url)
+        log.debug("🚀 JSESSIONID: %s...", self.jsessionid[:20] if self.jsessionid else 'NONE')
+        log.debug("🚀 Referer: %s", headers['Referer'])
 
         szkbu_count = post_data_string.count('szkbuChkbx=')
-        print(f"🚀 Market segments: {szkbu_count}")
+        log.debug("🚀 Market segments: %d", szkbu_count)
 
+        found = False
         try:
-            response = self.session.post(
-                target_url,
-                data=form_data,
-                headers=headers
-            )
+            with span('jpx.request', client='requests', action='JJK020020', page=1) as request_span:
+                response = self.session.post(
+                    target_url,
+                    data=form_data,
+                    headers=headers
+                )
+                request_span.set(status=response.status_code, bytes=len(response.content))
             response.raise_for_status()
 
-            print(f"✅ Status: {response.status_code}")
-            print(f"✅ Size: {len(response.text)} characters")
-            print(f"✅ Final URL: {response.url}")
+            log.debug("✅ Status: %d", response.status_code)
+            log.debug("✅ Size: %d characters", len(response.text))
+            log.debug("✅ Final URL: %s", response.url)
 
             if "件中" in response.text:
-                print("🎉 COMPANY DATA FOUND!")
+                log.info("🎉 COMPANY DATA FOUND!")
 
                 match = re.search(r'Display of (\d+)-(\d+) items/(\d+)', response.text)
                 if match:
                     start, end, total = match.groups()
-                    print(f"📊 Showing: {start}-{end} of {total} companies")
+                    log.info("📊 Showing: %s-%s of %s companies", start, end, total)
                 else:
                     match = re.search(r'(\d+)件中', response.text)
                     if match:
-                        print(f"📊 Found: {match.group(1)} companies")
+                        log.info("📊 Found: %s companies", match.group(1))
 
-                with open('session_search_success.html', 'w', encoding='utf-8') as f:
-                    f.write(response.text)
-                print("💾 Result saved to session_search_success.html")
+                with span('jpx.persist', path='session_search_success.html', bytes=len(response.content)):
+                    with open('session_search_success.html', 'w', encoding='utf-8') as f:
+                        f.write(response.text)
+                log.debug("💾 Result saved to session_search_success.html")
 
+                found = True
                 return response.text
             else:
-                print("❌ Data not found")
+                log.error("❌ Data not found")
                 with open('session_search_error.html', 'w', encoding='utf-8') as f:
                     f.write(response.text)
-                print("💾 Error saved to session_search_error.html")
+                log.info("💾 Error saved to session_search_error.html")
 
         except Exception as e:
-            print(f"❌ Request error: {e}")
+            log.error("❌ Request error: %s", e)
+        finally:
+            # No data usually means JPX dropped the session, recycle it
+            self.release_session(healthy=found)
 
         return ""
 
@@ -195,6 +189,8 @@ async def crawl_jpx_with_session(
         delay: float = 1.0
 ) -> AsyncGenerator[str, None]:
     """Crawl4AI version with proper session initialization"""
+    # crawl4ai pulls in Playwright, the requests-only session class doesn't need it
+    from crawl4ai import AsyncWebCrawler
 
     if market_segments is None:
         market_segments = ['prime', 'standard']
@@ -202,7 +198,7 @@ async def crawl_jpx_with_session(
     # First get session via requests
     scraper = SessionAwareJPXScraper()
     if not scraper.initialize_session():
-        print("❌ Failed to initialize session")
+        log.error("❌ Failed to initialize session")
         return
 
     form_data = scraper.build_session_form_data(
@@ -210,104 +206,116 @@ async def crawl_jpx_with_session(
         market_segments=market_segments
     )
 
-    async with AsyncWebCrawler(verbose=True) as crawler:
-        page = 0
-
-        while True:
-            # Add pagination
-            current_form_data = form_data.copy()
-            if page > 0:
-                current_form_data.append(('pageOffset', str(page * company_count)))
-
-            post_data_string = urlencode(current_form_data)
-
-            # URL with jsessionid
-            target_url = scraper.base_url
-            if scraper.jsessionid:
-                target_url = f"{scraper.base_url};jsessionid={scraper.jsessionid}"
-
-            print(f"\n🤖 [CRAWL4AI SESSION] Page {page + 1}")
-            print(f"🤖 Target URL: {target_url}")
-            print(f"🤖 JSESSIONID: {scraper.jsessionid[:20] if scraper.jsessionid else 'NONE'}...")
-
-            try:
-                # Initialize session for first page
-                if page == 0:
-                    print("🤖 Initializing crawl4ai session...")
-                    init_url = scraper.form_url
-                    if scraper.jsessionid:
-                        init_url = f"{scraper.form_url};jsessionid={scraper.jsessionid}"
-
-                    init_result = await crawler.arun(
-                        url=init_url,
-                        method="GET"
-                    )
-
-                    if not init_result.success:
-                        print("❌ Failed to initialize crawl4ai")
+    healthy = True
+    try:
+        async with AsyncWebCrawler(verbose=True) as crawler:
+            page = 0
+
+            while True:
+                # Add pagination
+                current_form_data = form_data.copy()
+                if page > 0:
+                    current_form_data.append(('pageOffset', str(page * company_count)))
+
+                post_data_string = urlencode(current_form_data)
+
+                # URL with jsessionid
+                target_url = scraper.base_url
+                if scraper.jsessionid:
+                    target_url = f"{scraper.base_url};jsessionid={scraper.jsessionid}"
+
+                log.info("🤖 [CRAWL4AI SESSION] Page %d", page + 1)
+                log.debug("🤖 Target URL: %s", target_url)
+                log.debug("🤖 JSESSIONID: %s...", scraper.jsessionid[:20] if scraper.jsessionid else 'NONE')
+
+                try:
+                    # Initialize session for first page
+                    if page == 0:
+                        log.info("🤖 Initializing crawl4ai session...")
+                        init_url = scraper.form_url
+                        if scraper.jsessionid:
+                            init_url = f"{scraper.form_url};jsessionid={scraper.jsessionid}"
+
+                        with span('jpx.handshake', client='crawl4ai') as handshake_span:
+                            init_result = await crawler.arun(
+                                url=init_url,
+                                method="GET"
+                            )
+                            handshake_span.set(status=init_result.status_code or 0)
+
+                        if not init_result.success:
+                            log.error("❌ Failed to initialize crawl4ai")
+                            break
+
+                        log.info("✅ Crawl4ai session ready")
+
+                    # POST request
+                    with span('jpx.request', client='crawl4ai', action='JJK020020', page=page + 1) as request_span:
+                        result = await crawler.arun(
+                            url=target_url,
+                            method="POST",
+                            data=post_data_string,
+                            headers={
+                                'Content-Type': 'application/x-www-form-urlencoded',
+                                'Origin': 'https://www2.jpx.co.jp',
+                                'Referer': f"{scraper.form_url};jsessionid={scraper.jsessionid}" if scraper.jsessionid else scraper.form_url,
+                                'Cache-Control': 'max-age=0',
+                                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
+                                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+                                'Accept-Language': 'en-US,en;q=0.9',
+                                'Sec-Ch-Ua': '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
+                                'Sec-Ch-Ua-Mobile': '?0',
+                                'Sec-Ch-Ua-Platform': '"macOS"',
+                                'Sec-Fetch-Dest': 'document',
+                                'Sec-Fetch-Mode': 'navigate',
+                                'Sec-Fetch-Site': 'same-origin',
+                                'Sec-Fetch-User': '?1',
+                                'Upgrade-Insecure-Requests': '1'
+                            }
+                        )
+                        request_span.set(status=result.status_code or 0, bytes=len(result.html or ''))
+
+                    if not result.success:
+                        log.error("❌ Error on page %d", page + 1)
                         break
 
-                    print("✅ Crawl4ai session ready")
-
-                # POST request
-                result = await crawler.arun(
-                    url=target_url,
-                    method="POST",
-                    data=post_data_string,
-                    headers={
-                        'Content-Type': 'application/x-www-form-urlencoded',
-                        'Origin': 'https://www2.jpx.co.jp',
-                        'Referer': f"{scraper.form_url};jsessionid={scraper.jsessionid}" if scraper.jsessionid else scraper.form_url,
-                        'Cache-Control': 'max-age=0',
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Sec-Ch-Ua': '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
-                        'Sec-Ch-Ua-Mobile': '?0',
-                        'Sec-Ch-Ua-Platform': '"macOS"',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'same-origin',
-                        'Sec-Fetch-User': '?1',
-                        'Upgrade-Insecure-Requests': '1'
-                    }
-                )
+                    html_content = result.html
 
-                if not result.success:
-                    print(f"❌ Error on page {page + 1}")
-                    break
+                    if "件中" not in html_content:
+                        log.error("❌ No data on page %d", page + 1)
+                        healthy = False
+                        with open(f'crawl4ai_session_debug_{page + 1}.html', 'w', encoding='utf-8') as f:
+                            f.write(html_content)
+                        break
 
-                html_content = result.html
+                    log.info("✅ Success! Page %d, size: %d characters", page + 1, len(html_content))
 
-                if "件中" not in html_content:
-                    print(f"❌ No data on page {page + 1}")
-                    with open(f'crawl4ai_session_debug_{page + 1}.html', 'w', encoding='utf-8') as f:
-                        f.write(html_content)
-                    break
+                    # Analyze results
+                    if "件中" in html_content:
+                        match = re.search(r'Display of (\d+)-(\d+) items/(\d+)', html_content)
+                        if match:
+                            start, end, total = match.groups()
+                            log.info("📊 Showing: %s-%s of %s companies", start, end, total)
 
-                print(f"✅ Success! Page {page + 1}, size: {len(html_content)} characters")
+                    with span('jpx.persist', page=page + 1, bytes=len(html_content)):
+                        with open(f'crawl4ai_session_success_{page + 1}.html', 'w', encoding='utf-8') as f:
+                            f.write(html_content)
+                    page_done()
 
-                # Analyze results
-                if "件中" in html_content:
-                    match = re.search(r'Display of (\d+)-(\d+) items/(\d+)', html_content)
-                    if match:
-                        start, end, total = match.groups()
-                        print(f"📊 Showing: {start}-{end} of {total} companies")
+                    yield html_content
 
-                with open(f'crawl4ai_session_success_{page + 1}.html', 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                    if max_pages and page + 1 >= max_pages:
+                        break
 
-                yield html_content
+                    page += 1
+                    await asyncio.sleep(delay)
 
-                if max_pages and page + 1 >= max_pages:
+                except Exception as e:
+                    log.error("❌ Error on page %d: %s", page + 1, e)
                     break
-
-                page += 1
-                await asyncio.sleep(delay)
-
-            except Exception as e:
-                print(f"❌ Error on page {page + 1}: {e}")
-                break
+    finally:
+        # The browser used the leased JSESSIONID, a page without data means JPX dropped it
+        scraper.release_session(healthy)
 
 
 # Test with proper session
@@ -338,6 +346,7 @@ async def test_session_methods():
             crawl4ai_success = True
         break
 
+    flush_logging()
     print("\n" + "=" * 70)
     print("🏁 SESSION RESULTS")
     print("=" * 70)
@@ -356,4 +365,6 @@ async def test_session_methods():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_session_methods())
\ No newline at end of file
+    setup_logging()
+    with profiled('jpx-session'):
+        asyncio.run(test_session_methods())
\ No newline at end of file
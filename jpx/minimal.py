@@ -1,6 +1,8 @@
 import requests
 from urllib.parse import urlencode
 
+from session_pool import default_pool
+
 
 class SwitchToQuickSearch:
     def __init__(self):
@@ -8,6 +10,7 @@ class SwitchToQuickSearch:
         self.submit_url = "https://www2.jpx.co.jp/tseHpFront/JJK020020Action.do"
         self.session = requests.Session()
         self.jsessionid = None
+        self.pooled = None
 
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
@@ -17,18 +20,21 @@ class SwitchToQuickSearch:
         })
 
     def get_session(self):
+        """Lease a JSESSIONID from the shared session pool (session_pool.py)"""
         try:
-            response = self.session.get(self.form_url)
-            for cookie in self.session.cookies:
-                if cookie.name == 'JSESSIONID':
-                    self.jsessionid = cookie.value
-                    break
+            self.pooled = default_pool().adopt(self.session)
+            self.jsessionid = self.pooled.jsessionid
             print(f"✅ JSESSIONID: {self.jsessionid}")
             return True
         except Exception as e:
             print(f"❌ Session error: {e}")
             return False
 
+    def release_session(self, healthy=True):
+        if self.pooled is not None:
+            default_pool().release(self.pooled, healthy)
+            self.pooled = None
+
     def switch_to_quick_search(self):
         """Switches to Quick Search mode"""
 
@@ -156,22 +162,26 @@ class DirectQuickSearch:
         self.submit_url = "https://www2.jpx.co.jp/tseHpFront/JJK020020Action.do"
         self.session = requests.Session()
         self.jsessionid = None
+        self.pooled = None
 
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
 
     def get_session(self):
+        """Lease a JSESSIONID from the shared session pool (session_pool.py)"""
         try:
-            response = self.session.get(self.form_url)
-            for cookie in self.session.cookies:
-                if cookie.name == 'JSESSIONID':
-                    self.jsessionid = cookie.value
-                    break
+            self.pooled = default_pool().adopt(self.session)
+            self.jsessionid = self.pooled.jsessionid
             return True
-        except:
+        except Exception:
             return False
 
+    def release_session(self, healthy=True):
+        if self.pooled is not None:
+            default_pool().release(self.pooled, healthy)
+            self.pooled = None
+
     def test_with_show_parameter(self):
         """Tests with Show parameter instead of ListShow"""
 
@@ -236,12 +246,16 @@ def main():
     print("\n1️⃣ Switching via Switch parameter...")
     switcher = SwitchToQuickSearch()
     switch_result = switcher.test_quick_search_after_switch()
+    # The session stays in Quick Search mode on the JPX side, don't hand it to detailed searches
+    switcher.release_session(healthy=False)
     switch_success = bool(switch_result)
 
     # Test 2: Direct Quick Search with Show
     print("\n2️⃣ Direct Quick Search with Show parameter...")
     direct = DirectQuickSearch()
     show_result = direct.test_with_show_parameter()
+    # Same for a Show search, its mode on the JPX side is unknown afterwards
+    direct.release_session(healthy=False)
     show_success = bool(show_result)
 
     print("\n" + "=" * 70)
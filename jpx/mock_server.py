@@ -0,0 +1,267 @@
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Validation error page JPX answers with when the form/session state is off
+ERROR_PAGE = (
+    '<html><body><form name="JJK020010Form">'
+    '<span id="cgTabError">Listed Market should 1 or more checks.</span>'
+    '</form></body></html>'
+).encode('utf-8')
+
+ASSET_TYPES = {'.css': 'text/css', '.png': 'image/png', '.jpg': 'image/jpeg', '.woff2': 'font/woff2'}
+
+
+class MockJPXServer:
+    """
+    Local stand-in for www2.jpx.co.jp/tseHpFront with a capacity model
+
+    - GET  JJK020010Action.do          -> search form, sets a JSESSIONID cookie
+    - POST JJK020010Action.do          -> results page 1
+    - POST JJK020030Action.do, pageNo  -> results page N
+    - GET  stock_detail?code=N         -> stock detail page of a company
+    - GET  common/{css,img,font}/...   -> stylesheets, images and a web font
+
+    Latency is base_latency × slowdown, growing once more than `capacity`
+    requests are in flight. Past `overload` in-flight requests it answers 429
+    (or 503), and error_rate of the answers are the "should 1 or more checks"
+    error page. Phases (start_s, end_s, factor[, error_rate]) counted from
+    start() slow the server down and may raise the error rate for a while;
+    set_slowdown() changes the factor on the fly.
+
+    Like Tomcat, GET only sets a new JSESSIONID cookie when the request's
+    session is unknown or idle past session_ttl.
+
+    Pages are rendered on demand, so total_items can be in the millions.
+    """
+
+    CACHED_PAGES = 256
+
+    def __init__(self, total_items: int = 2000, per_page: int = 100, base_latency: float = 0.05,
+                 capacity: int = 8, overload: int = 16, error_rate: float = 0.0,
+                 phases: Optional[List[tuple]] = None, session_ttl: float = 30 * 60, port: int = 0,
+                 seed: int = 1):
+        self.total_items = total_items
+        self.per_page = per_page
+        self.base_latency = base_latency
+        self.capacity = capacity
+        self.overload = overload
+        self.error_rate = error_rate
+        self.phases = phases or []
+        self.session_ttl = session_ttl
+        self.port = port
+        self.seed = seed
+
+        self._slowdown = 1.0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._pages = {}
+        self._search_page = None
+        self._sessions = {}  # JSESSIONID -> last seen
+        self._server = None
+        self._thread = None
+        self.started_at = None
+
+        self.in_flight = 0
+        self.stats = {'requests': 0, 'rejected': 0, 'error_pages': 0, 'max_in_flight': 0, 'sessions': 0,
+                      'asset_bytes': 0}
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def set_slowdown(self, factor: float) -> None:
+        self._slowdown = factor
+
+    def current_phase(self) -> Tuple[float, float]:
+        """(slowdown factor, error rate) right now"""
+        elapsed = time.monotonic() - self.started_at
+        for start_s, end_s, factor, *error_rate in self.phases:
+            if start_s <= elapsed < end_s:
+                return factor * self._slowdown, (error_rate or [self.error_rate])[0]
+        return self._slowdown, self.error_rate
+
+    def results_page(self, page: int) -> bytes:
+        """Rendered JJK020030 page (synthetic_pages.py), the first CACHED_PAGES pages stay cached"""
+        page_bytes = self._pages.get(page)
+        if page_bytes is None:
+            from synthetic_pages import results_page
+
+            page_bytes = results_page(page, self.per_page, self.total_items, self.seed)
+            if len(self._pages) < self.CACHED_PAGES:
+                self._pages[page] = page_bytes
+        return page_bytes
+
+    def search_page(self) -> bytes:
+        from synthetic_pages import render_search_page
+
+        if self._search_page is None:
+            self._search_page = render_search_page()
+        return self._search_page
+
+    def asset(self, extension: str) -> bytes:
+        """Filler bytes of the size synthetic_pages.ASSET_SIZES gives the type"""
+        from synthetic_pages import ASSET_SIZES
+
+        with self._lock:
+            self.stats['asset_bytes'] += ASSET_SIZES.get(extension, 1000)
+        return b'/' * ASSET_SIZES.get(extension, 1000)
+
+    def detail_page(self, code: str) -> bytes:
+        """Stock detail page with th/td rows, values derived from the code"""
+        rng = random.Random(code)
+        price = rng.randint(100, 20000)
+        rows = {
+            'Current Price': f'{price:,}',
+            'Previous Close': f'{price + rng.randint(-50, 50):,}',
+            'Trading Volume': f'{rng.randint(1000, 5_000_000):,}',
+            'Market Capitalization (mil. yen)': f'{price * rng.randint(10, 5000) // 1000:,}',
+            'Number of Listed Shares': f'{rng.randint(1, 500) * 1_000_000:,}',
+            'Trading Unit': '100 shares',
+            'ISIN Code': f'JP{rng.randint(10 ** 9, 10 ** 10 - 1)}',
+        }
+        body = ''.join(f'<tr><th>{label}</th><td>{value}</td></tr>' for label, value in rows.items())
+        return (f'<html><head><meta charset="utf-8"></head><body><h2>{code}</h2>'
+                f'<table class="stock">{body}</table></body></html>').encode('utf-8')
+
+    def _admit(self):
+        """Returns (status, delay, error_page) for a new request and counts it in flight"""
+        slowdown, error_rate = self.current_phase()
+        with self._lock:
+            self.in_flight += 1
+            self.stats['requests'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+            in_flight = self.in_flight
+            error_page = self._rng.random() < error_rate
+
+        if in_flight > self.overload:
+            return (429 if in_flight % 2 else 503), 0.0, False
+
+        # Queueing past capacity: every extra request adds a share of the base latency
+        congestion = 1.0 + max(0, in_flight - self.capacity) / self.capacity
+        return 200, self.base_latency * slowdown * congestion, error_page
+
+    def touch_session(self, jsessionid: Optional[str]) -> Optional[str]:
+        """None if the session is live, else a newly issued JSESSIONID"""
+        now = time.monotonic()
+        with self._lock:
+            last_seen = self._sessions.get(jsessionid)
+            if last_seen is not None and now - last_seen < self.session_ttl:
+                self._sessions[jsessionid] = now
+                return None
+            jsessionid = uuid.uuid4().hex.upper()
+            self._sessions[jsessionid] = now
+            self.stats['sessions'] += 1
+            return jsessionid
+
+    def _done(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, cookie: Optional[str] = None,
+                      content_type: str = 'text/html; charset=utf-8'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if cookie:
+                    self.send_header('Set-Cookie', f'JSESSIONID={cookie}; Path=/tseHpFront')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self, render, cookie: Optional[str] = None, content_type: Optional[str] = None):
+                status, delay, error_page = server._admit()
+                try:
+                    if status != 200:
+                        with server._lock:
+                            server.stats['rejected'] += 1
+                        self._send(status, b'Too busy')
+                        return
+                    time.sleep(delay)
+                    if content_type is not None:
+                        self._send(200, render(), content_type=content_type)
+                        return
+                    if error_page:
+                        with server._lock:
+                            server.stats['error_pages'] += 1
+                        self._send(200, ERROR_PAGE)
+                        return
+                    self._send(200, render(), cookie)
+                finally:
+                    server._done()
+
+            def _jsessionid(self) -> Optional[str]:
+                if ';jsessionid=' in self.path:
+                    return self.path.split(';jsessionid=')[1].split('?')[0]
+                cookies = SimpleCookie(self.headers.get('Cookie', ''))
+                return cookies['JSESSIONID'].value if 'JSESSIONID' in cookies else None
+
+            def do_GET(self):
+                if 'stock_detail' in self.path:
+                    query = parse_qs(urlsplit(self.path).query)
+                    code = (query.get('code') or query.get('QCODE') or [''])[0]
+                    self._handle(lambda: server.detail_page(code))
+                    return
+                if '/common/' in self.path:
+                    extension = os.path.splitext(urlsplit(self.path).path)[1]
+                    self._handle(lambda: server.asset(extension), content_type=ASSET_TYPES.get(extension, 'text/plain'))
+                    return
+                self._handle(server.search_page, cookie=server.touch_session(self._jsessionid()))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                page = 1
+                if 'JJK020030Action.do' in self.path:
+                    page = int((form.get('pageNo') or ['1'])[0])
+                self._handle(lambda: server.results_page(page))
+
+        return Handler
+
+    def start(self) -> str:
+        """Serve in a background thread, returns the base URL"""
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.started_at = time.monotonic()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    mock = MockJPXServer(port=port)
+    print(f"🧪 Mock JPX on {mock.start()} (set JPX_BASE_URL to use it), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock.stop()
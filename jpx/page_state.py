@@ -0,0 +1,170 @@
+import html
+import re
+import sys
+import time
+from typing import List, Optional
+
+
+def _class_pattern(tag: bytes, css_class: bytes) -> bytes:
+    """Opening tag with css_class among its classes, like soup's class_= match"""
+    return rb'<' + tag + rb'\b[^>]*\bclass=["\'](?:[^"\']*\s)?' + css_class + rb'(?:\s[^"\']*)?["\'][^>]*>'
+
+
+FORM_030 = re.compile(rb'<form\b[^>]*\bname=["\']?JJK020030Form\b[^>]*>', re.I)
+FORM_END = re.compile(rb'</form\s*>', re.I)
+INPUT_TAG = re.compile(r'<input\b([^>]*)>', re.I)
+ATTRIBUTE = re.compile(r'([\w:.\-\[\]]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+
+PAGING_MENU = re.compile(_class_pattern(rb'div', rb'pagingmenu'), re.I)
+LEFT_DIV = re.compile(_class_pattern(rb'div', rb'left') + rb'(.*?)</div>', re.I | re.S)
+CURRENT_PAGE = re.compile(_class_pattern(rb'b', rb'current') + rb'(.*?)</b>', re.I | re.S)
+TAG = re.compile(rb'<[^>]+>')
+META_CHARSET = re.compile(rb'<meta\b[^>]*charset=["\']?([\w\-]+)', re.I)
+ITEMS = re.compile(r'(\d+)-(\d+)\s+items?/(\d+)')
+
+# "Next" button of the pagingmenu, only rendered as a link when there is a next page
+NEXT_PAGE_LINK = re.compile(rb'class="next_e"[^>]*>\s*<a\b')
+
+
+def has_next_link(content: bytes) -> bool:
+    """Cheap has_next_page check on raw bytes, no soup needed"""
+    return NEXT_PAGE_LINK.search(content) is not None
+
+
+def sniff_encoding(content: bytes) -> str:
+    """Charset of the page's <meta> tag, utf-8 without one"""
+    match = META_CHARSET.search(content, 0, 2048)
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+
+def _attributes(tag: str) -> dict:
+    attributes = {}
+    for name, double, single, bare in ATTRIBUTE.findall(tag):
+        value = double or single or bare
+        # First occurrence wins, as in html.parser
+        attributes.setdefault(name.lower(), html.unescape(value) if '&' in value else value)
+    return attributes
+
+
+def extract_form_fields(content: bytes, encoding: Optional[str] = None) -> Optional[dict]:
+    """
+    Hidden inputs of the JJK020030Form as {name: value}, None without that form
+
+    One regex pass over the decoded form, same result as
+    form_030.find_all('input', {'type': 'hidden'}) on a soup.
+    """
+    form = FORM_030.search(content)
+    if form is None:
+        return None
+    encoding = encoding or sniff_encoding(content)
+    end = FORM_END.search(content, form.end())
+    stop = end.start() if end else len(content)
+
+    fields = {}
+    # Decoded once, the form is mostly hidden inputs
+    for tag in INPUT_TAG.findall(content[form.end():stop].decode(encoding, 'replace')):
+        attributes = _attributes(tag)
+        if attributes.get('type') == 'hidden' and attributes.get('name'):
+            fields[attributes['name']] = attributes.get('value', '')
+    return fields
+
+
+def extract_pagination(content: bytes, encoding: Optional[str] = None) -> dict:
+    """
+    crawler.extract_pagination_info on raw bytes
+
+    Reads the first div.pagingmenu: "Display of a-b items/N", b.current and
+    the next_e link.
+    """
+    pagination_info = {
+        'current_page': 1,
+        'total_pages': 1,
+        'total_items': 0,
+        'items_per_page': 10,
+        'has_next_page': False,
+        'has_prev_page': False
+    }
+
+    menu = PAGING_MENU.search(content)
+    if menu is None:
+        return pagination_info
+    # The menu ends before the results table (or the next menu at the bottom)
+    table = content.find(b'<table', menu.end())
+    stop = table if table != -1 else len(content)
+
+    left = LEFT_DIV.search(content, menu.end(), stop)
+    if left:
+        text = html.unescape(TAG.sub(b'', left.group(1)).decode(encoding or sniff_encoding(content), 'replace'))
+        items_match = ITEMS.search(text)
+        if items_match:
+            start_item, end_item, total_items = (int(g) for g in items_match.groups())
+            per_page = end_item - start_item + 1
+            pagination_info['total_items'] = total_items
+            pagination_info['items_per_page'] = per_page
+            pagination_info['current_page'] = (start_item - 1) // per_page + 1
+            pagination_info['total_pages'] = (total_items + per_page - 1) // per_page
+
+    current = CURRENT_PAGE.search(content, menu.end(), stop)
+    if current:
+        try:
+            pagination_info['current_page'] = int(TAG.sub(b'', current.group(1)).strip())
+        except ValueError:
+            pass
+
+    if NEXT_PAGE_LINK.search(content, menu.end(), stop):
+        pagination_info['has_next_page'] = True
+    if pagination_info['current_page'] > 1:
+        pagination_info['has_prev_page'] = True
+    return pagination_info
+
+
+def _soup_state(content: bytes):
+    from bs4 import BeautifulSoup
+    from crawler import extract_pagination_info
+
+    soup = BeautifulSoup(content, 'html.parser')
+    form_030 = soup.find('form', attrs={'name': 'JJK020030Form'})
+    fields = None
+    if form_030:
+        fields = {}
+        for hidden in form_030.find_all('input', {'type': 'hidden'}):
+            if hidden.get('name'):
+                fields[hidden.get('name')] = hidden.get('value', '')
+    return fields, extract_pagination_info(soup)
+
+
+def benchmark(contents: List[bytes], repeat: int = 3) -> dict:
+    """Fast path vs BeautifulSoup on the same pages, checks both agree"""
+    size_mb = sum(len(c) for c in contents) / 1e6
+    print(f"\n⏱️ JJK020030 form state: {len(contents)} pages, {size_mb:.1f} MB")
+
+    mismatches = sum(
+        1 for content in contents
+        if _soup_state(content) != (extract_form_fields(content), extract_pagination(content))
+    )
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in contents:
+            _soup_state(content)
+    soup_s = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in contents:
+            extract_form_fields(content)
+            extract_pagination(content)
+    fast_s = (time.perf_counter() - start) / repeat
+
+    print(f"  BeautifulSoup: {soup_s / len(contents) * 1000:.2f} ms/page")
+    print(f"  Byte scan: {fast_s / len(contents) * 1000:.3f} ms/page (x{soup_s / fast_s:.0f})")
+    print(f"  {'✅ Same fields and pagination on every page' if not mismatches else f'❌ {mismatches} page(s) differ'}")
+    return {'soup_ms': soup_s / len(contents) * 1000, 'fast_ms': fast_s / len(contents) * 1000,
+            'mismatches': mismatches}
+
+
+if __name__ == "__main__":
+    from parse_pool import replay_pages
+
+    per_page = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    benchmark(replay_pages(per_page=per_page))
@@ -0,0 +1,173 @@
+import asyncio
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from tracing import attach, span
+
+
+def parse_page_bytes(content: bytes, page: int) -> Tuple[list, dict]:
+    """
+    Parse one JJK020030 results page in a worker process
+
+    Takes the raw response body and returns only the company records and the
+    pagination info, so the soup never crosses the process boundary.
+    """
+    from bs4 import BeautifulSoup
+    from crawler import extract_pagination_info, parse_companies_from_soup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    companies = parse_companies_from_soup(soup)
+    for company in companies:
+        company['page'] = page
+    return companies, extract_pagination_info(soup)
+
+
+class ParsePool:
+    """
+    Process pool for the CPU-bound parse stage
+
+    Fetching stays on the caller's thread / event loop, pages are handed over
+    as bytes and parsed on other cores while the next page downloads.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, content: bytes, page: int):
+        """concurrent.futures.Future of (companies, pagination_info)"""
+        return self._executor.submit(parse_page_bytes, content, page)
+
+    async def parse(self, content: bytes, page: int, **attributes) -> Tuple[list, dict]:
+        """Parse in the pool, traced as a jpx.parse span (attributes, e.g. job=..., are added to it)"""
+        with span('jpx.parse', page=page, bytes=len(content), workers=self.workers, **attributes) as parse_span:
+            companies, pagination_info = await asyncio.wrap_future(self.submit(content, page))
+            parse_span.set(companies=len(companies))
+        return companies, pagination_info
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def crawl_pages(session, jsessionid: str, search_params: dict, pool: ParsePool,
+                      max_pages: Optional[int] = None, delay: float = 0,
+                      before_fetch: Optional[Callable[[], Awaitable[None]]] = None,
+                      on_page: Optional[Callable[[list], None]] = None) -> Tuple[List[list], dict]:
+    """
+    Fetch results pages one after another and parse them in the pool
+
+    Page 1 is parsed before going on, its pagination info tells how many pages
+    there are. From then on page N+1 is fetched while page N is still being
+    parsed. JPX keeps search state per session, so fetches stay sequential.
+
+    Returns (companies per page in page order, pagination info of page 1).
+    """
+    from crawler import JPX_SEARCH_URL, fetch_results_page
+
+    url = f"{JPX_SEARCH_URL};jsessionid={jsessionid}"
+
+    async def fetch_and_parse(page: int):
+        """(page span, task parsing the page)"""
+        if before_fetch is not None:
+            await before_fetch()
+        with span('jpx.page', page=page) as page_span:
+            response = await asyncio.to_thread(fetch_results_page, session, url, search_params, page)
+            page_span.set(status=response.status_code, bytes=len(response.content))
+            # The task copies the context here: its jpx.parse span is a child of this page
+            # (sampled with it), even though it ends after the page span
+            return page_span, asyncio.ensure_future(pool.parse(response.content, page))
+
+    first_span, first_parse = await fetch_and_parse(1)
+    first_companies, pagination_info = await first_parse
+    if on_page is not None:
+        with attach(first_span):
+            on_page(first_companies)
+
+    last_page = pagination_info.get('total_pages') or 1
+    if not pagination_info.get('has_next_page') or not first_companies:
+        last_page = 1
+    if max_pages:
+        last_page = min(last_page, max_pages)
+
+    pending = []
+    for page in range(2, last_page + 1):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending.append(await fetch_and_parse(page))
+
+    pages = [first_companies]
+    for page_span, future in pending:
+        companies, _ = await future
+        if on_page is not None:
+            with attach(page_span):
+                on_page(companies)
+        pages.append(companies)
+    return pages, pagination_info
+
+
+def replay_pages(pattern: str = 'jpx_page_*.html', pages: int = 24, per_page: int = 200) -> List[bytes]:
+    """Saved results pages, or pages rendered from the latest snapshot (synthetic rows without one)"""
+    paths = sorted(glob.glob(pattern))
+    if paths:
+        contents = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                contents.append(f.read())
+        return contents
+
+    from company_index import SNAPSHOT_PATH, load_snapshot
+    from synthetic_pages import render_results_page, results_page
+
+    total = pages * per_page
+    companies = load_snapshot() if os.path.exists(SNAPSHOT_PATH) else []
+    if len(companies) < per_page:
+        return [results_page(page, per_page, total) for page in range(1, pages + 1)]
+
+    contents = []
+    for page in range(1, pages + 1):
+        start = (page - 1) * per_page % max(len(companies) - per_page, 1)
+        contents.append(render_results_page(companies[start:start + per_page], page, per_page, total))
+    return contents
+
+
+def benchmark(contents: List[bytes], worker_counts: List[int]) -> dict:
+    size_mb = sum(len(c) for c in contents) / 1e6
+    print(f"\n⏱️ Parse stage: {len(contents)} pages, {size_mb:.1f} MB (cpu_count={os.cpu_count()})")
+
+    start = time.perf_counter()
+    companies = sum(len(parse_page_bytes(content, i + 1)[0]) for i, content in enumerate(contents))
+    inline_s = time.perf_counter() - start
+    print(f"  In-process: {len(contents) / inline_s:.1f} pages/s ({companies:,} companies)")
+
+    results = {'inline_pages_per_s': len(contents) / inline_s}
+    for workers in worker_counts:
+        with ParsePool(workers) as pool:
+            # Warm the workers up, the first import of bs4 in each one isn't parse time
+            list(pool._executor.map(parse_page_bytes, contents[:workers], range(workers)))
+
+            start = time.perf_counter()
+            futures = [pool.submit(content, i + 1) for i, content in enumerate(contents)]
+            parsed = sum(len(f.result()[0]) for f in futures)
+            elapsed = time.perf_counter() - start
+
+        rate = len(contents) / elapsed
+        results[f'workers_{workers}_pages_per_s'] = rate
+        print(f"  {workers} worker(s): {rate:.1f} pages/s (x{rate / results['inline_pages_per_s']:.2f}, "
+              f"{parsed:,} companies)")
+    return results
+
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    counts = sorted({1, 2, 4, 8, max_workers} & set(range(1, max_workers + 1)))
+    benchmark(replay_pages(), counts)
@@ -0,0 +1,346 @@
+import json
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Snapshot every N pages unless --profile=N says otherwise (0: CPU sampling only)
+PROFILE_EVERY = 5
+# Frames kept per allocation. 1 charges memory to the line that allocated it
+# (bs4's tag_class(...) for a soup) at ~2.5x slower parsing; ~20 reach back
+# from bs4 / json internals to the repo line behind them, at ~15x.
+TRACE_FRAMES = int(os.environ.get('JPX_PROFILE_FRAMES') or 1)
+
+# Leaf frames of a thread parked on a lock, a queue or the event loop's select: not work
+IDLE_LEAVES = {('threading.py', 'wait'), ('threading.py', '_wait_for_tstate_lock'), ('selectors.py', 'select'),
+               ('thread.py', '_worker'), ('queue.py', 'get'), ('handlers.py', 'dequeue')}
+
+
+def profile_argv(argv: Optional[List[str]] = None) -> Optional[int]:
+    """--profile (snapshot every PROFILE_EVERY pages) or --profile=N in argv, None without it"""
+    for arg in sys.argv[1:] if argv is None else argv:
+        if arg == '--profile':
+            return PROFILE_EVERY
+        if arg.startswith('--profile='):
+            return int(arg.split('=', 1)[1])
+    return None
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler in a background thread
+
+    Every `interval` seconds the Python stack of every other thread is read
+    from sys._current_frames(), nothing is hooked into the profiled code, so
+    the cost is one stack walk per thread per sample. Stacks are written in
+    speedscope's sampled format (one profile per thread), open the file at
+    https://www.speedscope.app or with `speedscope FILE`.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.frames: List[dict] = []
+        self._frame_ids: Dict[object, int] = {}
+        self._samples: Dict[int, Tuple[List[tuple], List[float]]] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = self.stopped_at = 0.0
+
+    def _frame_id(self, code) -> int:
+        index = self._frame_ids.get(code)
+        if index is None:
+            index = self._frame_ids[code] = len(self.frames)
+            self.frames.append({'name': getattr(code, 'co_qualname', code.co_name), 'file': code.co_filename,
+                                'line': code.co_firstlineno})
+        return index
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_id(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                samples, weights = self._samples.setdefault(ident, ([], []))
+                samples.append(tuple(stack))
+                weights.append(weight)
+                if ident not in self._thread_names:
+                    self._thread_names.update((t.ident, t.name) for t in threading.enumerate())
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.stopped_at = time.perf_counter()
+
+    def _own(self, stack: tuple) -> bool:
+        """Sample taken while MemoryWatch was snapshotting, overhead of --profile itself"""
+        return any(self.frames[index]['name'].startswith('MemoryWatch.') for index in stack)
+
+    def _idle(self, stack: tuple) -> bool:
+        frame = self.frames[stack[-1]] if stack else None
+        return frame is None or (os.path.basename(frame['file']), frame['name'].rsplit('.', 1)[-1]) in IDLE_LEAVES
+
+    def write_speedscope(self, path: str, name: str) -> str:
+        main = threading.main_thread().ident
+        profiles = []
+        # Main thread first, threads that only ever waited are left out
+        for ident, (samples, weights) in sorted(self._samples.items(), key=lambda kv: kv[0] != main):
+            if all(self._idle(stack) for stack in samples):
+                continue
+            profiles.append({'type': 'sampled', 'name': self._thread_names.get(ident, str(ident)),
+                             'unit': 'seconds', 'startValue': 0, 'endValue': sum(weights),
+                             'samples': [list(stack) for stack in samples], 'weights': weights})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'$schema': 'https://www.speedscope.app/file-format-schema.json', 'name': name,
+                       'exporter': 'jpx/profiling.py', 'shared': {'frames': self.frames}, 'profiles': profiles}, f)
+        return path
+
+    def top(self, limit: int = 15) -> List[Tuple[str, float]]:
+        """(function, seconds) by self time over all threads, idle waits and snapshots left out"""
+        self_s: Dict[int, float] = {}
+        for samples, weights in self._samples.values():
+            for stack, weight in zip(samples, weights):
+                if not self._idle(stack) and not self._own(stack):
+                    self_s[stack[-1]] = self_s.get(stack[-1], 0.0) + weight
+        rows = sorted(self_s.items(), key=lambda kv: -kv[1])[:limit]
+        return [(_frame_label(self.frames[index]), seconds) for index, seconds in rows]
+
+
+def _short_path(filename: str) -> str:
+    """Repo-relative path, package/module.py for libraries"""
+    if filename.startswith(ROOT_DIR):
+        return os.path.relpath(filename, ROOT_DIR)
+    return os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+
+
+def _library(filename: str) -> str:
+    """Top-level package of a library or stdlib file: bs4, html, json, crawlee ..."""
+    parts = filename.replace('\\', '/').split('/')
+    if 'site-packages' in parts[:-1]:
+        return os.path.splitext(parts[parts.index('site-packages') + 1])[0]
+    if len(parts) > 1 and not parts[-2].startswith('python'):
+        return parts[-2]
+    return os.path.splitext(parts[-1])[0]
+
+
+def _frame_label(frame: dict) -> str:
+    return f"{frame['name']} ({_short_path(frame['file'])}:{frame['line']})"
+
+
+_OWN_FILES = {os.path.abspath(__file__), tracemalloc.__file__, linecache.__file__}
+
+
+class MemoryWatch:
+    """
+    tracemalloc snapshot every `every` pages, live memory grouped by the line
+    of this repo that led to the allocation
+
+    Each allocation is charged to the innermost repo frame on its traceback,
+    or to the library line that made it when the traceback (TRACE_FRAMES
+    deep) doesn't reach the repo: a growing result list shows up as the
+    append / extend / copy that grows it, a soup as bs4's tag_class(...) or,
+    with deeper tracebacks, as the BeautifulSoup(...) line that built it.
+    """
+
+    def __init__(self, every: int = PROFILE_EVERY, top: int = 8, frames: int = TRACE_FRAMES):
+        self.every = every
+        self.top = top
+        self.frames = frames
+        self.pages = 0
+        self.snapshots: List[Tuple[int, Dict[str, List[int]]]] = []
+        self._sites: Dict[object, str] = {}
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def _site(self, traceback) -> Optional[str]:
+        site = self._sites.get(traceback, '')
+        if site == '':
+            # Frames are oldest first, the innermost repo frame is the last one
+            if os.path.abspath(traceback[-1].filename) in _OWN_FILES:
+                # Sampler stacks and tracemalloc's own bookkeeping, not the crawl's memory
+                self._sites[traceback] = None
+                return None
+            ours = [frame for frame in traceback if frame.filename.startswith(ROOT_DIR)]
+            if ours:
+                frame = ours[-1]
+                code = linecache.getline(frame.filename, frame.lineno).strip()
+                site = f'{_short_path(frame.filename)}:{frame.lineno} {code[:70]}'
+            else:
+                # One line per library, a soup is spread over dozens of bs4 / html.parser lines
+                site = f'{_library(traceback[-1].filename)} (library)'
+            self._sites[traceback] = site
+        return site
+
+    def snapshot(self) -> Dict[str, List[int]]:
+        """{site: [bytes, blocks]} of the memory allocated and still alive now"""
+        # No filter_traces: its fnmatch per trace costs more than the grouping
+        snapshot = tracemalloc.take_snapshot()
+        sites: Dict[str, List[int]] = {}
+        for stat in snapshot.statistics('traceback'):
+            site = self._site(stat.traceback)
+            if site is None:
+                continue
+            row = sites.setdefault(site, [0, 0])
+            row[0] += stat.size
+            row[1] += stat.count
+        self.snapshots.append((self.pages, sites))
+        return sites
+
+    def page_done(self) -> None:
+        self.pages += 1
+        if self.pages % self.every == 0:
+            previous = self.snapshots[-1][1] if self.snapshots else {}
+            sites = self.snapshot()
+            print(f"\n🧠 Memory after {self.pages} pages: {sum(r[0] for r in sites.values()) / 1e6:.1f} MB traced")
+            for site, size, growth in _top_sites(sites, previous, self.top):
+                print(f"  {size / 1e6:8.2f} MB ({growth / 1e6:+.2f}) {site}")
+
+    def report(self) -> List[Tuple[str, int, int]]:
+        """Top sites at the last snapshot, with growth since the first one"""
+        if not self.snapshots or self.snapshots[-1][0] != self.pages:
+            self.snapshot()
+        first, last = self.snapshots[0][1], self.snapshots[-1][1]
+        baseline = first if len(self.snapshots) > 1 else {}
+        rows = _top_sites(last, baseline, self.top)
+        print(f"\n🧠 Top allocation sites after {self.pages} pages ({len(self.snapshots)} snapshots), "
+              f"growth since page {self.snapshots[0][0] if baseline else 0}")
+        for site, size, growth in rows:
+            print(f"  {size / 1e6:8.2f} MB ({growth / 1e6:+.2f}) {site}")
+        return rows
+
+
+def _top_sites(sites: Dict[str, List[int]], previous: Dict[str, List[int]], limit: int) -> List[Tuple[str, int, int]]:
+    """(site, bytes, growth) of the sites holding the most memory"""
+    rows = [(site, size, size - previous.get(site, (0, 0))[0]) for site, (size, _) in sites.items()]
+    rows.sort(key=lambda row: -row[1])
+    return rows[:limit]
+
+
+_watch: Optional[MemoryWatch] = None
+
+
+def page_done() -> None:
+    """Called once per page by the crawlers, a snapshot every N pages in --profile runs"""
+    if _watch is not None:
+        _watch.page_done()
+
+
+@contextmanager
+def profiled(name: str, every: Optional[int] = None, argv: Optional[List[str]] = None, out_dir: str = '.'):
+    """
+    Profile the block if --profile[=N] is in argv (or every is given)
+
+    Writes profile-<name>-<time>.speedscope.json, prints the functions with
+    the most self time and the top allocation sites (snapshots every N pages).
+    tracemalloc makes parsing several times slower, --profile=0 samples the
+    CPU only. Without --profile it does nothing.
+    """
+    global _watch
+
+    if every is None:
+        every = profile_argv(argv)
+    if every is None:
+        yield None
+        return
+
+    profiler = SamplingProfiler()
+    if every:
+        _watch = MemoryWatch(every)
+        _watch.start()
+        _watch.snapshot()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        watch, _watch = _watch, None
+        path = os.path.join(out_dir, f"profile-{name}-{time.strftime('%Y%m%d-%H%M%S')}.speedscope.json")
+        profiler.write_speedscope(path, name)
+
+        print(f"\n🔥 Profile of {name}: {profiler.stopped_at - profiler.started_at:.1f} s wall, "
+              f"{path} (open in https://www.speedscope.app)")
+        for label, seconds in profiler.top():
+            print(f"  {seconds:7.2f} s  {label}")
+        if watch is not None:
+            watch.report()
+            watch.stop()
+
+
+def benchmark(pages: int = 20, every: int = 5) -> dict:
+    """
+    Parse synthetic JPX pages and keep their companies, plain and under
+    --profile, and show where the memory went. The second pass also pushes a
+    copy of all rows so far every page into a kept "dataset", the way hrmos
+    used to push data.copy(): its line shows up as the growing site.
+    """
+    import tempfile
+
+    from bs4 import BeautifulSoup
+    from crawler import parse_companies_from_soup
+    from synthetic_pages import results_page
+
+    contents = [results_page(page, per_page=100, total=pages * 100) for page in range(1, pages + 1)]
+
+    def crawl(copy_every: int = 0) -> list:
+        all_companies, dataset = [], []
+        for page, content in enumerate(contents, 1):
+            soup = BeautifulSoup(content, 'html.parser')
+            all_companies.extend(parse_companies_from_soup(soup))
+            if copy_every and page % copy_every == 0:
+                dataset.extend([dict(company) for company in all_companies])
+            page_done()
+        return all_companies
+
+    start = time.perf_counter()
+    crawl()
+    plain_s = time.perf_counter() - start
+
+    print(f"\n⏱️ Profiling {pages} synthetic pages, snapshot every {every}")
+    results = {'plain_s': plain_s}
+    sampler = SamplingProfiler()
+    sampler.start()
+    start = time.perf_counter()
+    crawl()
+    results['sampler only'] = time.perf_counter() - start
+    sampler.stop()
+    print(f"  sampler only: {results['sampler only']:.2f} s vs {plain_s:.2f} s plain "
+          f"(x{results['sampler only'] / plain_s:.2f})")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, copy_every in (('profiled', 0), ('profiled, all rows pushed again every page', 1)):
+            start = time.perf_counter()
+            with profiled('benchmark', every=every, out_dir=tmp):
+                crawl(copy_every)
+            results[label] = time.perf_counter() - start
+            print(f"  {label}: {results[label]:.2f} s vs {plain_s:.2f} s plain (x{results[label] / plain_s:.1f})")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,176 @@
+import atexit
+import contextlib
+import io
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Messages keep the emoji style of the prints they replace, no timestamps on the console
+CONSOLE_FORMAT = '%(message)s'
+
+# Per-module levels, e.g. JPX_LOG_LEVELS=crawler=DEBUG,hrmos=WARNING
+LEVELS_ENV = 'JPX_LOG_LEVELS'
+
+_listener: Optional[QueueListener] = None
+
+
+class _QueueHandler(QueueHandler):
+    """
+    QueueHandler that only merges msg and args on the calling thread
+
+    The stock one formats the whole record (and copies it) before enqueueing;
+    here the formatter runs on the writer thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Traceback objects don't survive being looked at later, render now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec: Optional[str]) -> Dict[str, str]:
+    """'crawler=DEBUG,hrmos=WARNING' -> {'crawler': 'DEBUG', 'hrmos': 'WARNING'}"""
+    levels = {}
+    for item in (spec or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = 'INFO', levels: Optional[Dict[str, str]] = None, stream=None,
+                  fmt: str = CONSOLE_FORMAT) -> QueueListener:
+    """
+    Route all logging through a queue to one background writer thread
+
+    Callers only append a record to an in-memory queue, the stream write
+    happens on the listener thread, so a slow terminal never blocks the event
+    loop or a fetch thread. levels (plus JPX_LOG_LEVELS) sets levels per
+    logger name; records below a logger's level are dropped before a record
+    is even built. Safe to call more than once, the last call wins.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    records = queue.SimpleQueue()
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(logging.Formatter(fmt))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(records))
+    root.setLevel(level)
+    for name, name_level in {**parse_levels(os.environ.get(LEVELS_ENV)), **(levels or {})}.items():
+        logging.getLogger(name).setLevel(name_level)
+
+    _listener = QueueListener(records, writer, respect_handler_level=True)
+    _listener.start()
+    if not getattr(setup_logging, '_registered', False):
+        atexit.register(stop_logging)
+        setup_logging._registered = True
+    return _listener
+
+
+def flush_logging() -> None:
+    """Wait until every queued record is written, e.g. before printing a summary"""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class _SlowStream(io.TextIOBase):
+    """Text sink whose writes block for a while, like a terminal or a full pipe"""
+
+    def __init__(self, stream, delay: float):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def benchmark(records: int = 100_000, slow_write_s: float = 0.0002) -> dict:
+    """
+    Caller-side cost per record of print and logging, into a file and into a
+    stream whose writes block for slow_write_s (records // 10 of those)
+
+    - print: one synchronous write per line
+    - StreamHandler: the stdlib default, formatting and write on the caller
+    - queue: setup_logging, the write happens on the writer thread
+    - gated debug: debug records on an INFO logger, nothing is built
+    """
+    import tempfile
+
+    log = logging.getLogger('queue_logging.benchmark')
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    page, companies = 12, 200
+    results = {}
+
+    def timed(count, emit, drain=None):
+        start = time.perf_counter()
+        for i in range(count):
+            emit(i)
+        caller_s = time.perf_counter() - start
+        if drain is not None:
+            drain()
+        return {'caller_us': caller_s / count * 1e6, 'total_s': time.perf_counter() - start}
+
+    def info(i):
+        log.info("📊 Found companies on page %d: %d (row %d)", page, companies, i)
+
+    print(f"\n⏱️ Logging overhead, {records:,} records to a file, {records // 10:,} to a stream "
+          f"blocking {slow_write_s * 1e6:.0f} µs per write")
+    with tempfile.TemporaryDirectory() as tmp:
+        for sink, count in (('file', records), ('slow stream', records // 10)):
+            with open(os.path.join(tmp, sink + '.log'), 'w', encoding='utf-8') as f:
+                stream = f if sink == 'file' else _SlowStream(f, slow_write_s)
+                rows = {}
+                with contextlib.redirect_stdout(stream):
+                    rows['print'] = timed(count, lambda i: print(f"📊 Found companies on page {page}: {companies} (row {i})"))
+
+                handler = logging.StreamHandler(stream)
+                handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+                root.handlers, root.level = [handler], logging.INFO
+                rows['StreamHandler'] = timed(count, info)
+
+                setup_logging(stream=stream)
+                rows['queue'] = timed(count, info, stop_logging)
+                setup_logging(stream=stream)
+                rows['gated debug'] = timed(count, lambda i: log.debug("Found: %s -> %s", page, i), stop_logging)
+
+            for label, row in rows.items():
+                print(f"  {sink}, {label}: {row['caller_us']:.2f} µs/record on the caller, "
+                      f"{row['total_s']:.2f} s until written")
+            results[sink] = rows
+
+    root.handlers, root.level = saved_handlers, saved_level
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
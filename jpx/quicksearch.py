@@ -2,18 +2,24 @@ import requests
 from bs4 import BeautifulSoup
 import time
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-import pandas as pd
 import json
 
+from profiling import page_done, profiled
+
+# selenium and pandas are imported inside the methods that need them, the
+# requests path shouldn't pay for loading them
+
 
 class JPXScraper:
-    def __init__(self):
-        self.base_url = "https://www2.jpx.co.jp"
+    def __init__(self, base_url=None, driver_pool=None):
+        """
+        driver_pool: driver_pool.DriverPool for scrape_with_selenium, the
+        process-wide one of its headless mode by default
+        """
+        from crawler import JPX_BASE_URL
+
+        self.base_url = base_url or JPX_BASE_URL
+        self.driver_pool = driver_pool
         self.search_url = "/tseHpFront/JJK020010Action.do"
         self.session = requests.Session()
         self.session.headers.update({
@@ -82,6 +88,7 @@ class JPXScraper:
 
             # Extract data from table
             results = self._parse_table_data(results_soup)
+            page_done()
 
             return {
                 "success": True,
@@ -107,7 +114,14 @@ class JPXScraper:
     def scrape_with_selenium(self, search_params=None, headless=True, debug=False):
         """
         Scraping data using Selenium
+
+        Runs on a warm Chrome from the driver pool (eager page load, images /
+        CSS / fonts blocked) and waits for the results form itself.
         """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         if search_params is None:
             # Corrected search parameters based on actual form structure
             search_params = {
@@ -118,27 +132,20 @@ class JPXScraper:
                 'jjHisiKbnChkbx': False  # Delisted companies checkbox
             }
 
-        # Chrome WebDriver setup
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
+        from driver_pool import default_driver_pool, results_ready
 
+        pool = self.driver_pool or default_driver_pool(headless)
         driver = None
+        healthy = True
         try:
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver = pool.acquire()
 
             # Step 1: Open search page
             print("Step 1: Opening search page...")
             driver.get(self.base_url + self.search_url)
 
             # Wait for page to load
-            WebDriverWait(driver, 10).until(
+            WebDriverWait(driver, 10, poll_frequency=0.05).until(
                 EC.presence_of_element_located((By.NAME, "JJK020010Form"))
             )
 
@@ -156,6 +163,9 @@ class JPXScraper:
             # Step 2: Submit form via JavaScript (as on the website)
             print("Step 2: Submitting form...")
 
+            # The search page's root goes stale once the browser navigates away from it
+            search_root = driver.find_element(By.TAG_NAME, "html")
+
             try:
                 # Enable disabled fields before submission
                 driver.execute_script("""
@@ -172,12 +182,10 @@ class JPXScraper:
                     submitPage(form, listShowInput);
                 """)
 
-                # Wait for results to load or page to change
-                WebDriverWait(driver, 15).until(
-                    lambda d: len(d.find_elements(By.CSS_SELECTOR, "table.tableStyle01, table")) > 1 or
-                              "result" in d.current_url.lower() or
-                              len(d.find_elements(By.CSS_SELECTOR, "tr")) > 10
-                )
+                # Wait for the results form (or JPX's validation error) of the new page
+                wait = WebDriverWait(driver, 15, poll_frequency=0.05)
+                wait.until(EC.staleness_of(search_root))
+                wait.until(results_ready)
 
             except Exception as submit_error:
                 print(f"Error submitting via JavaScript: {submit_error}")
@@ -187,9 +195,7 @@ class JPXScraper:
                     search_button = driver.find_element(By.CSS_SELECTOR, "input[name='searchButton']")
                     driver.execute_script("arguments[0].click();", search_button)
 
-                    WebDriverWait(driver, 15).until(
-                        lambda d: len(d.find_elements(By.CSS_SELECTOR, "table")) > 1
-                    )
+                    WebDriverWait(driver, 15, poll_frequency=0.05).until(results_ready)
                 except:
                     print("Failed to submit form, trying to get data from current page...")
 
@@ -203,6 +209,7 @@ class JPXScraper:
 
             # Extract data from table
             results = self._parse_table_data(soup)
+            page_done()
 
             return {
                 "success": True,
@@ -214,6 +221,7 @@ class JPXScraper:
             }
 
         except Exception as e:
+            healthy = False
             return {
                 "success": False,
                 "error": f"Selenium error: {str(e)}",
@@ -221,12 +229,15 @@ class JPXScraper:
             }
         finally:
             if driver:
-                driver.quit()
+                pool.release(driver, healthy=healthy)
 
     def _fill_form_selenium_corrected(self, driver, search_params):
         """
         Fill form with correct parameters
         """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import Select
+
         try:
             # 1. Number of companies to display
             if 'dspSsuPd' in search_params:
@@ -291,6 +302,8 @@ class JPXScraper:
         """
         Debug function to analyze form structure
         """
+        from selenium.webdriver.common.by import By
+
         try:
             print("\n=== FORM DEBUG INFORMATION ===")
 
@@ -338,6 +351,9 @@ class JPXScraper:
         """
         Fill form using Selenium (improved version)
         """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import Select
+
         for field_name, field_value in search_params.items():
             try:
                 # Try to find field by name
@@ -449,6 +465,8 @@ class JPXScraper:
         Save data to CSV file
         """
         if data.get('success') and data.get('data'):
+            import pandas as pd
+
             df = pd.DataFrame(data['data'])
             df.to_csv(filename, index=False, encoding='utf-8')
             print(f"Data saved to {filename}")
@@ -490,7 +508,8 @@ def main():
     }
 
     print("=== Scraping with requests ===")
-    result_requests = scraper.scrape_with_requests(search_params_requests)
+    with profiled('quicksearch-requests'):
+        result_requests = scraper.scrape_with_requests(search_params_requests)
     print(f"Requests result: {result_requests.get('success')}")
     if result_requests.get('success'):
         print(f"Records found: {len(result_requests['data'])}")
@@ -506,7 +525,8 @@ def main():
         print(f"Error: {result_requests.get('error')}")
 
     print("\n=== Scraping with Selenium (with debugging) ===")
-    result_selenium = scraper.scrape_with_selenium(search_params_selenium, headless=False, debug=True)
+    with profiled('quicksearch-selenium'):
+        result_selenium = scraper.scrape_with_selenium(search_params_selenium, headless=False, debug=True)
     print(f"Selenium result: {result_selenium.get('success')}")
     if result_selenium.get('success'):
         print(f"Records found: {len(result_selenium['data'])}")
@@ -0,0 +1,356 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Tomcat drops sessions idle for ~30 minutes, treat them as gone a bit earlier
+SESSION_TTL = 20 * 60
+
+SESSION_STORE_PATH = 'jpx_sessions.json'
+
+
+@contextmanager
+def _store_lock(path: str):
+    """Exclusive lock on the session store across processes, held on a path.lock side file"""
+    with open(f'{path}.lock', 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class PooledSession:
+    """requests session with its JSESSIONID and wall-clock timestamps"""
+
+    def __init__(self, session, jsessionid: str, created_at: Optional[float] = None,
+                 last_used_at: Optional[float] = None):
+        self.session = session
+        self.jsessionid = jsessionid
+        self.created_at = created_at or time.time()
+        self.last_used_at = last_used_at or self.created_at
+
+    def idle_s(self) -> float:
+        return time.time() - self.last_used_at
+
+    def to_dict(self) -> dict:
+        return {
+            'jsessionid': self.jsessionid,
+            'created_at': self.created_at,
+            'last_used_at': self.last_used_at,
+            'cookies': [
+                {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+                for c in self.session.cookies
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PooledSession':
+        from crawler import create_session
+
+        session = create_session()
+        for cookie in data.get('cookies', []):
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+        return cls(session, data['jsessionid'], data['created_at'], data['last_used_at'])
+
+
+class SessionPool:
+    """
+    Pool of independent JPX sessions
+
+    JPX keeps search and pagination state per JSESSIONID, so every worker
+    leases its own session. prewarm() claims sessions saved by earlier runs
+    and mints the missing ones in parallel; acquire() drops sessions idle
+    past ttl and health-checks the ones idle past check_after before handing
+    them out. Live sessions are handed back to the store on close() for the
+    next short run.
+
+    The store is shared by every pool and process (runner, MCP server,
+    standalone clients): claiming removes the entries from it under a file
+    lock, so no two pools ever use one JSESSIONID, and saving merges into
+    what other pools left there instead of overwriting it.
+    """
+
+    def __init__(self, size: int = 4, ttl: float = SESSION_TTL, path: Optional[str] = SESSION_STORE_PATH,
+                 check_after: float = 60.0, timeout: float = 15.0):
+        self.size = size
+        self.ttl = ttl
+        self.path = path
+        self.check_after = check_after
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle: List[PooledSession] = []
+        self._leased = set()
+        self._minting = 0
+
+        self.stats = {'minted': 0, 'restored': 0, 'recycled': 0, 'checks': 0, 'mint_s': 0.0}
+
+    def _mint(self) -> PooledSession:
+        from crawler import open_session
+
+        started_at = time.perf_counter()
+        session, jsessionid = open_session()
+        if not jsessionid:
+            session.close()
+            raise RuntimeError('JPX did not issue a JSESSIONID')
+        self.stats['minted'] += 1
+        self.stats['mint_s'] += time.perf_counter() - started_at
+        return PooledSession(session, jsessionid)
+
+    def check(self, pooled: PooledSession) -> bool:
+        """True while JPX still knows the session (it sets a new cookie otherwise)"""
+        from crawler import JPX_SEARCH_URL
+
+        self.stats['checks'] += 1
+        try:
+            response = pooled.session.get(f"{JPX_SEARCH_URL};jsessionid={pooled.jsessionid}",
+                                          timeout=self.timeout)
+            response.raise_for_status()
+        except Exception:
+            return False
+        return pooled.session.cookies.get('JSESSIONID') in (None, pooled.jsessionid)
+
+    def _read_store(self) -> List[dict]:
+        """Saved sessions not past ttl yet, as stored"""
+        if not self.path or not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f).get('sessions', [])
+        except (OSError, ValueError):
+            return []
+        return [data for data in saved if time.time() - data['last_used_at'] < self.ttl]
+
+    def _write_store(self, sessions: List[dict]) -> None:
+        from crawler import write_json_atomic
+
+        write_json_atomic(self.path, {'saved_at': time.time(), 'sessions': sessions})
+
+    def load(self) -> List[PooledSession]:
+        """Sessions saved by earlier runs that are not past ttl yet, left in the store"""
+        return [PooledSession.from_dict(data) for data in self._read_store()]
+
+    def claim(self, count: int) -> List[PooledSession]:
+        """Take up to count saved sessions out of the store, most recently used first"""
+        if not self.path or count <= 0:
+            return []
+        with _store_lock(self.path):
+            saved = sorted(self._read_store(), key=lambda data: data['last_used_at'], reverse=True)
+            claimed = saved[:count]
+            if claimed:
+                self._write_store(saved[count:])
+        return [PooledSession.from_dict(data) for data in claimed]
+
+    def _usable(self, pooled: PooledSession) -> bool:
+        if pooled.idle_s() < self.check_after:
+            return True
+        if pooled.idle_s() < self.ttl and self.check(pooled):
+            pooled.last_used_at = time.time()
+            return True
+        return False
+
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """
+        Restore saved sessions and mint the rest, returns sessions ready
+
+        Restored sessions that need a health check are checked in parallel
+        with the mints, so acquire() hands them out without a round trip.
+        """
+        count = min(count or self.size, self.size)
+        with self._condition:
+            wanted = count - len(self._idle) - len(self._leased)
+        saved = self.claim(wanted)
+
+        with ThreadPoolExecutor(max_workers=max(count, 1)) as executor:
+            restored = []
+            for pooled, usable in zip(saved, executor.map(self._usable, saved)):
+                if usable:
+                    restored.append(pooled)
+                else:
+                    pooled.session.close()
+
+            with self._condition:
+                missing = max(count - len(restored) - len(self._idle) - len(self._leased), 0)
+                self._minting += missing
+            futures = [executor.submit(self._mint) for _ in range(missing)]
+
+        minted = []
+        for future in futures:
+            try:
+                minted.append(future.result())
+            except Exception as e:
+                print(f"⚠️ JPX session not minted: {e}")
+
+        with self._condition:
+            self._minting -= missing
+            self._idle.extend(restored + minted)
+            self.stats['restored'] += len(restored)
+            self.stats['recycled'] += len(saved) - len(restored)
+            self._condition.notify_all()
+            return len(self._idle)
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledSession:
+        """Lease a live session, blocks while all `size` sessions are leased"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while not self._idle and len(self._leased) + self._minting >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f'No JPX session free within {timeout} s')
+                    self._condition.wait(remaining)
+
+                if self._idle:
+                    # Most recently used first, those are the least likely to have expired
+                    pooled = self._idle.pop()
+                    self._leased.add(pooled)
+                else:
+                    pooled = None
+                    self._minting += 1
+
+            if pooled is None:
+                try:
+                    pooled = self._mint()
+                finally:
+                    with self._condition:
+                        self._minting -= 1
+                with self._condition:
+                    self._leased.add(pooled)
+                return pooled
+
+            if self._usable(pooled):
+                return pooled
+            self.release(pooled, healthy=False)
+
+    def release(self, pooled: PooledSession, healthy: bool = True) -> None:
+        """Return a leased session, unhealthy ones are closed and replaced on demand"""
+        with self._condition:
+            self._leased.discard(pooled)
+            if healthy:
+                pooled.last_used_at = time.time()
+                self._idle.append(pooled)
+            else:
+                self.stats['recycled'] += 1
+                pooled.session.close()
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """
+        with pool.lease() as pooled: ... pooled.session, pooled.jsessionid
+
+        A failure inside the block recycles the session, its search state
+        on the JPX side is unknown after that.
+        """
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        except BaseException:
+            self.release(pooled, healthy=False)
+            raise
+        self.release(pooled)
+
+    def adopt(self, session, timeout: Optional[float] = None) -> PooledSession:
+        """
+        Lease a session and copy its cookies (JSESSIONID) into session
+
+        For clients with their own requests session and headers; release()
+        the returned lease when done with the JSESSIONID.
+        """
+        pooled = self.acquire(timeout)
+        session.cookies.update(pooled.session.cookies)
+        return pooled
+
+    def save(self) -> None:
+        """Hand live sessions (idle and leased) back to the store, keeping what other pools saved"""
+        if not self.path:
+            return
+        with self._condition:
+            sessions = [pooled.to_dict() for pooled in self._idle + list(self._leased)
+                        if pooled.idle_s() < self.ttl]
+        ours = {data['jsessionid'] for data in sessions}
+        with _store_lock(self.path):
+            others = [data for data in self._read_store() if data['jsessionid'] not in ours]
+            if sessions or others:
+                self._write_store(others + sessions)
+
+    def close(self) -> None:
+        self.save()
+        with self._condition:
+            for pooled in self._idle + list(self._leased):
+                pooled.session.close()
+            self._idle.clear()
+            self._leased.clear()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> SessionPool:
+    """Process-wide pool used by crawler.py when no session is passed, saved at exit"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SessionPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def benchmark(size: int, path: str = SESSION_STORE_PATH) -> dict:
+    """Handshake time of a cold prewarm (parallel vs one by one) and of a restore from disk"""
+    print(f"\n⏱️ JPX session pool, {size} sessions")
+
+    sequential = SessionPool(size, path=None)
+    start = time.perf_counter()
+    for _ in range(size):
+        sequential.release(sequential._mint())
+    sequential_s = time.perf_counter() - start
+    sequential.close()
+    print(f"  Minted one by one: {sequential_s * 1000:.0f} ms")
+
+    cold = SessionPool(size, path=path)
+    if os.path.exists(path):
+        os.remove(path)
+    start = time.perf_counter()
+    cold.prewarm()
+    cold_s = time.perf_counter() - start
+    cold.close()
+    print(f"  Prewarmed in parallel: {cold_s * 1000:.0f} ms ({cold.stats['minted']} minted)")
+
+    results = {'sequential_s': sequential_s, 'parallel_s': cold_s}
+    # Right after the last run no check is needed, after check_after every session gets one
+    for label, check_after in (('restored', 60.0), ('restored_checked', 0.0)):
+        warm = SessionPool(size, path=path, check_after=check_after)
+        start = time.perf_counter()
+        warm.prewarm()
+        results[f'{label}_s'] = time.perf_counter() - start
+        warm.close()
+        print(f"  Restored from {path}{' and health-checked' if not check_after else ''}: "
+              f"{results[f'{label}_s'] * 1000:.0f} ms ({warm.stats['restored']} restored, "
+              f"{warm.stats['checks']} checks, {warm.stats['minted']} minted)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
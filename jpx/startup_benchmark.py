@@ -0,0 +1,86 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import List
+
+
+JPX_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules of the plain requests path, importing any of them must stay cheap
+LIGHT_MODULES = ['crawler', 'main', 'quicksearch', 'jpx_scraper', 'company_index', 'fuzzy_search', 'aggregation', 'page_state', 'company_record']
+
+# Backends that belong to other code paths
+HEAVY_PACKAGES = ['selenium', 'pandas', 'crawl4ai', 'crawlee', 'playwright', 'numpy', 'scipy']
+
+
+def import_profile(module: str) -> List[dict]:
+    """
+    Import module in a fresh interpreter with -X importtime
+
+    Returns one row per imported module: name, self_us, cumulative_us.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=JPX_DIR, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{completed.stderr[-2000:]}')
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({
+            'name': name.strip(),
+            # importtime indents nested imports by two spaces per level
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+        })
+    return rows
+
+
+def module_subtree(rows: List[dict], module: str) -> List[dict]:
+    """Rows imported because of module (children are listed before their parent)"""
+    end = max(i for i, row in enumerate(rows) if row['name'] == module and row['depth'] == 0)
+    start = end
+    while start > 0 and rows[start - 1]['depth'] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def check_module(module: str, budget_ms: float) -> bool:
+    rows = module_subtree(import_profile(module), module)
+    total_ms = rows[-1]['cumulative_us'] / 1000
+    loaded = {row['name'].split('.')[0] for row in rows}
+    heavy = sorted(loaded.intersection(HEAVY_PACKAGES))
+
+    ok = not heavy and total_ms <= budget_ms
+    print(f"\n{'✅' if ok else '❌'} import {module}: {total_ms:.1f} ms, {len(rows)} modules")
+    if heavy:
+        print(f"  Heavy backends loaded: {', '.join(heavy)}")
+    if total_ms > budget_ms:
+        print(f"  Over budget of {budget_ms:.0f} ms")
+
+    direct = [row for row in rows if row['depth'] == 1]
+    for row in sorted(direct, key=lambda r: r['cumulative_us'], reverse=True)[:5]:
+        print(f"  {row['name']}: {row['cumulative_us'] / 1000:.1f} ms")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Cold-start import time guard for the requests-only JPX path')
+    parser.add_argument('modules', nargs='*', default=LIGHT_MODULES)
+    parser.add_argument('--budget-ms', type=float, default=500.0, help='max cumulative import time per module')
+    args = parser.parse_args(argv)
+
+    print(f"⏱️ Startup benchmark ({sys.executable} -X importtime)")
+    results = [check_module(module, args.budget_ms) for module in args.modules]
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
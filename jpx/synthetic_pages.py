@@ -0,0 +1,287 @@
+import argparse
+import html
+import os
+import time
+from typing import Iterator, List, Optional, Tuple
+
+SEED = 42
+
+# Default link target of the stock price cell, the route mock_server.py serves
+DETAIL_URL = '/tseHpFront/stock_detail?code={code}'
+
+# The 33 TSE industry sectors as the English results page names them
+INDUSTRIES = [
+    'Fishery, Agriculture & Forestry', 'Mining', 'Construction', 'Foods', 'Textiles & Apparels',
+    'Pulp & Paper', 'Chemicals', 'Pharmaceutical', 'Oil & Coal Products', 'Rubber Products',
+    'Glass & Ceramics Products', 'Iron & Steel', 'Nonferrous Metals', 'Metal Products', 'Machinery',
+    'Electric Appliances', 'Transportation Equipment', 'Precision Instruments', 'Other Products',
+    'Electric Power & Gas', 'Land Transportation', 'Marine Transportation', 'Air Transportation',
+    'Warehousing & Harbor Transportation Services', 'Information & Communication', 'Wholesale Trade',
+    'Retail Trade', 'Banks', 'Securities & Commodity Futures', 'Insurance', 'Other Financing Business',
+    'Real Estate', 'Services',
+]
+
+
+def _table(weights: dict) -> list:
+    """Lookup table of 100 entries, a uniform pick from it follows the weights"""
+    return [value for value, weight in weights.items() for _ in range(weight)]
+
+
+# Shares of the listed market, fiscal year ends as in the latest snapshot
+SEGMENTS = _table({'Prime': 41, 'Standard': 40, 'Growth': 16, 'TOKYO PRO Market': 3})
+FISCAL_YEAR_ENDS = _table({'March': 58, 'December': 16, 'February': 6, 'June': 4, 'September': 4, 'May': 3,
+                           'January': 2, 'April': 2, 'November': 2, 'July': 1, 'October': 1, 'August': 1})
+ALERTS = _table({'': 98, 'Securities under Supervision': 1, 'Securities to Be Delisted': 1})
+
+# Romanized stems over a small syllable set, so names overlap like real ones do
+SYLLABLES = ['ka', 'to', 'ya', 'ma', 'shi', 'ta', 'na', 'ko', 'mi', 'su', 'ki', 'no', 'ha', 'ra', 'fu', 'ji']
+WORDS = ['ELECTRIC', 'FOODS', 'TRADING', 'SYSTEMS', 'PHARMA', 'STEEL', 'BANK', 'MOTORS', 'CHEMICAL',
+         'K&O ENERGY', 'D&M']
+SUFFIXES = ['CO.,LTD.', 'Corporation', 'Inc.', 'HOLDINGS CO.,LTD.']
+
+MASK = (1 << 64) - 1
+
+# Subresources every JPX page pulls in; a browser fetches them, requests does not
+HEAD_ASSETS = (
+    '<link rel="stylesheet" href="/tseHpFront/common/css/style.css">'
+    '<link rel="stylesheet" href="/tseHpFront/common/css/print.css" media="print">'
+    '<style>@font-face{font-family:jpx;src:url(/tseHpFront/common/font/jpx.woff2)}body{font-family:jpx}</style>'
+)
+HEADER_IMAGES = ('<img src="/tseHpFront/common/img/logo.png" alt="JPX">'
+                 '<img src="/tseHpFront/common/img/banner.jpg" alt="">')
+
+# Bytes served per asset type by mock_server.py
+ASSET_SIZES = {'.css': 40_000, '.png': 60_000, '.jpg': 120_000, '.woff2': 80_000}
+
+
+def _mix(seed: int, row: int) -> int:
+    """splitmix64 of (seed, row): row N is generated without generating rows 0..N-1"""
+    x = (seed * 0x9E3779B97F4A7C15 + row + 1) & MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK
+    return x ^ (x >> 31)
+
+
+def synthetic_company(row: int, seed: int = SEED, detail_url: str = DETAIL_URL) -> dict:
+    """
+    Company number `row` as parse_companies_from_soup returns it (without page)
+
+    Codes are 5 digits like on JPX, so they repeat every 90,000 rows.
+    """
+    bits = _mix(seed, row)
+    bits, segment = divmod(bits, 100)
+    bits, industry = divmod(bits, len(INDUSTRIES))
+    bits, fiscal_year_end = divmod(bits, 100)
+    bits, alerts = divmod(bits, 100)
+    bits, length = divmod(bits, 3)
+    syllables = []
+    for _ in range(length + 2):
+        bits, syllable = divmod(bits, len(SYLLABLES))
+        syllables.append(SYLLABLES[syllable])
+    bits, word = divmod(bits, len(WORDS))
+    suffix = bits % len(SUFFIXES)
+
+    code = str(10000 + row % 90000)
+    name = f"{''.join(syllables).upper()} {WORDS[word]} {SUFFIXES[suffix]}"
+    return {
+        'code': code,
+        'name': name,
+        'market_segment': SEGMENTS[segment],
+        'industry': INDUSTRIES[industry],
+        'fiscal_year_end': FISCAL_YEAR_ENDS[fiscal_year_end],
+        'alerts': ALERTS[alerts],
+        'links': {'stock_prices_url': detail_url.format(code=code)},
+        'hidden_fields': {
+            'eqMgrCd': code,
+            'eqMgrNm': name,
+            'szkbuNm': SEGMENTS[segment],
+            'gyshDspNm': INDUSTRIES[industry],
+            'dspYuKssnKi': FISCAL_YEAR_ENDS[fiscal_year_end],
+        },
+    }
+
+
+def synthetic_companies(count: int, start: int = 0, seed: int = SEED) -> List[dict]:
+    """Rows start..start+count, the large-N input of every benchmark"""
+    return [synthetic_company(row, seed) for row in range(start, start + count)]
+
+
+def _paging_menu(page: int, first: int, shown: int, per_page: int, total: int) -> str:
+    last_page = max((total + per_page - 1) // per_page, 1)
+    window_start = max(1, min(page - 4, last_page - 9))
+    numbers = []
+    for number in range(window_start, min(window_start + 10, last_page + 1)):
+        if number == page:
+            numbers.append(f'<b class="current">{number}</b>')
+        else:
+            numbers.append(f'<a href="javascript:setPage({number})">{number}</a>')
+
+    prev_link = f'<a href="javascript:setPage({page - 1})">Prev</a>' if page > 1 else 'Prev'
+    # No <a> in next_e on the last page, that is how the crawlers spot it
+    next_link = f'<a href="javascript:setPage({page + 1})">Next</a>' if page < last_page else 'Next'
+    return (
+        f'<div class="pagingmenu"><div class="left">Display of {first}-{first + shown - 1} items/{total}</div>'
+        f'<div class="right"><div class="prev_e">{prev_link}</div>{" ".join(numbers)}'
+        f'<div class="next_e">{next_link}</div></div></div>'
+    )
+
+
+def render_results_page(companies: list, page: int, per_page: int, total: int) -> bytes:
+    """
+    JJK020030-shaped results page for these companies
+
+    The JJK020030Form carries the search state and the
+    ccJjCrpSelKekkLst_st[N].field hidden inputs of every row, followed by
+    the pagingmenu, the results table and the pagingmenu again.
+    """
+    hidden = [
+        '<input type="hidden" name="ListShow" value="ListShow">',
+        f'<input type="hidden" name="dspSsuPd" value="{per_page}">',
+        '<input type="hidden" name="szkbuChkbxMapOut" value="011&gt;Prime&lt;012&gt;Standard&lt;013&gt;Growth&lt;">',
+        f'<input type="hidden" name="lstDspPg" value="{page}">',
+    ]
+    rows = []
+    for i, company in enumerate(companies):
+        fields = company.get('hidden_fields') or {'eqMgrCd': company['code'], 'eqMgrNm': company['name']}
+        for field, value in fields.items():
+            hidden.append(f'<input type="hidden" name="ccJjCrpSelKekkLst_st[{i}].{field}" '
+                          f'value="{html.escape(str(value))}">')
+
+        links = company.get('links') or {}
+        detail = links.get('stock_prices_url') or DETAIL_URL.format(code=company['code'])
+        rows.append(
+            f"<tr><td class=\"code\">{company['code']}</td>"
+            f"<td><a href=\"javascript:goDetail('{company['code']}')\">{html.escape(company['name'])}</a></td>"
+            f"<td>{html.escape(company.get('market_segment', ''))}</td>"
+            f"<td>{html.escape(company.get('industry', ''))}</td>"
+            f"<td>{company.get('fiscal_year_end', '')}</td>"
+            f"<td>{html.escape(company.get('alerts') or '')}</td>"
+            f"<td><a href=\"{html.escape(detail)}\">Stock Prices</a></td></tr>"
+        )
+
+    first = (page - 1) * per_page + 1
+    menu = _paging_menu(page, first, len(companies), per_page, total)
+    body = (
+        '<html><head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8">'
+        '<title>Listed Company Search Results</title>' + HEAD_ASSETS + '</head><body>' + HEADER_IMAGES +
+        '<form name="JJK020030Form" method="post" action="/tseHpFront/JJK020030Action.do">'
+        + ''.join(hidden) + menu +
+        '<table class="tableStyle01"><tr><th>Code</th><th>Issue name</th><th>Market Segment</th>'
+        '<th>Industry</th><th>Fiscal year-end</th><th>Alerts</th><th>Stock Prices</th></tr>'
+        + ''.join(rows) + '</table>' + menu + '</form></body></html>'
+    )
+    return body.encode('utf-8')
+
+
+def render_search_page() -> bytes:
+    """
+    JJK020010 quick search form
+
+    submitPage() enables the ListShow button field and submits, like the
+    site's script; Selenium drives the form through it.
+    """
+    segments = ''.join(
+        f'<label><input type="checkbox" name="szkbuChkbx" value="{value}"{" checked" if value == "011" else ""}>'
+        f'{label}</label>'
+        for value, label in (('011', 'Prime'), ('012', 'Standard'), ('013', 'Growth'), ('008', 'TOKYO PRO Market'))
+    )
+    per_page = ''.join(f'<option value="{n}"{" selected" if n == 10 else ""}>{n}</option>' for n in (10, 50, 100, 200))
+    body = (
+        '<html><head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8">'
+        '<title>Listed Company Search</title>' + HEAD_ASSETS +
+        '<script>function submitPage(form, button) { button.disabled = false; form.submit(); }</script>'
+        '</head><body>' + HEADER_IMAGES +
+        '<form name="JJK020010Form" method="post" action="/tseHpFront/JJK020010Action.do">'
+        '<span id="cgTabError"></span>'
+        '<input type="text" name="mgrMiTxtBx" value=""><input type="text" name="eqMgrCd" value="">'
+        + segments +
+        '<input type="checkbox" name="jjHisiKbnChkbx" value="on">'
+        f'<select name="dspSsuPd">{per_page}</select>'
+        '<input type="hidden" name="ListShow" value="ListShow" disabled>'
+        '<input type="hidden" name="Show" value="Show" disabled>'
+        '<input type="hidden" name="Switch" value="Switch" disabled>'
+        '<input type="button" name="searchButton" value="Search" '
+        'onclick="submitPage(this.form, this.form.ListShow)">'
+        '</form></body></html>'
+    )
+    return body.encode('utf-8')
+
+
+def results_page(page: int, per_page: int = 100, total: int = 2000, seed: int = SEED) -> bytes:
+    """Page `page` of a synthetic listing of `total` companies, O(per_page) whatever the page"""
+    start = (page - 1) * per_page
+    count = max(0, min(per_page, total - start))
+    return render_results_page(synthetic_companies(count, start, seed), page, per_page, total)
+
+
+def iter_results_pages(total: int, per_page: int = 100, seed: int = SEED,
+                       max_pages: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """(page, body) for every page of the listing, generated lazily"""
+    last_page = max((total + per_page - 1) // per_page, 1)
+    if max_pages:
+        last_page = min(last_page, max_pages)
+    for page in range(1, last_page + 1):
+        yield page, results_page(page, per_page, total, seed)
+
+
+def write_pages(directory: str, total: int, per_page: int = 100, seed: int = SEED,
+                max_pages: Optional[int] = None) -> int:
+    """Save pages as jpx_page_N.html (the names parse_pool.replay_pages reads), returns pages written"""
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    for page, body in iter_results_pages(total, per_page, seed, max_pages):
+        with open(os.path.join(directory, f'jpx_page_{page}.html'), 'wb') as f:
+            f.write(body)
+        written += 1
+    return written
+
+
+def benchmark(total: int = 1_000_000, per_page: int = 200, pages: int = 50) -> dict:
+    """Generation speed over the first and the last pages, and a parse round trip of both ends"""
+    from bs4 import BeautifulSoup
+
+    from crawler import extract_pagination_info, parse_companies_from_soup
+    from page_state import extract_pagination
+
+    last_page = (total + per_page - 1) // per_page
+    print(f"\n⏱️ Synthetic JJK020030 pages: {total:,} companies, {per_page} per page ({last_page:,} pages)")
+
+    sizes = 0
+    start = time.perf_counter()
+    for page in list(range(1, pages // 2 + 1)) + list(range(last_page - pages // 2 + 1, last_page + 1)):
+        sizes += len(results_page(page, per_page, total))
+    elapsed = time.perf_counter() - start
+    print(f"  Generated {pages} pages in {elapsed:.2f} s: {pages / elapsed:,.0f} pages/s, "
+          f"{pages * per_page / elapsed:,.0f} rows/s, {sizes / pages / 1000:.0f} KB/page")
+    print(f"  Whole listing would take {last_page * elapsed / pages:.0f} s, page {last_page:,} costs as much as page 1")
+
+    mismatches = 0
+    for page in (1, last_page):
+        content = results_page(page, per_page, total)
+        soup = BeautifulSoup(content, 'html.parser')
+        expected = synthetic_companies(min(per_page, total - (page - 1) * per_page), (page - 1) * per_page)
+        parsed = [dict(company) for company in parse_companies_from_soup(soup)]
+        for company in parsed:
+            company['hidden_fields'] = dict(company['hidden_fields'])
+        pagination = extract_pagination(content)
+        if parsed != expected or pagination != extract_pagination_info(soup) \
+                or pagination['total_items'] != total or pagination['has_next_page'] != (page < last_page):
+            mismatches += 1
+    print(f"  {'✅ First and last page parse back to the generated rows' if not mismatches else '❌ Round trip differs'}")
+    return {'pages_per_s': pages / elapsed, 'rows_per_s': pages * per_page / elapsed, 'mismatches': mismatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Synthetic JPX results pages')
+    parser.add_argument('--total', type=int, default=1_000_000, help='companies in the listing')
+    parser.add_argument('--per-page', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--out', help='write jpx_page_N.html files here instead of benchmarking')
+    parser.add_argument('--max-pages', type=int)
+    args = parser.parse_args()
+
+    if args.out:
+        count = write_pages(args.out, args.total, args.per_page, args.seed, args.max_pages)
+        print(f"💾 {count} pages written to {args.out}")
+    else:
+        benchmark(args.total, args.per_page)
@@ -0,0 +1,336 @@
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Tracing is off unless a file is given, e.g. JPX_TRACE_FILE=trace.jsonl
+TRACE_FILE_ENV = 'JPX_TRACE_FILE'
+# Share of traces (root spans) kept, e.g. JPX_TRACE_SAMPLE=0.1 on long runs
+TRACE_SAMPLE_ENV = 'JPX_TRACE_SAMPLE'
+
+SERVICE_NAME = 'crawler-ai-mcp-plugin'
+SCOPE_NAME = 'jpx.tracing'
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current: ContextVar = ContextVar('jpx_span', default=None)
+
+
+class _NoopSpan:
+    """Span that records nothing: tracing off, or a child of an unsampled trace"""
+
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """Root of a trace the sampler dropped, marks the context so its children are dropped too"""
+
+    __slots__ = ('_token',)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current.reset(self._token)
+        return False
+
+
+class Span:
+    """One timed operation with attributes, child of the span active when it was entered"""
+
+    __slots__ = ('tracer', 'name', 'attributes', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns',
+                 'status', 'message', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: dict, parent: Optional['Span']):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent is not None else f'{random.getrandbits(128):032x}'
+        self.parent_id = parent.span_id if parent is not None else ''
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.status = STATUS_OK
+        self.message = ''
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.status = STATUS_ERROR
+            self.message = f'{exc_type.__name__}: {exc}'
+        self.tracer.export(self)
+        return False
+
+    def to_otlp(self) -> dict:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': self.status, 'message': self.message} if self.message else {'code': self.status},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def _otlp_value(value) -> dict:
+    # bool before int, bool is an int; int64 is a string in OTLP/JSON
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Tracer:
+    """
+    Collects finished spans and appends them to path as OTLP/JSON lines
+
+    Each line is one ExportTraceServiceRequest (the OpenTelemetry Collector
+    file exporter format), so the file can be replayed into Jaeger / Tempo
+    through the collector's otlpjsonfile receiver, or summarized with
+    `python jpx/tracing.py trace.jsonl`. Sampling is decided once per trace
+    at its root span: sample=0.1 keeps one page in ten, with all its children.
+    """
+
+    def __init__(self, path: str, sample: float = 1.0, batch: int = 256, service: str = SERVICE_NAME):
+        self.path = path
+        self.sample = sample
+        self.batch = batch
+        self.resource = {'attributes': [{'key': 'service.name', 'value': {'stringValue': service}},
+                                        {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}}]}
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.stats = {'started': 0, 'sampled_out': 0, 'exported': 0}
+
+    def span(self, name: str, **attributes):
+        parent = _current.get()
+        if parent is None:
+            if self.sample < 1.0 and random.random() >= self.sample:
+                self.stats['sampled_out'] += 1
+                return _UnsampledSpan()
+        elif isinstance(parent, _NoopSpan):
+            return NOOP_SPAN
+        self.stats['started'] += 1
+        return Span(self, name, attributes, parent)
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) < self.batch:
+                return
+            spans, self._spans = self._spans, []
+        self._write(spans)
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if spans:
+            self._write(spans)
+
+    def _write(self, spans: List[Span]) -> None:
+        line = json.dumps({'resourceSpans': [{
+            'resource': self.resource,
+            'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': [span.to_otlp() for span in spans]}],
+        }]}, ensure_ascii=False) + '\n'
+        # One O_APPEND write per batch, parse pool workers may append to the same file
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+        finally:
+            os.close(fd)
+        self.stats['exported'] += len(spans)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def setup_tracing(path: Optional[str] = None, sample: Optional[float] = None) -> Optional[Tracer]:
+    """
+    Start exporting spans to path (default JPX_TRACE_FILE), None turns tracing off
+
+    Called on import with the environment, so any entry point is traced by
+    setting JPX_TRACE_FILE; explicit calls override it.
+    """
+    global _tracer
+
+    if _tracer is not None:
+        _tracer.flush()
+    path = path or os.environ.get(TRACE_FILE_ENV)
+    if sample is None:
+        sample = float(os.environ.get(TRACE_SAMPLE_ENV) or 1.0)
+    _tracer = Tracer(path, sample) if path else None
+    if _tracer is not None and not getattr(setup_tracing, '_registered', False):
+        atexit.register(flush_tracing)
+        setup_tracing._registered = True
+    return _tracer
+
+
+def flush_tracing() -> None:
+    if _tracer is not None:
+        _tracer.flush()
+
+
+def span(name: str, **attributes):
+    """
+    Context manager timing the block as a span, child of the active one
+
+        with span('jpx.request', action='JJK020030', page=3) as s:
+            response = session.post(...)
+            s.set(status=response.status_code, bytes=len(response.content))
+
+    With tracing off this returns a shared no-op, one global lookup per call.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.span(name, **attributes)
+
+
+@contextmanager
+def attach(parent):
+    """
+    Spans opened in the block become children of parent, a span that may have
+    ended already, e.g. the page span of an item handed to a later pipeline
+    stage; a dropped (unsampled) parent drops them too. None starts new traces.
+    """
+    token = _current.set(parent)
+    try:
+        yield parent
+    finally:
+        _current.reset(token)
+
+
+def load_spans(path: str) -> List[dict]:
+    """Spans of an OTLP/JSON lines file, flattened"""
+    spans = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line)['resourceSpans']:
+                for scope in resource['scopeSpans']:
+                    spans.extend(scope['spans'])
+    return spans
+
+
+def summarize(path: str) -> Dict[str, dict]:
+    """Count, total and percentiles of span durations per name, slowest total first"""
+    durations: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for item in load_spans(path):
+        ms = (int(item['endTimeUnixNano']) - int(item['startTimeUnixNano'])) / 1e6
+        durations.setdefault(item['name'], []).append(ms)
+        if item.get('status', {}).get('code') == STATUS_ERROR:
+            errors[item['name']] = errors.get(item['name'], 0) + 1
+
+    summary = {}
+    for name, values in sorted(durations.items(), key=lambda kv: -sum(kv[1])):
+        values.sort()
+        summary[name] = {'count': len(values), 'total_ms': sum(values), 'p50_ms': values[len(values) // 2],
+                         'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))],
+                         'errors': errors.get(name, 0)}
+
+    print(f"\n🔎 Spans in {path}")
+    for name, row in summary.items():
+        print(f"  {name}: {row['count']} × p50 {row['p50_ms']:.1f} ms, p95 {row['p95_ms']:.1f} ms, "
+              f"total {row['total_ms'] / 1000:.2f} s" + (f", {row['errors']} errors" if row['errors'] else ''))
+    return summary
+
+
+def benchmark(pages: int = 200, sample: float = 0.1) -> dict:
+    """
+    Cost of the spans of one page (page -> 2 requests, parse, aggregate) with
+    tracing off, sampled out and exported, next to parsing a 100-row page
+    """
+    import tempfile
+
+    from bs4 import BeautifulSoup
+    from crawler import parse_companies_from_soup
+    from synthetic_pages import results_page
+
+    global _tracer
+
+    def page_spans(page: int) -> None:
+        with span('jpx.page', page=page):
+            for step in (1, 2):
+                with span('jpx.request', action='JJK020030', step=step) as s:
+                    s.set(status=200, bytes=150_000)
+            with span('jpx.parse', page=page) as s:
+                s.set(companies=100)
+            with span('jpx.aggregate', companies=100):
+                pass
+
+    def timed(label: str) -> float:
+        start = time.perf_counter()
+        for page in range(pages * 50):
+            page_spans(page)
+        if _tracer is not None:
+            _tracer.flush()
+        us = (time.perf_counter() - start) / (pages * 50) * 1e6
+        results[label] = us
+        return us
+
+    saved, results = _tracer, {}
+    content = results_page(1)
+    start = time.perf_counter()
+    for _ in range(pages // 10 or 1):
+        parse_companies_from_soup(BeautifulSoup(content, 'html.parser'))
+    parse_us = (time.perf_counter() - start) / (pages // 10 or 1) * 1e6
+
+    print(f"\n⏱️ Tracing overhead per page (5 spans), {pages * 50:,} pages; parsing a 100-row page takes "
+          f"{parse_us / 1000:.1f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trace.jsonl')
+        for label, tracer in (('off', None), (f'sampled {sample:.0%}', Tracer(path, sample)),
+                              ('all exported', Tracer(path, 1.0))):
+            _tracer = tracer
+            us = timed(label)
+            print(f"  {label}: {us:.2f} µs/page ({us / parse_us:.3%} of the parse)")
+        results['file_mb'] = os.path.getsize(path) / 1e6
+    _tracer = saved
+    results['parse_us'] = parse_us
+    return results
+
+
+setup_tracing()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        summarize(sys.argv[1])
+    else:
+        benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
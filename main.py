@@ -1,18 +1,55 @@
 import asyncio
+import os
+import sys
 from datetime import timedelta
 
-from crawlee.crawlers import BeautifulSoupCrawler, BeautifulSoupCrawlingContext, BasicCrawler
+from bs4 import BeautifulSoup
+from crawlee import HttpHeaders, Request
+from crawlee.crawlers import (
+    BasicCrawlingContext,
+    BeautifulSoupCrawler,
+    BeautifulSoupCrawlingContext,
+)
+
+from crawl_scope import site_scope
+from http_cache import HttpCache, read_response_body
+from sitemap_frontier import discover_start_urls
+
+# jpx/ is a script directory with flat sibling imports, tracing and profiling live there
+JPX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jpx')
+if JPX_DIR not in sys.path:
+    sys.path.append(JPX_DIR)
+
+from profiling import page_done, profiled
+from tracing import span
+
+TOKYO_DEV_BASE_URL = 'https://www.tokyodev.com'
+MAX_REQUESTS = 10
 
 
 async def main() -> None:
+    # Listing pages rarely change day to day, revalidate instead of re-downloading.
+    # Plain HTTP crawler always revalidates, TTL offline mode is Playwright-only.
+    cache = HttpCache()
+    # Only job/company pages of TokyoDev, canonicalized and enqueued once
+    scope = site_scope('tokyodev')
+
     crawler = BeautifulSoupCrawler(
         # Limit the crawl to max requests. Remove or increase it for crawling all links.
         max_request_retries=1,
 
         request_handler_timeout=timedelta(seconds=30),
-        max_requests_per_crawl=10,
+        max_requests_per_crawl=MAX_REQUESTS,
     )
 
+    # Send conditional GET for every page we already have on disk.
+    @crawler.pre_navigation_hook
+    async def add_conditional_headers(context: BasicCrawlingContext) -> None:
+        entry = cache.lookup(context.request.url)
+        conditional = cache.conditional_headers(entry)
+        if conditional:
+            context.request.headers = context.request.headers | HttpHeaders(conditional)
+
     # Define the default request handler, which will be called for every request.
     @crawler.router.default_handler
     async def request_handler(context: BeautifulSoupCrawlingContext) -> None:
@@ -23,25 +60,60 @@ async def main() -> None:
             "Chrome/115.0.0.0 Safari/537.36"
         )
         context.request.headers["Accept-Language"] = "en-US,en;q=0.9"
-        
-        # Extract data from the page.
-        ul = context.soup.find('ul', class_='relative list-inside')
-        lis =[ li.get_text(strip=True)
-               for li in ul.find_all('li', recursive=False)] if ul else []
-        data = {
-            'url': context.request.url,
-            'title': context.soup.title.string if context.soup.title else None,
-            'lis': lis
-        }
-
-        # Push the extracted data to the default dataset.
-        await context.push_data(data)
-
-        # Enqueue all links found on the page.
-        await context.enqueue_links()
+
+        status = context.http_response.status_code
+        depth = context.request.user_data.get('depth', 0) + 1
+        with span('tokyodev.page', url=context.request.url, status=status, depth=depth - 1) as page_span:
+            soup = context.soup
+            entry = cache.lookup(context.request.url)
+            if status == 304 and entry:
+                # Not modified - the body comes from disk
+                cache.record_revalidated(entry)
+                soup = BeautifulSoup(cache.read_body(entry), 'html.parser')
+            else:
+                with span('tokyodev.persist', kind='http_cache') as cache_span:
+                    body = await read_response_body(context.http_response)
+                    cache.record_miss(len(body))
+                    cache.store(context.request.url, status, context.http_response.headers, body)
+                    cache_span.set(bytes=len(body))
+                page_span.set(bytes=len(body))
+
+            # Extract data from the page.
+            with span('tokyodev.parse') as parse_span:
+                ul = soup.find('ul', class_='relative list-inside')
+                lis =[ li.get_text(strip=True)
+                       for li in ul.find_all('li', recursive=False)] if ul else []
+                data = {
+                    'url': context.request.url,
+                    'title': soup.title.string if soup.title else None,
+                    'lis': lis
+                }
+                parse_span.set(items=len(lis))
+
+            # Push the extracted data to the default dataset.
+            with span('tokyodev.persist', kind='dataset'):
+                await context.push_data(data)
+
+            # Enqueue in-scope links, from the soup so a 304 body from disk works too
+            with span('tokyodev.enqueue', depth=depth) as links_span:
+                links = scope.filter((a['href'] for a in soup.find_all('a', href=True)), context.request.url, depth)
+                if links:
+                    await context.add_requests([Request.from_url(link, user_data={'depth': depth}) for link in links])
+                links_span.set(links=len(links))
+        page_done()
+
+    # Newest job/company pages from robots.txt + sitemaps, the listing page only if there are none
+    start_urls = await asyncio.to_thread(discover_start_urls, TOKYO_DEV_BASE_URL, 'tokyodev', MAX_REQUESTS,
+                                         [TOKYO_DEV_BASE_URL + '/jobs/backend'])
+    scope.add_seen(start_urls)
 
     # Run the crawler with the initial list of URLs.
-    await crawler.run(['https://www.tokyodev.com/jobs/backend'])
+    await crawler.run(start_urls)
+
+    cache.report()
+    scope.report()
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    # --profile[=N]: speedscope profile of the run, memory snapshots every N pages
+    with profiled('tokyodev-crawlee'):
+        asyncio.run(main())
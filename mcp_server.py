@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import List, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+from browser_pool import BrowserPool
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# jpx/ and hrmos/ are script directories with flat sibling imports
+for _path in (os.path.join(ROOT_DIR, 'jpx'), os.path.join(ROOT_DIR, 'hrmos')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+# Concurrent JPX tool calls, each one holds its own JSESSIONID
+JPX_SESSIONS = 2
+
+log = logging.getLogger('mcp_server')
+
+
+class WarmState:
+    """
+    Everything that is expensive to create and worth keeping between tool calls:
+    the JPX session pool and the browser pool
+    """
+
+    def __init__(self):
+        from session_pool import SessionPool
+
+        self.browsers = BrowserPool()
+        # JPX keeps search/pagination state per JSESSIONID, so every call leases its own
+        self.jpx_sessions = SessionPool(size=JPX_SESSIONS)
+        self._details = None
+        self._names = None
+        # jpx_search calls run in worker threads and add to the name index concurrently
+        self._names_lock = threading.Lock()
+
+    @property
+    def details(self):
+        """Stock detail enricher with its day-long cache, created on first use"""
+        if self._details is None:
+            from enrichment import DetailEnricher
+            self._details = DetailEnricher(concurrency=JPX_SESSIONS)
+        return self._details
+
+    def _name_index(self):
+        """Trigram name index over the latest snapshot, created on first use; hold _names_lock"""
+        if self._names is None:
+            from company_index import default_store
+            from fuzzy_search import TrigramIndex
+
+            self._names = TrigramIndex()
+            try:
+                self._names.add_companies(default_store().get().companies)
+            except (OSError, ValueError) as e:
+                log.warning(f'No JPX snapshot for the name index: {e}')
+        return self._names
+
+    def add_names(self, companies: list) -> None:
+        """Index one page of companies parsed by a search, so later name lookups find them"""
+        with self._names_lock:
+            self._name_index().add_companies(companies)
+
+    def find_companies(self, name: str, k: int = 10) -> List[dict]:
+        with self._names_lock:
+            results = self._name_index().search(name, k=k)
+        return [{'score': score, **company.to_dict()} for score, company in results]
+
+    def prewarm_jpx(self) -> None:
+        ready = self.jpx_sessions.prewarm()
+        log.info(f'JPX sessions ready: {ready} ({self.jpx_sessions.stats["restored"]} restored)')
+
+    async def prewarm(self) -> None:
+        """Restore or mint the JPX sessions and launch the browser before the first call"""
+        try:
+            await asyncio.to_thread(self.prewarm_jpx)
+        except Exception as e:
+            log.warning(f'JPX prewarm failed: {e}')
+        try:
+            await self.browsers.start()
+        except Exception as e:
+            log.warning(f'Browser prewarm failed: {e}')
+
+    def jpx_search(self, search_params: dict, max_pages: int = 1) -> dict:
+        """Blocking JPX search on a pooled session, run it in a worker thread"""
+        from crawler import fetch_companies_page
+
+        with self.jpx_sessions.lease() as pooled:
+            session, jsessionid = pooled.session, pooled.jsessionid
+
+            companies = []
+            pagination_info = {}
+            page = 1
+            while True:
+                page_companies, pagination_info = fetch_companies_page(session, jsessionid, search_params, page)
+                companies.extend(page_companies)
+                self.add_names(page_companies)
+
+                if not pagination_info.get('has_next_page') or page >= max_pages or not page_companies:
+                    break
+                page += 1
+
+        return {
+            'success': True,
+            'pages_processed': page,
+            'total_items': pagination_info.get('total_items'),
+            'companies_count': len(companies),
+            'companies': [company.to_dict() for company in companies]
+        }
+
+    def snapshot_company(self, code: str) -> Optional[dict]:
+        """Company from the in-memory index over the latest crawl snapshot, None if it isn't there"""
+        from company_index import default_store
+
+        try:
+            # Built on first use, swapped when a new crawl rewrites the snapshot
+            company = default_store().get().get(code)
+        except (OSError, ValueError) as e:
+            log.warning(f'No JPX snapshot index: {e}')
+            return None
+        return company.to_dict() if company is not None else None
+
+    async def close(self) -> None:
+        await self.browsers.close()
+        self.jpx_sessions.close()
+        if self._details is not None:
+            self._details.close()
+
+
+warm = WarmState()
+
+
+@asynccontextmanager
+async def lifespan(server):
+    # stdio transport already holds the real stdout, keep scraper prints off the protocol stream
+    sys.stdout = sys.stderr
+
+    # Warm up in the background, tool calls don't wait for it
+    prewarm = asyncio.create_task(warm.prewarm())
+    try:
+        yield
+    finally:
+        prewarm.cancel()
+        await warm.close()
+
+
+mcp = FastMCP('crawler-ai-mcp-plugin', lifespan=lifespan)
+
+
+@mcp.tool()
+async def jpx_search(segments: Optional[List[str]] = None, name: str = '', code: str = '',
+                     max_pages: int = 1) -> dict:
+    """Search JPX listed companies by market segment (prime/standard/growth), name or code"""
+    from crawler import build_search_params
+
+    params = build_search_params(segments, name, code)
+    return await asyncio.to_thread(warm.jpx_search, params, max_pages)
+
+
+@mcp.tool()
+async def jpx_company(code: str, details: bool = False, live: bool = False) -> dict:
+    """
+    Look up one JPX listed company by its 4 or 5 digit securities code, optionally with stock details
+
+    Served from the latest crawl snapshot when the company is in it, live=True
+    (or a code the snapshot doesn't have) searches JPX instead.
+    """
+    from crawler import MARKET_SEGMENTS, build_search_params
+
+    company = None if live else await asyncio.to_thread(warm.snapshot_company, code)
+    source = 'snapshot'
+    if company is None:
+        full_code = code + '0' if len(code) == 4 else code
+        params = build_search_params(list(MARKET_SEGMENTS), code=code)
+        result = await asyncio.to_thread(warm.jpx_search, params, 1)
+        company = next((c for c in result['companies'] if c.get('code') == full_code), None)
+        source = 'live'
+
+    if company is not None and details:
+        await warm.details.enrich([company])
+    return {'success': company is not None, 'company': company, 'source': source}
+
+
+@mcp.tool()
+async def jpx_find_company(name: str, k: int = 10) -> list:
+    """Find JPX listed companies by approximate name (romanized or Japanese, typos allowed), best match first"""
+    return await asyncio.to_thread(warm.find_companies, name, k)
+
+
+@mcp.tool()
+async def tokyodev_jobs(category: str = 'backend') -> list:
+    """Companies and job postings from a TokyoDev job category page"""
+    from resource_policy import TOKYODEV_POLICY
+    from tokyodev import TOKYO_DEV_BASE_URL, extract_companies
+
+    async with warm.browsers.page(TOKYODEV_POLICY) as page:
+        await page.goto(f'{TOKYO_DEV_BASE_URL}/jobs/{category}')
+        return await extract_companies(page)
+
+
+@mcp.tool()
+async def hrmos_companies(max_pages: int = 3) -> list:
+    """Company career pages hosted on hrmos.co, collected from search results"""
+    from hrmos import HRMOS_SEARCH_URL, scrap_pages
+    from resource_policy import HRMOS_POLICY
+
+    async with warm.browsers.page(HRMOS_POLICY) as page:
+        await page.goto(HRMOS_SEARCH_URL)
+        data = []
+        await scrap_pages(SimpleNamespace(page=page, log=log), data, max_pages=max_pages)
+        return data
+
+
+if __name__ == '__main__':
+    from queue_logging import setup_logging
+
+    # stdout carries the MCP protocol, log records go to stderr
+    setup_logging(stream=sys.stderr)
+    mcp.run()
@@ -0,0 +1,190 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Union
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step run by `workers` concurrent tasks
+
+    func gets one item and may be:
+    - a coroutine function: its result is passed on, None drops the item
+    - an async generator function: every yielded value is passed on (fan-out)
+    - a plain function, for cheap in-loop work
+
+    workers may be a dict of worker groups ({key: count}) with route(item)
+    naming the group of an item: every group has its own input queue, so
+    items of a saturated group never hold up the workers of another one.
+    """
+
+    def __init__(self, name: str, func: Callable, workers: Union[int, Dict[Hashable, int]] = 1,
+                 queue_size: Optional[int] = None, route: Optional[Callable[[Any], Hashable]] = None):
+        self.name = name
+        self.func = func
+        self.groups = dict(workers) if isinstance(workers, dict) else {None: workers}
+        self.workers = sum(self.groups.values())
+        self.queue_size = queue_size
+        self.route = route
+        self.is_generator = inspect.isasyncgenfunction(func)
+        self.is_coroutine = inspect.iscoroutinefunction(func)
+
+
+class StageMetrics:
+    def __init__(self, stage: Stage):
+        self.name = stage.name
+        self.workers = stage.workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_s = 0.0  # processing
+        self.idle_s = 0.0  # waiting for input
+        self.blocked_s = 0.0  # waiting for room in the next queue (backpressure)
+        self.last_error = None
+
+    def utilization(self, wall_s: float) -> float:
+        return self.busy_s / (self.workers * wall_s) if wall_s else 0.0
+
+    def to_dict(self, wall_s: float) -> dict:
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'errors': self.errors,
+            'busy_s': round(self.busy_s, 3),
+            'idle_s': round(self.idle_s, 3),
+            'blocked_s': round(self.blocked_s, 3),
+            'utilization': round(self.utilization(wall_s), 3),
+        }
+
+
+class Pipeline:
+    """
+    Stages linked by bounded asyncio queues
+
+    A full queue blocks the stage in front of it, so a slow sink slows the
+    fetchers down instead of piling pages up in memory, and the per-stage
+    busy / idle / blocked times show which stage is the bottleneck.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.metrics = [StageMetrics(stage) for stage in stages]
+        self.wall_s = 0.0
+
+    async def run(self, items: Iterable[Any]) -> List[dict]:
+        """Push items through all stages, returns per-stage metrics"""
+        # One input queue per worker group of every stage
+        inboxes = [
+            {key: asyncio.Queue(maxsize=stage.queue_size or self.queue_size) for key in stage.groups}
+            for stage in self.stages
+        ]
+        start = time.perf_counter()
+
+        stage_tasks = []
+        for index, stage in enumerate(self.stages):
+            output = (self.stages[index + 1], inboxes[index + 1]) if index + 1 < len(self.stages) else None
+            workers = [
+                asyncio.create_task(self._worker(stage, self.metrics[index], inboxes[index][key], output))
+                for key, count in stage.groups.items()
+                for _ in range(count)
+            ]
+            stage_tasks.append(workers)
+
+        try:
+            await self._feed(self.stages[0], inboxes[0], items)
+            await self._close(self.stages[0], inboxes[0])
+
+            for index, workers in enumerate(stage_tasks):
+                await asyncio.gather(*workers)
+                if index + 1 < len(self.stages):
+                    await self._close(self.stages[index + 1], inboxes[index + 1])
+        finally:
+            for task in (task for workers in stage_tasks for task in workers):
+                task.cancel()
+            self.wall_s = time.perf_counter() - start
+
+        return [m.to_dict(self.wall_s) for m in self.metrics]
+
+    @staticmethod
+    def _inbox(stage: Stage, inboxes: Dict[Hashable, asyncio.Queue], item) -> asyncio.Queue:
+        return inboxes[stage.route(item) if stage.route is not None else None]
+
+    async def _feed(self, stage: Stage, inboxes: Dict[Hashable, asyncio.Queue], items: Iterable[Any]) -> None:
+        """Queue the input items, each group fed on its own so a full queue only holds up its group"""
+        if len(inboxes) == 1:
+            for item in items:
+                await self._inbox(stage, inboxes, item).put(item)
+            return
+        grouped = {key: [] for key in inboxes}
+        for item in items:
+            grouped[stage.route(item)].append(item)
+
+        async def feed(queue: asyncio.Queue, group: list) -> None:
+            for item in group:
+                await queue.put(item)
+
+        await asyncio.gather(*(feed(inboxes[key], group) for key, group in grouped.items()))
+
+    @staticmethod
+    async def _close(stage: Stage, inboxes: Dict[Hashable, asyncio.Queue]) -> None:
+        for key, count in stage.groups.items():
+            for _ in range(count):
+                await inboxes[key].put(_DONE)
+
+    async def _worker(self, stage: Stage, metrics: StageMetrics, source: asyncio.Queue,
+                      output: Optional[tuple]) -> None:
+        async def emit(value) -> None:
+            metrics.items_out += 1
+            if output is not None:
+                blocked_at = time.perf_counter()
+                await self._inbox(*output, value).put(value)
+                metrics.blocked_s += time.perf_counter() - blocked_at
+
+        while True:
+            waiting_at = time.perf_counter()
+            item = await source.get()
+            metrics.idle_s += time.perf_counter() - waiting_at
+            if item is _DONE:
+                return
+
+            metrics.items_in += 1
+            started_at = time.perf_counter()
+            blocked_before = metrics.blocked_s
+            try:
+                if stage.is_generator:
+                    async for value in stage.func(item):
+                        await emit(value)
+                else:
+                    value = await stage.func(item) if stage.is_coroutine else stage.func(item)
+                    if value is not None:
+                        await emit(value)
+            except Exception as e:
+                metrics.errors += 1
+                metrics.last_error = f'{type(e).__name__}: {e}'
+            # Time spent waiting on the next queue isn't work of this stage
+            metrics.busy_s += time.perf_counter() - started_at - (metrics.blocked_s - blocked_before)
+
+    def report(self) -> List[dict]:
+        """Print per-stage utilization and name the bottleneck"""
+        rows = [m.to_dict(self.wall_s) for m in self.metrics]
+
+        print(f"\n🔀 Pipeline stages ({self.wall_s:.1f} s wall clock)")
+        print(f"{'stage':<10} {'workers':>7} {'in':>7} {'out':>7} {'errors':>6} "
+              f"{'busy %':>7} {'idle s':>8} {'blocked s':>9}")
+        for row in rows:
+            print(f"{row['stage']:<10} {row['workers']:>7} {row['items_in']:>7} {row['items_out']:>7} "
+                  f"{row['errors']:>6} {row['utilization'] * 100:>6.0f}% {row['idle_s']:>8.1f} "
+                  f"{row['blocked_s']:>9.1f}")
+
+        if rows:
+            bottleneck = max(rows, key=lambda r: r['utilization'])
+            print(f"🐢 Bottleneck: {bottleneck['stage']} ({bottleneck['utilization']:.0%} busy)")
+        for metrics in self.metrics:
+            if metrics.last_error:
+                print(f"⚠️ {metrics.name}: {metrics.errors} error(s), last: {metrics.last_error}")
+        return rows
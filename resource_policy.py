@@ -0,0 +1,236 @@
+import asyncio
+import os
+import re
+import sys
+import time
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Third-party trackers and ads, aborted even where their resource type is allowed
+TRACKER_PATTERNS = (
+    r'google-analytics\.com', r'googletagmanager\.com', r'doubleclick\.net', r'googlesyndication\.com',
+    r'googleadservices\.com', r'facebook\.(com|net)/tr', r'connect\.facebook\.net', r'hotjar\.com',
+    r'segment\.(io|com)', r'clarity\.ms', r'intercom(cdn)?\.io', r'sentry\.io', r'/gen_204', r'/log\?',
+)
+
+
+class ResourcePolicy:
+    """
+    Which requests a Playwright page of one site may make
+
+    Documents always go through. Other requests are allowed only if their
+    resource type is in allow_types, their host is one of the site's hosts (or
+    a subdomain) and no tracker pattern matches; everything else is aborted
+    before a byte is downloaded. dry_run lets everything through but still
+    counts what would have been blocked, which is what "saved" is measured on.
+    """
+
+    def __init__(self, name: str, hosts: Iterable[str], allow_types: Iterable[str] = ('document', 'script'),
+                 block_patterns: Iterable[str] = TRACKER_PATTERNS, dry_run: bool = False):
+        self.name = name
+        self.hosts = tuple(hosts)
+        self.allow_types = frozenset(allow_types) | {'document'}
+        self.block_patterns = tuple(block_patterns)
+        self.dry_run = dry_run
+        # One alternation instead of a loop over patterns per request
+        self._blocked = re.compile('|'.join(self.block_patterns)) if self.block_patterns else None
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        if resource_type == 'document':
+            return True
+        if resource_type not in self.allow_types:
+            return False
+        if self._blocked is not None and self._blocked.search(url):
+            return False
+        return self.covers(url)
+
+    def covers(self, url: str) -> bool:
+        """url is on one of the site's hosts or their subdomains"""
+        host = urlparse(url).hostname or ''
+        return any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+    def with_dry_run(self, dry_run: bool = True) -> 'ResourcePolicy':
+        return ResourcePolicy(self.name, self.hosts, self.allow_types, self.block_patterns, dry_run)
+
+    async def install(self, page, stats: 'ResourceStats') -> None:
+        """
+        Route every request of page through the policy, call it from a pre-navigation hook:
+            await TOKYODEV_POLICY.install(context.page, resources)
+
+        Register it after other routes (e.g. HttpCache): Playwright tries the
+        last registered route first, allowed requests fall back to the others.
+        """
+        tracker = _PageTracker(page, stats)
+
+        async def handle(route) -> None:
+            request = route.request
+            if request.is_navigation_request() and request.frame == page.main_frame:
+                tracker.navigation(request.url)
+            if self.allows(request.resource_type, request.url):
+                await route.fallback()
+                return
+            tracker.blocked(request, self.dry_run)
+            if self.dry_run:
+                await route.fallback()
+            else:
+                await route.abort('blockedbyclient')
+
+        await page.route('**/*', handle)
+
+
+class _PageTracker:
+    """Allowed / blocked requests, bytes and load time of each navigation of one page"""
+
+    def __init__(self, page, stats: 'ResourceStats'):
+        self.stats = stats
+        self.current = None
+        self._would_block = set()
+        self._tasks = set()
+        page.on('requestfinished', self._finished)
+        page.on('load', self._loaded)
+
+    def navigation(self, url: str) -> None:
+        self.current = {'url': url, 'started_at': time.perf_counter(), 'load_s': None,
+                        'requests': 0, 'blocked': {}, 'bytes': 0, 'blocked_bytes': 0}
+        self.stats.pages.append(self.current)
+
+    def blocked(self, request, dry_run: bool) -> None:
+        if self.current is None:
+            return
+        blocked = self.current['blocked']
+        blocked[request.resource_type] = blocked.get(request.resource_type, 0) + 1
+        if dry_run:
+            self._would_block.add(request)
+
+    def _loaded(self, _page) -> None:
+        if self.current is not None and self.current['load_s'] is None:
+            self.current['load_s'] = time.perf_counter() - self.current['started_at']
+
+    def _finished(self, request) -> None:
+        if self.current is None:
+            return
+        self.current['requests'] += 1
+        task = asyncio.ensure_future(self._count_bytes(self.current, request))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _count_bytes(self, navigation: dict, request) -> None:
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return  # page already closed
+        size = sizes['responseBodySize'] + sizes['responseHeadersSize']
+        if request in self._would_block:
+            self._would_block.discard(request)
+            navigation['blocked_bytes'] += size
+        else:
+            navigation['bytes'] += size
+
+
+class ResourceStats:
+    """Per-navigation resource numbers of every page a policy was installed on"""
+
+    def __init__(self):
+        self.pages: List[dict] = []
+
+    def report(self) -> dict:
+        """Print and return per-page and total numbers"""
+        blocked = sum(sum(p['blocked'].values()) for p in self.pages)
+        loaded_bytes = sum(p['bytes'] for p in self.pages)
+        blocked_bytes = sum(p['blocked_bytes'] for p in self.pages)
+        loads = [p['load_s'] for p in self.pages if p['load_s'] is not None]
+
+        print(f"\n🚧 Resource policy: {len(self.pages)} navigation(s)")
+        for p in self.pages:
+            types = ', '.join(f"{t} {n}" for t, n in sorted(p['blocked'].items())) or 'nothing'
+            load = f"{p['load_s'] * 1000:.0f} ms" if p['load_s'] is not None else 'not loaded'
+            saved = f", {p['blocked_bytes'] / 1000:.0f} KB blockable" if p['blocked_bytes'] else ''
+            print(f"  {p['url'][:70]}: load {load}, {p['bytes'] / 1000:.0f} KB loaded{saved}, blocked {types}")
+        print(f"  Blocked requests: {blocked}")
+        print(f"  Bytes loaded: {loaded_bytes:,}")
+        if blocked_bytes:
+            print(f"  Bytes blockable (dry run): {blocked_bytes:,}")
+        if loads:
+            print(f"  Mean load: {sum(loads) / len(loads) * 1000:.0f} ms")
+        return {'navigations': len(self.pages), 'blocked': blocked, 'bytes': loaded_bytes,
+                'blocked_bytes': blocked_bytes}
+
+
+# TokyoDev renders listings server-side, only first-party scripts (collapsible job lists) are kept
+TOKYODEV_POLICY = ResourcePolicy('tokyodev', hosts=('tokyodev.com',))
+
+# Japan Dev renders client-side, its scripts and the data requests they make must go through
+JAPANDEV_POLICY = ResourcePolicy('japandev', hosts=('japandev.com', 'japan-dev.com'),
+                                 allow_types=('document', 'script', 'xhr', 'fetch'))
+
+# Google SERP for hrmos: the next button is clicked, so layout (stylesheets) stays as on the real page
+HRMOS_POLICY = ResourcePolicy('hrmos', hosts=('google.com', 'gstatic.com'),
+                              allow_types=('document', 'script', 'stylesheet', 'xhr', 'fetch'))
+
+SITE_POLICIES = {policy.name: policy for policy in (TOKYODEV_POLICY, JAPANDEV_POLICY, HRMOS_POLICY)}
+
+
+def policy_for(url: str) -> Optional[ResourcePolicy]:
+    """Site policy whose hosts cover url, None for sites without one"""
+    return next((policy for policy in SITE_POLICIES.values() if policy.covers(url)), None)
+
+
+async def benchmark(urls: List[str], repeat: int = 3) -> dict:
+    """
+    Bytes and load time saved per page: every url is loaded repeat times with
+    its site policy in dry-run mode (everything loaded, blockable bytes counted)
+    and enforced, in a fresh browser context each time so nothing is cached
+    """
+    from playwright.async_api import async_playwright
+
+    results = {}
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        try:
+            print(f"\n⏱️ Resource policy, {repeat} load(s) per url and mode")
+            for url in urls:
+                policy = policy_for(url) or ResourcePolicy('default', hosts=(urlparse(url).hostname,))
+                runs = {}
+                for label, mode in (('all', policy.with_dry_run()), ('policy', policy)):
+                    stats = ResourceStats()
+                    for _ in range(repeat):
+                        context = await browser.new_context()
+                        page = await context.new_page()
+                        await mode.install(page, stats)
+                        await page.goto(url, wait_until='load')
+                        await asyncio.sleep(0.2)  # late requestfinished sizes
+                        await context.close()
+                    loads = sorted(p['load_s'] for p in stats.pages if p['load_s'] is not None)
+                    runs[label] = {
+                        'load_s': loads[len(loads) // 2] if loads else 0.0,
+                        'bytes': sum(p['bytes'] + p['blocked_bytes'] for p in stats.pages) / repeat,
+                        'blocked_bytes': sum(p['blocked_bytes'] for p in stats.pages) / repeat,
+                        'blocked': sum(sum(p['blocked'].values()) for p in stats.pages) / repeat,
+                    }
+
+                results[url] = {
+                    'bytes_saved': runs['all']['blocked_bytes'],
+                    'load_s_saved': runs['all']['load_s'] - runs['policy']['load_s'],
+                    'runs': runs,
+                }
+                print(f"  {url} ({policy.name}): {runs['all']['bytes'] / 1000:.0f} KB -> "
+                      f"{runs['policy']['bytes'] / 1000:.0f} KB, {runs['policy']['blocked']:.0f} requests blocked, "
+                      f"load {runs['all']['load_s'] * 1000:.0f} -> {runs['policy']['load_s'] * 1000:.0f} ms "
+                      f"(saved {results[url]['bytes_saved'] / 1000:.0f} KB, "
+                      f"{results[url]['load_s_saved'] * 1000:.0f} ms per page)")
+        finally:
+            await browser.close()
+    return results
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'hrmos'))
+
+    from hrmos import HRMOS_SEARCH_URL
+    from japandev import JAPAN_DEV_BASE_URL
+    from tokyodev import TOKYO_DEV_BASE_URL
+
+    asyncio.run(benchmark(sys.argv[1:] or [TOKYO_DEV_BASE_URL + '/jobs/backend', JAPAN_DEV_BASE_URL,
+                                           HRMOS_SEARCH_URL]))
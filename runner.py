@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+from urllib.parse import quote_plus
+
+from browser_pool import BrowserPool
+from pipeline import Pipeline, Stage
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# jpx/ and hrmos/ are script directories with flat sibling imports
+for _path in (os.path.join(ROOT_DIR, 'jpx'), os.path.join(ROOT_DIR, 'hrmos')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from adaptive_concurrency import AIMDController, RateLimiter
+from company_record import to_json
+from profiling import PROFILE_EVERY, page_done, profiled
+from queue_logging import flush_logging, setup_logging
+from tracing import attach, span
+
+# Per-source defaults: jobs running at once and requests (pages) per second
+DEFAULT_LIMITS = {
+    'jpx': {'concurrency': 2, 'rate': 1.0},
+    'tokyodev': {'concurrency': 2, 'rate': 2.0},
+    'hrmos': {'concurrency': 1, 'rate': 0.5},
+}
+
+SOURCES = tuple(DEFAULT_LIMITS)
+
+
+class SourceLimits:
+    def __init__(self, concurrency: int, rate: float):
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate)
+
+
+def job_id(index: int, job: dict) -> str:
+    label = job.get('category') or job.get('query') or ','.join(job.get('segments', [])) or job['source']
+    slug = re.sub(r'[^\w]+', '-', label).strip('-')[:40]
+    return f"{index:02d}-{job['source']}-{slug}"
+
+
+class BatchRunner:
+    """
+    Runs scraping jobs of several sources concurrently in one event loop
+
+    Every job goes through the same staged pipeline:
+    fetch (per source) -> parse (JPX pages in a process pool) -> enrich -> sink
+    (JSON lines per job). Every source has its own group of fetch workers (how
+    many of its jobs run at once) and a rate limiter (pages per second), so
+    jobs queued behind a busy source never wait on it while their own is idle. JPX jobs each lease their own
+    session from a pool (session_pool) and do the blocking requests calls in
+    worker threads, with the requests of all JPX jobs together under an AIMD
+    limit (adaptive_concurrency) that backs off when JPX slows down or errors;
+    TokyoDev and hrmos jobs borrow pages from one shared Chromium.
+    """
+
+    def __init__(self, limits: Optional[dict] = None, output_dir: str = 'runs', headless: bool = True,
+                 parse_workers: Optional[int] = None, queue_size: int = 8):
+        limits = {source: {**DEFAULT_LIMITS[source], **(limits or {}).get(source, {})} for source in SOURCES}
+        self.limits = limits
+        self.output_dir = output_dir
+        self.queue_size = queue_size
+        self._sources = None
+        self._timings = {}
+        self._queued_at = 0.0
+        browser_slots = limits['tokyodev']['concurrency'] + limits['hrmos']['concurrency']
+        self.browsers = BrowserPool(size=browser_slots, headless=headless)
+        # JPX pages of all jobs are parsed in one process pool, started on first use
+        self.parse_workers = parse_workers
+        self._parse_pool = None
+        self.pipeline = None
+        self.jpx_controller = None
+        self.jpx_sessions = None
+        self.detail_enricher = None
+        self._jobs = {}
+
+    def _build_pipeline(self) -> Pipeline:
+        fetch_workers = {source: limit['concurrency'] for source, limit in self.limits.items()}
+        parse_workers = self.parse_workers or os.cpu_count() or 1
+        return Pipeline([
+            Stage('fetch', self._fetch, workers=fetch_workers, route=lambda named_job: named_job[1]['source']),
+            Stage('parse', self._recording_failures('parse', self._parse), workers=parse_workers),
+            Stage('enrich', self._recording_failures('enrich', self._enrich)),
+            Stage('sink', self._recording_failures('sink', self._sink)),
+        ], queue_size=self.queue_size)
+
+    def _recording_failures(self, stage: str, func):
+        """Stage func that marks its job failed before the pipeline drops the page"""
+        async def run(item: dict):
+            try:
+                return await func(item)
+            except Exception as e:
+                timing = self._timings[item['job']]
+                timing['status'] = 'error'
+                timing['dropped_pages'] += 1
+                timing.setdefault('error', f'{stage}: {e}')
+                print(f"❌ {item['job']}: page {item['page']} dropped in {stage}: {e}")
+                raise
+        return run
+
+    async def run(self, jobs: List[dict]) -> List[dict]:
+        """Run all jobs, returns one timing row per job in input order"""
+        # Rate limiters lock inside the running loop
+        self._sources = {
+            source: SourceLimits(limit['concurrency'], limit['rate'])
+            for source, limit in self.limits.items()
+        }
+        jpx_concurrency = self.limits['jpx']['concurrency']
+        self.jpx_controller = AIMDController(initial=min(2, jpx_concurrency), max_limit=jpx_concurrency)
+
+        if any(job['source'] == 'jpx' for job in jobs):
+            from session_pool import SessionPool
+
+            # One JSESSIONID per concurrent JPX job, restored from the last run where still alive
+            self.jpx_sessions = SessionPool(size=jpx_concurrency)
+            ready = await asyncio.to_thread(self.jpx_sessions.prewarm)
+            print(f"🔑 {ready} JPX session(s) ready ({self.jpx_sessions.stats['restored']} restored)")
+
+        if any(job['source'] == 'jpx' and job.get('details') for job in jobs):
+            from enrichment import DetailEnricher
+
+            # Detail pages get their own budget of the same size as the JPX search
+            self.detail_enricher = DetailEnricher(concurrency=jpx_concurrency, rate=self.limits['jpx']['rate'])
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        named_jobs = [(job_id(i + 1, job), job) for i, job in enumerate(jobs)]
+        self._jobs = dict(named_jobs)
+        self._timings = {
+            name: {'job': name, 'source': job['source'], 'status': 'ok', 'items': 0, 'pages': 0,
+                   'dropped_pages': 0, 'wait_s': 0.0, 'run_s': 0.0}
+            for name, job in named_jobs
+        }
+        for name, _ in named_jobs:
+            # Results are appended page by page
+            open(os.path.join(self.output_dir, f'{name}.jsonl'), 'w').close()
+
+        self.pipeline = self._build_pipeline()
+        self._queued_at = time.perf_counter()
+        try:
+            await self.pipeline.run(named_jobs)
+        finally:
+            await self.browsers.close()
+            if self._parse_pool is not None:
+                self._parse_pool.close()
+                self._parse_pool = None
+            if self.jpx_sessions is not None:
+                self.jpx_sessions.close()
+            if self.detail_enricher is not None:
+                self.detail_enricher.close()
+        return [self._timings[name] for name, _ in named_jobs]
+
+    async def _fetch(self, named_job):
+        """Fetch stage: one job in, raw pages (JPX) or extracted items (job boards) out"""
+        name, job = named_job
+        source = job['source']
+        limits = self._sources[source]
+        timing = self._timings[name]
+
+        # Runs on one of the source's fetch workers, which it holds while
+        # downstream queues are full too, that's the backpressure
+        started_at = time.perf_counter()
+        timing['wait_s'] = started_at - self._queued_at
+        print(f"▶️ {name} started")
+        try:
+            async for page, payload, page_span in getattr(self, f'_fetch_{source}')(job, limits.limiter):
+                timing['pages'] += 1
+                # Later stages open their spans under the page's (tracing.attach)
+                yield {'job': name, 'source': source, 'page': page, 'payload': payload, 'span': page_span}
+        except Exception as e:
+            timing['status'] = 'error'
+            timing['error'] = str(e)
+            print(f"❌ {name}: {e}")
+        timing['run_s'] = time.perf_counter() - started_at
+
+        print(f"⏹️ {name} {timing['status']}: {timing['pages']} pages fetched in {timing['run_s']:.1f} s")
+
+    async def _fetch_jpx(self, job: dict, limiter: RateLimiter):
+        from crawler import JPX_SEARCH_URL, build_search_params, fetch_results_page
+        from page_state import has_next_link
+
+        max_pages = job.get('max_pages')
+        search_params = build_search_params(job.get('segments'), job.get('name', ''), job.get('code', ''))
+
+        pooled = await asyncio.to_thread(self.jpx_sessions.acquire)
+        session = pooled.session
+        url = f"{JPX_SEARCH_URL};jsessionid={pooled.jsessionid}"
+        healthy = False
+        try:
+            page = 1
+            while True:
+                await limiter.wait()
+                with span('jpx.page', page=page) as page_span:
+                    # Retried with backoff on 429 / 5xx / timeouts / JPX error pages
+                    response = await self.jpx_controller.request(
+                        lambda timeout: fetch_results_page(session, url, search_params, page, timeout=timeout)
+                    )
+                    page_span.set(status=response.status_code, bytes=len(response.content))
+                # Parsing happens downstream, only peek for a next link here
+                yield page, response.content, page_span
+
+                if (max_pages and page >= max_pages) or not has_next_link(response.content):
+                    break
+                page += 1
+            healthy = True
+        finally:
+            self.jpx_sessions.release(pooled, healthy=healthy)
+
+    async def _fetch_tokyodev(self, job: dict, limiter: RateLimiter):
+        from resource_policy import TOKYODEV_POLICY
+        from tokyodev import TOKYO_DEV_BASE_URL, extract_companies
+
+        await limiter.wait()
+        url = f"{TOKYO_DEV_BASE_URL}/jobs/{job.get('category', 'backend')}"
+        async with self.browsers.page(TOKYODEV_POLICY) as page:
+            with span('tokyodev.page', url=url) as page_span:
+                response = await page.goto(url)
+                with span('tokyodev.parse', url=url) as parse_span:
+                    companies = await extract_companies(page)
+                    parse_span.set(items=len(companies))
+                page_span.set(status=response.status if response else 0)
+            yield 1, companies, page_span
+
+    async def _fetch_hrmos(self, job: dict, limiter: RateLimiter):
+        from hrmos import HRMOS_SEARCH_URL, scrap_pages
+        from resource_policy import HRMOS_POLICY
+
+        query = job.get('query')
+        url = f'https://www.google.com/search?q={quote_plus(query)}' if query else HRMOS_SEARCH_URL
+
+        await limiter.wait()
+        async with self.browsers.page(HRMOS_POLICY) as page:
+            with span('hrmos.search', url=url) as search_span:
+                await page.goto(url)
+                data = []
+                pages = await scrap_pages(SimpleNamespace(page=page, log=logging.getLogger('hrmos')), data,
+                                          max_pages=job.get('max_pages', 3))
+                search_span.set(pages=pages, items=len(data))
+        yield pages, data, search_span
+
+    async def _parse(self, item: dict) -> dict:
+        """Parse stage: JPX page bytes -> company records, job-board items pass through"""
+        if item['source'] != 'jpx':
+            item['items'] = item.pop('payload')
+            return item
+
+        from parse_pool import ParsePool
+
+        if self._parse_pool is None:
+            self._parse_pool = ParsePool(self.parse_workers)
+        # ParsePool.parse traces the jpx.parse span itself
+        with attach(item['span']):
+            item['items'], _ = await self._parse_pool.parse(item.pop('payload'), item['page'], job=item['job'])
+        return item
+
+    async def _enrich(self, item: dict) -> dict:
+        """Enrich stage: tag every record with where it came from, JPX detail pages if asked for"""
+        with attach(item['span']), span(f"{item['source']}.aggregate", job=item['job'], page=item['page'],
+                                        items=len(item['items'])):
+            for record in item['items']:
+                record['source'] = item['source']
+                record['job'] = item['job']
+            if item['source'] == 'jpx' and self._jobs[item['job']].get('details'):
+                await self.detail_enricher.enrich(item['items'])
+        return item
+
+    async def _sink(self, item: dict) -> None:
+        """Sink stage: append records to runs/<job>.jsonl off the event loop"""
+        path = os.path.join(self.output_dir, f"{item['job']}.jsonl")
+        with attach(item['span']), span(f"{item['source']}.persist", job=item['job'], page=item['page'],
+                                        items=len(item['items'])):
+            await asyncio.to_thread(_append_json_lines, path, item['items'])
+        page_done()
+        self._timings[item['job']]['items'] += len(item['items'])
+
+
+def _append_json_lines(path: str, records: list) -> None:
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=to_json))
+            f.write('\n')
+
+
+def print_summary(timings: List[dict], wall_s: float) -> None:
+    print(f"\n{'=' * 78}")
+    print(f"📊 BATCH SUMMARY")
+    print(f"{'=' * 78}")
+    print(f"{'job':<36} {'status':<7} {'items':>7} {'pages':>6} {'lost':>5} {'wait s':>8} {'run s':>8}")
+    for t in timings:
+        print(f"{t['job']:<36} {t['status']:<7} {t['items']:>7} {t['pages']:>6} {t['dropped_pages']:>5} "
+              f"{t['wait_s']:>8.1f} {t['run_s']:>8.1f}")
+
+    print(f"\n{'source':<12} {'jobs':>5} {'errors':>7} {'lost':>5} {'items':>8} {'run s':>9}")
+    for source in SOURCES:
+        rows = [t for t in timings if t['source'] == source]
+        if not rows:
+            continue
+        errors = sum(1 for t in rows if t['status'] != 'ok')
+        print(f"{source:<12} {len(rows):>5} {errors:>7} {sum(t['dropped_pages'] for t in rows):>5} "
+              f"{sum(t['items'] for t in rows):>8} {sum(t['run_s'] for t in rows):>9.1f}")
+    for t in timings:
+        if t.get('error'):
+            print(f"❌ {t['job']}: {t['error']}")
+
+    busy_s = sum(t['run_s'] for t in timings)
+    print(f"\n⏱️ Wall clock: {wall_s:.1f} s, sum of job times: {busy_s:.1f} s "
+          f"(x{busy_s / wall_s if wall_s else 0:.1f} overlap)")
+
+
+def load_config(path: str) -> dict:
+    """
+    {"limits": {"jpx": {"concurrency": 2, "rate": 1}},
+     "jobs": [{"source": "jpx", "segments": ["prime"], "max_pages": 3, "details": true},
+              {"source": "tokyodev", "category": "backend"},
+              {"source": "hrmos", "query": "site:hrmos.co/pages エンジニア", "max_pages": 2}]}
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _parse_limit(values: List[str], key: str, cast) -> dict:
+    limits = {}
+    for value in values or []:
+        source, _, number = value.partition('=')
+        if source not in DEFAULT_LIMITS:
+            raise SystemExit(f'Unknown source {source!r}, expected one of {", ".join(SOURCES)}')
+        limits[source] = {key: cast(number)}
+    return limits
+
+
+def build_config(args) -> dict:
+    config = load_config(args.config) if args.config else {'jobs': [], 'limits': {}}
+
+    for segments in args.jpx or []:
+        config['jobs'].append({'source': 'jpx', 'segments': segments.split(','), 'max_pages': args.max_pages,
+                               'details': args.details})
+    for category in args.tokyodev or []:
+        config['jobs'].append({'source': 'tokyodev', 'category': category})
+    for query in args.hrmos or []:
+        config['jobs'].append({'source': 'hrmos', 'query': query, 'max_pages': args.max_pages or 3})
+
+    limits = config.setdefault('limits', {})
+    for override in (_parse_limit(args.concurrency, 'concurrency', int), _parse_limit(args.rate, 'rate', float)):
+        for source, values in override.items():
+            limits.setdefault(source, {}).update(values)
+
+    for job in config['jobs']:
+        if job.get('source') not in DEFAULT_LIMITS:
+            raise SystemExit(f'Unknown job source in {job}')
+    return config
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Run several scraping jobs concurrently, no prompts')
+    parser.add_argument('--config', help='JSON file with "jobs" and optional "limits"')
+    parser.add_argument('--jpx', action='append', metavar='SEGMENTS', help='e.g. prime or standard,growth')
+    parser.add_argument('--tokyodev', action='append', metavar='CATEGORY', help='e.g. backend')
+    parser.add_argument('--hrmos', action='append', metavar='QUERY', help='Google query for hrmos pages')
+    parser.add_argument('--max-pages', type=int, help='page limit for JPX/hrmos jobs given on the command line')
+    parser.add_argument('--concurrency', action='append', metavar='SOURCE=N')
+    parser.add_argument('--rate', action='append', metavar='SOURCE=PER_SECOND')
+    parser.add_argument('--parse-workers', type=int, help='processes parsing JPX pages (default: cpu count)')
+    parser.add_argument('--output-dir', default='runs')
+    parser.add_argument('--details', action='store_true',
+                        help='also fetch stock detail pages of JPX companies (cached for a day)')
+    parser.add_argument('--headed', action='store_true', help='show the browser')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_EVERY, type=int, metavar='N',
+                        help='write a speedscope profile, memory snapshots every N pages (0: CPU only)')
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    config = build_config(args)
+    if not config['jobs']:
+        parser.error('no jobs given, use --config or --jpx/--tokyodev/--hrmos')
+
+    runner = BatchRunner(config.get('limits'), output_dir=args.output_dir, headless=not args.headed,
+                         parse_workers=args.parse_workers)
+    print(f"🚀 Running {len(config['jobs'])} jobs")
+
+    start = time.perf_counter()
+    with profiled('runner', every=args.profile, argv=[]):
+        timings = asyncio.run(runner.run(config['jobs']))
+    flush_logging()
+    print_summary(timings, time.perf_counter() - start)
+    runner.pipeline.report()
+    if runner.browsers.resources.pages:
+        runner.browsers.resources.report()
+
+    controller = runner.jpx_controller
+    if controller is not None and controller.stats['requests']:
+        print(f"🎚️ JPX in-flight limit {controller.limit:.1f}, {controller.stats['cuts']} cut(s), "
+              f"p95 {controller.p95 * 1000:.0f} ms, timeout {controller.timeout:.1f} s, "
+              f"failures {controller.stats['failure_kinds'] or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
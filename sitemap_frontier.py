@@ -0,0 +1,288 @@
+import gzip
+import heapq
+import io
+import re
+import sys
+import time
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional, Tuple
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import iterparse
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/115.0.0.0 Safari/537.36')
+
+# Job and company pages worth a request, everything else in the sitemaps is skipped
+SITE_PATTERNS = {
+    'tokyodev': r'/companies/[^/?#]+(?:/jobs/[^/?#]+)?/?$',
+    'japandev': r'/(?:jobs|companies)/[^/?#]+/?$',
+}
+
+OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def parse_lastmod(value: Optional[str]) -> datetime:
+    """
+    W3C datetime of a sitemap <lastmod> (date only or full), OLDEST when
+    missing or broken. Cached, a sitemap repeats a handful of dates 50k times.
+    """
+    if not value:
+        return OLDEST
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return OLDEST
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+_LOCAL_NAMES = {}
+
+
+def _local(tag: str) -> str:
+    name = _LOCAL_NAMES.get(tag)
+    if name is None:
+        name = _LOCAL_NAMES[tag] = tag.rsplit('}', 1)[-1]
+    return name
+
+
+def iter_sitemap(stream) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    ('url' | 'sitemap', loc, lastmod) for every entry of a urlset or sitemap
+    index, parsed incrementally from a binary stream, gzip or plain
+
+    Finished elements are cleared, so memory stays flat for 50k-URL files.
+    """
+    stream = io.BufferedReader(stream) if not hasattr(stream, 'peek') else stream
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        stream = gzip.GzipFile(fileobj=stream)
+
+    loc = lastmod = None
+    for _, element in iterparse(stream, events=('end',)):
+        tag = _local(element.tag)
+        if tag == 'loc':
+            loc = (element.text or '').strip()
+        elif tag == 'lastmod':
+            lastmod = element.text
+        elif tag in ('url', 'sitemap'):
+            if loc:
+                yield tag, loc, lastmod
+            loc = lastmod = None
+            element.clear()
+
+
+class SitemapFrontier:
+    """
+    Start URLs of a site straight from robots.txt and its sitemaps
+
+    Sitemap indexes are followed newest child first (children older than
+    `since` are skipped without a request), every urlset is streamed, and only
+    URLs matching `include` and allowed by robots.txt are kept. discover()
+    returns the `limit` most recently modified of them, newest first.
+    """
+
+    def __init__(self, base_url: str, include: str, session=None, since: Optional[datetime] = None,
+                 max_sitemaps: int = 50):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.include = re.compile(include)
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        self.since = since or OLDEST
+        self.max_sitemaps = max_sitemaps
+        self.robots = RobotFileParser()
+        self.stats = {'requests': 0, 'sitemaps': 0, 'urls_seen': 0, 'urls_kept': 0, 'bytes': 0}
+
+    def _open(self, url: str):
+        response = self.session.get(url, stream=True, timeout=30)
+        self.stats['requests'] += 1
+        response.raise_for_status()
+        # Transport compression (Content-Encoding) is undone here, .xml.gz files in iter_sitemap
+        response.raw.decode_content = True
+        return response
+
+    def sitemap_urls(self) -> List[str]:
+        """Sitemaps listed in robots.txt, /sitemap.xml if there are none"""
+        try:
+            response = self._open(f'{self.base_url}/robots.txt')
+            lines = response.text.splitlines()
+        except Exception:
+            lines = []
+        self.robots.parse(lines)
+        return self.robots.site_maps() or [f'{self.base_url}/sitemap.xml']
+
+    def iter_urls(self) -> Iterator[Tuple[datetime, str]]:
+        """(lastmod, url) of every kept URL in every reachable sitemap"""
+        pending = [(OLDEST, url) for url in self.sitemap_urls()]
+        seen = set()
+        while pending and self.stats['sitemaps'] < self.max_sitemaps:
+            # Newest sitemap first, its URLs are the likeliest to be new
+            pending.sort()
+            _, sitemap_url = pending.pop()
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+
+            try:
+                response = self._open(sitemap_url)
+            except Exception as e:
+                print(f"⚠️ Sitemap {sitemap_url} skipped: {e}")
+                continue
+            self.stats['sitemaps'] += 1
+            counted = _CountingReader(response.raw)
+            try:
+                for kind, loc, lastmod in iter_sitemap(counted):
+                    if kind == 'sitemap':
+                        modified = parse_lastmod(lastmod)
+                        if lastmod is None or modified >= self.since:
+                            pending.append((modified, loc))
+                        continue
+                    self.stats['urls_seen'] += 1
+                    # Cheapest test first, most sitemap URLs are neither jobs nor companies
+                    if not self.include.search(loc):
+                        continue
+                    modified = parse_lastmod(lastmod)
+                    if modified < self.since and lastmod is not None:
+                        continue
+                    if self.robots.can_fetch(USER_AGENT, loc):
+                        self.stats['urls_kept'] += 1
+                        yield modified, loc
+            except Exception as e:
+                print(f"⚠️ Sitemap {sitemap_url} cut short: {e}")
+            finally:
+                self.stats['bytes'] += counted.count
+                response.close()
+
+    def discover(self, limit: Optional[int] = None) -> List[str]:
+        """Kept URLs, most recently modified first (only the newest `limit` are held in memory)"""
+        if limit is None:
+            entries = sorted(self.iter_urls(), reverse=True)
+        else:
+            entries = heapq.nlargest(limit, self.iter_urls())
+        return [url for _, url in entries]
+
+    def report(self) -> dict:
+        print(f"\n🗺️ Sitemap discovery of {self.base_url}")
+        print(f"  Requests: {self.stats['requests']} ({self.stats['sitemaps']} sitemaps)")
+        print(f"  URLs seen: {self.stats['urls_seen']:,}, kept: {self.stats['urls_kept']:,}")
+        print(f"  Bytes read: {self.stats['bytes']:,}")
+        return dict(self.stats)
+
+
+class _CountingReader(io.RawIOBase):
+    """Counts bytes read through a raw stream, for the report"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        self.count += len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def discover_start_urls(base_url: str, site: str, limit: Optional[int] = None,
+                        fallback: Optional[List[str]] = None) -> List[str]:
+    """Newest job/company URLs of a site from its sitemaps, fallback if discovery finds none"""
+    frontier = SitemapFrontier(base_url, SITE_PATTERNS[site])
+    try:
+        urls = frontier.discover(limit)
+    except Exception as e:
+        print(f"⚠️ Sitemap discovery failed: {e}")
+        urls = []
+    frontier.report()
+    return urls or list(fallback or [])
+
+
+def _sitemap_site(base_url: str, children: int, urls_per_child: int) -> Callable[[str], Tuple[bytes, str]]:
+    """Routes of a synthetic site: robots.txt -> gzipped index -> gzipped urlsets of job/company/blog URLs"""
+    ns = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+    def urlset(child: int) -> bytes:
+        rows = []
+        for i in range(urls_per_child):
+            n = child * urls_per_child + i
+            path = (f'/companies/company-{n % 5000}/jobs/job-{n}', f'/companies/company-{n % 5000}',
+                    f'/blog/post-{n}', f'/jobs/backend?page={n}')[n % 4]
+            rows.append(f'<url><loc>{base_url}{path}</loc>'
+                        f'<lastmod>2026-{1 + n % 12:02d}-{1 + n % 28:02d}</lastmod></url>')
+        return gzip.compress(f'<?xml version="1.0"?><urlset {ns}>{"".join(rows)}</urlset>'.encode('utf-8'))
+
+    def route(path: str) -> Tuple[bytes, str]:
+        if path == '/robots.txt':
+            return f'User-agent: *\nDisallow: /admin\nSitemap: {base_url}/sitemap_index.xml.gz\n'.encode('utf-8'), 'text/plain'
+        if path == '/sitemap_index.xml.gz':
+            entries = ''.join(f'<sitemap><loc>{base_url}/sitemap-{c}.xml.gz</loc>'
+                              f'<lastmod>2026-{1 + c % 12:02d}-01</lastmod></sitemap>' for c in range(children))
+            return gzip.compress(f'<sitemapindex {ns}>{entries}</sitemapindex>'.encode('utf-8')), 'application/gzip'
+        child = int(path.rsplit('-', 1)[1].split('.')[0])
+        return urlset(child), 'application/gzip'
+
+    return route
+
+
+def benchmark(children: int = 20, urls_per_child: int = 50_000, limit: int = 1000) -> dict:
+    """Requests, time and peak memory to pick the newest job/company URLs out of children × urls_per_child"""
+    import threading
+    import tracemalloc
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    bodies = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body, content_type = bodies[self.path]
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # Render every file once up front, the timed run measures discovery only
+        route = _sitemap_site(base_url, children, urls_per_child)
+        for path in ['/robots.txt', '/sitemap_index.xml.gz'] + [f'/sitemap-{c}.xml.gz' for c in range(children)]:
+            bodies[path] = route(path)
+
+        print(f"\n⏱️ Sitemap discovery: {children} sitemaps × {urls_per_child:,} URLs, newest {limit:,} kept")
+        frontier = SitemapFrontier(base_url, SITE_PATTERNS['tokyodev'])
+        start = time.perf_counter()
+        urls = frontier.discover(limit)
+        elapsed = time.perf_counter() - start
+
+        # Memory in a second pass, tracemalloc would skew the timing
+        tracemalloc.start()
+        SitemapFrontier(base_url, SITE_PATTERNS['tokyodev']).discover(limit)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    results = {**frontier.stats, 'seconds': elapsed, 'urls_per_s': frontier.stats['urls_seen'] / elapsed,
+               'peak_mb': peak / 1e6, 'start_urls': len(urls)}
+    print(f"  {results['requests']} requests, {results['urls_seen']:,} URLs in {elapsed:.1f} s "
+          f"({results['urls_per_s']:,.0f} URLs/s), peak {results['peak_mb']:.1f} MB traced")
+    print(f"  {results['urls_kept']:,} job/company URLs, newest: {urls[0] if urls else '-'}")
+    return results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        start_urls = discover_start_urls(sys.argv[1], sys.argv[2], limit=int(sys.argv[3]) if len(sys.argv) > 3 else 50)
+        print('\n'.join(start_urls))
+    else:
+        benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -1,16 +1,84 @@
 import asyncio
+import os
+import sys
+from datetime import timedelta
 
-from crawlee.crawlers import (
-    PlaywrightCrawler,
-    PlaywrightCrawlingContext,
-    PlaywrightPreNavCrawlingContext,
-)
+from http_cache import HttpCache
+from resource_policy import TOKYODEV_POLICY, ResourceStats
+from sitemap_frontier import discover_start_urls
+
+# jpx/ is a script directory with flat sibling imports, tracing and profiling live there
+JPX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jpx')
+if JPX_DIR not in sys.path:
+    sys.path.append(JPX_DIR)
+
+from profiling import page_done, profiled
+from tracing import span
 
 TOKYO_DEV_BASE_URL = 'https://www.tokyodev.com'
-async def main() -> None:
+MAX_REQUESTS = 10
+
+
+async def extract_companies(page) -> list:
+    """Extract companies and their job postings from a TokyoDev listing page"""
+    # Extract data from the page using Playwright's API.
+    ul = await page.query_selector('ul.relative.list-inside')
+    lis = await ul.query_selector_all('li')
+    data = []
+
+    for li in lis:
+        # Get the HTML elements for the title and rank within each post.
+        title_el = await li.query_selector('h3 > a')
+        title = await title_el.inner_text()
+        job_items = await li.query_selector_all('div[data-collapsable-list-target="item"]')
+        jobs = []
+        for job in job_items:
+            job_title_el = await job.query_selector('h4 > a')
+            job_title = await job_title_el.inner_text()
+            job_link = await job_title_el.get_attribute('href')
+            job_tags = []
+            job_tags_elem = await job.query_selector_all('div > a')
+            for tag in job_tags_elem:
+                tag = await tag.inner_text()
+                job_tags.append(tag)
+
+            job = {
+                'title': job_title,
+                'tags': job_tags,
+                'link': TOKYO_DEV_BASE_URL + job_link
+            }
+            jobs.append(job)
+        data.append({'title': title, 'jobs': jobs})
+
+    return data
+
+
+async def extract_company_page(page) -> dict:
+    """Company name and job links of a TokyoDev company / job page (sitemap start URLs)"""
+    heading = await page.query_selector('h1')
+    title = (await heading.inner_text()).strip() if heading else await page.title()
+    jobs = await page.eval_on_selector_all(
+        'a[href*="/jobs/"]', 'anchors => anchors.map(a => ({title: a.innerText.trim(), link: a.href}))')
+    return {'url': page.url, 'title': title, 'jobs': jobs}
+
+
+async def main(offline: bool = False, sitemap: bool = False) -> None:
+    # crawlee/Playwright load only on the crawl path, extraction helpers stay importable cheaply
+    from crawlee import Request
+    from crawlee.crawlers import (
+        PlaywrightCrawler,
+        PlaywrightCrawlingContext,
+        PlaywrightPreNavCrawlingContext,
+    )
+
+    # Serve unchanged listing pages from disk, offline mode skips the network for 12h
+    cache = HttpCache(ttl=timedelta(hours=12), offline=offline)
+    # Images, fonts, stylesheets and third-party scripts never reach the extracted fields
+    resources = ResourceStats()
+
     crawler = PlaywrightCrawler(
         # Limit the crawl to max requests. Remove or increase it for crawling all links.
-        max_requests_per_crawl=10,
+        max_requests_per_crawl=MAX_REQUESTS,
 
         headless=False,
         # Browser types supported by Playwright.
@@ -28,42 +96,34 @@ async def main() -> None:
     async def request_handler(context: PlaywrightCrawlingContext) -> None:
         context.log.info(f'Processing {context.request.url} ...')
 
-        # Extract data from the page using Playwright's API.
-        ul = await context.page.query_selector('ul.relative.list-inside')
-        lis = await ul.query_selector_all('li')
-        data = []
-
-        for li in lis:
-            # Get the HTML elements for the title and rank within each post.
-            title_el = await li.query_selector('h3 > a')
-            title = await title_el.inner_text()
-            job_items = await li.query_selector_all('div[data-collapsable-list-target="item"]')
-            jobs = []
-            for job in job_items:
-                job_title_el = await job.query_selector('h4 > a')
-                job_title = await job_title_el.inner_text()
-                job_link = await job_title_el.get_attribute('href')
-                job_tags = []
-                job_tags_elem = await job.query_selector_all('div > a')
-                for tag in job_tags_elem:
-                    tag = await tag.inner_text()
-                    job_tags.append(tag)
-
-                job = {
-                    'title': job_title,
-                    'tags': job_tags,
-                    'link': TOKYO_DEV_BASE_URL + job_link
-                }
-                jobs.append(job)
-            data.append({'title': title, 'jobs': jobs})
-
-        # Push the extracted data to the default dataset. In local configuration,
-        # the data will be stored as JSON files in ./storage/datasets/default.
-        await context.push_data(data)
-        print(data)
-
-        # Find a link to the next page and enqueue it if it exists.
-        await context.enqueue_links(selector='.morelink')
+        status = context.response.status if context.response else 0
+        with span('tokyodev.page', url=context.request.url, status=status):
+            with span('tokyodev.parse') as parse_span:
+                data = await extract_companies(context.page)
+                parse_span.set(items=len(data))
+
+            # Push the extracted data to the default dataset. In local configuration,
+            # the data will be stored as JSON files in ./storage/datasets/default.
+            with span('tokyodev.persist', items=len(data)):
+                await context.push_data(data)
+            print(data)
+
+            # Find a link to the next page and enqueue it if it exists.
+            with span('tokyodev.enqueue'):
+                await context.enqueue_links(selector='.morelink')
+        page_done()
+
+    # Company / job pages found in the sitemaps
+    @crawler.router.handler('company')
+    async def company_handler(context: PlaywrightCrawlingContext) -> None:
+        context.log.info(f'Processing {context.request.url} ...')
+        status = context.response.status if context.response else 0
+        with span('tokyodev.page', url=context.request.url, status=status, label='company'):
+            with span('tokyodev.parse'):
+                data = await extract_company_page(context.page)
+            with span('tokyodev.persist', items=1):
+                await context.push_data(data)
+        page_done()
 
     # Define a hook that will be called each time before navigating to a new URL.
     # The hook receives a context parameter, providing access to the request and
@@ -72,11 +132,23 @@ async def main() -> None:
     @crawler.pre_navigation_hook
     async def log_navigation_url(context: PlaywrightPreNavCrawlingContext) -> None:
         context.log.info(f'Navigating to {context.request.url} ...')
+        await context.page.route('**/*', cache.playwright_route_handler())
+        await TOKYODEV_POLICY.install(context.page, resources)
+
+    start_urls = [TOKYO_DEV_BASE_URL + '/jobs/backend']
+    if sitemap:
+        # Newest company/job pages straight from the sitemaps instead of following .morelink
+        urls = await asyncio.to_thread(discover_start_urls, TOKYO_DEV_BASE_URL, 'tokyodev', MAX_REQUESTS)
+        start_urls = [Request.from_url(url, label='company') for url in urls] or start_urls
 
     # Run the crawler with the initial list of URLs.
-    await crawler.run([TOKYO_DEV_BASE_URL + '/jobs/backend'])
+    await crawler.run(start_urls)
+
+    cache.report()
+    resources.report()
 
 
 if __name__ == '__main__':
     print("started TOKYO dev scratch")
-    asyncio.run(main())
\ No newline at end of file
+    with profiled('tokyodev'):
+        asyncio.run(main(offline='--offline' in sys.argv, sitemap='--sitemap' in sys.argv))
\ No newline at end of file